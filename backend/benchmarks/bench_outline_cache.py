@@ -0,0 +1,141 @@
+# backend/benchmarks/bench_outline_cache.py
+#
+# Recall and latency of the semantic outline cache (services/outline_cache).
+# One phrasing of each labelled topic is cached; its paraphrases should hit
+# it (recall), while related but different topics that were never cached,
+# including near misses one word away from a cached topic, should miss
+# (false hits). Both are reported across a range of thresholds.
+# Lookup latency is then measured with the index padded to --sizes entries.
+#
+#   python -m backend.benchmarks.bench_outline_cache --sizes 100 1000 5000
+
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from backend.services.outline_cache import OUTLINE_CACHE_THRESHOLD, OutlineCache, normalize_topic
+
+# (cached phrasing, paraphrases that should reuse its outline)
+GROUPS = [
+    ("Teach me Python", ["I want to learn about python programming", "python", "Python basics",
+                         "intro to Python", "learn python programming language"]),
+    ("SQL join operations", ["SQL joins", "joins in sql", "how do SQL joins work", "teach me sql join operations"]),
+    ("Machine learning", ["intro to machine learning", "I want to learn machine learning",
+                          "machine learning fundamentals", "Machine Learning for beginners"]),
+    ("JavaScript promises", ["javascript promise", "Promises in JavaScript", "explain javascript promises"]),
+    ("React hooks", ["react hook", "hooks in React", "teach me react hooks"]),
+    ("Linear algebra", ["linear algebra basics", "Introduction to linear algebra", "learn linear algebra"]),
+    ("Python decorators", ["decorators in python", "what are python decorators", "python decorator"]),
+    ("Docker containers", ["docker container", "containers with Docker", "teach me docker containers"]),
+    ("Git branching", ["git branching", "branching in git", "how to do git branching"]),
+    ("Data structures and algorithms", ["algorithms and data structures", "data structure and algorithm",
+                                        "learn data structures & algorithms"]),
+    ("Object oriented programming in Java", ["java object oriented programming", "OOP in Java",
+                                             "object-oriented Java"]),
+    ("Organic chemistry", ["intro to organic chemistry", "organic chem", "organic chemistry basics"]),
+    ("Calculus", ["intro to calculus", "calculus basics", "teach me calculus"]),
+    ("Data structures in C", ["C data structures", "data structures in the C language"]),
+]
+# Close to a cached topic but a different course: should not hit
+NEGATIVES = [
+    "Python dictionaries", "python list comprehension", "SQL window functions", "deep learning",
+    "async javascript", "React context", "abstract algebra", "kubernetes", "git rebase", "Java",
+    "Java generics", "inorganic chemistry", "JavaScript closures", "Docker networking", "python web scraping",
+    "machine vision", "graph algorithms",
+    # Near misses: a cached topic plus or minus one word
+    "Machine learning in python", "Data structures in Java", "Calculus 2", "Python decorators and generators",
+    "Linear algebra for machine learning",
+]
+FILLER_WORDS = (
+    "history economics calculus statistics physics biology music theory painting photography cooking finance "
+    "accounting marketing design rust golang haskell kotlin swift networking security cryptography compilers "
+    "databases robotics astronomy geology poetry writing spanish french german japanese chess guitar piano"
+).split()
+THRESHOLDS = (0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95)
+
+
+def _outline(topic):
+    return [{"title": f"{topic} {i}", "summary": "..."} for i in range(1, 6)]
+
+
+def accuracy(cache):
+    """Per threshold: share of paraphrases served their group's outline, and of negatives served anything."""
+    for topic, _ in GROUPS:
+        cache.add(topic, _outline(topic))
+
+    hits = []  # (similarity, correct) for each paraphrase's best match
+    for topic, paraphrases in GROUPS:
+        for query in paraphrases:
+            hit = cache.lookup(query, threshold=-1.0)
+            hits.append((hit.similarity, hit.topic == topic) if hit else (0.0, False))
+    negatives = []
+    for query in NEGATIVES:
+        hit = cache.lookup(query, threshold=-1.0)
+        negatives.append(hit.similarity if hit else 0.0)
+
+    report = {}
+    for threshold in THRESHOLDS:
+        served = [correct for similarity, correct in hits if similarity >= threshold]
+        report[str(threshold)] = {
+            "recall": round(sum(served) / len(hits), 3),
+            "wrong_outline": round((len(served) - sum(served)) / len(hits), 3),
+            "false_hits": round(sum(s >= threshold for s in negatives) / len(negatives), 3),
+        }
+    missed = [q for (topic, qs) in GROUPS for q in qs if cache.lookup(q) is None]
+    false_hits = [q for q in NEGATIVES if cache.lookup(q) is not None]
+    return report, missed, false_hits
+
+
+def latency(cache, size, lookups, rng):
+    """Time to load the index from disk, and per-lookup latency, with `size` cached topics."""
+    while cache.size() < size:
+        topic = " ".join(rng.sample(FILLER_WORDS, rng.randint(2, 4)))
+        cache.add(topic, _outline(topic))
+
+    fresh = OutlineCache(path=cache.path, max_entries=0)  # a new process reading the persisted index
+    start = time.perf_counter()
+    fresh.lookup("warm up")
+    load_ms = (time.perf_counter() - start) * 1000
+
+    queries = [q for _, qs in GROUPS for q in qs] + NEGATIVES
+    timings = []
+    for i in range(lookups):
+        start = time.perf_counter()
+        fresh.lookup(queries[i % len(queries)])
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return {
+        "entries": fresh.size(),
+        "load_ms": round(load_ms, 1),
+        "lookup_p50_us": round(statistics.median(timings), 1),
+        "lookup_p99_us": round(timings[int(len(timings) * 0.99) - 1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outline cache recall and lookup latency.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="list paraphrases missed and negatives hit")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = OutlineCache(path=os.path.join(tmp, "cache.db"), max_entries=0)
+        report, missed, false_hits = accuracy(cache)
+        rng = random.Random(args.seed)
+        sizes = [latency(cache, size, args.lookups, rng) for size in sorted(args.sizes)]
+
+    result = {"threshold": OUTLINE_CACHE_THRESHOLD, "accuracy": report, "latency": sizes}
+    if args.verbose:
+        result["missed"] = {q: normalize_topic(q) for q in missed}
+        result["false_hits"] = {q: normalize_topic(q) for q in false_hits}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# backend/benchmarks/bench_quiz_json.py
+#
+# Recovery and worst-case timing of the JSON quiz extractor. Random
+# LLM-style quiz outputs (fences, prose, <think> blocks, trailing commas,
+# single quotes, Python literals, bare keys, truncation, broken objects) are
+# fed to robust_parse_mcqs and to the original regex implementation (kept
+# verbatim below), counting the intact objects each recovers; both are then
+# timed on adversarial inputs of growing size. backend/tests/test_quiz_json.py
+# runs the same generator and requires an exact match.
+#
+#   python -m backend.benchmarks.bench_quiz_json --docs 3000
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Dict, List
+
+from backend.utils.quiz_parser import robust_parse_mcqs
+
+
+def legacy_robust_parse_mcqs(text: str):
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
+    json_match = re.search(r"```json\s*(.*?)\s*```", text, re.DOTALL)
+    if json_match:
+        text = json_match.group(1)
+    array_match = re.search(r"\[\s*{.*?}\s*\]", text, re.DOTALL)
+    if array_match:
+        text = array_match.group(0)
+    text = re.sub(r",\s*([\]}])", r"\1", text)
+    text = re.sub(r",\s*\]", "]", text)
+    try:
+        return json.loads(text)
+    except Exception:
+        return []
+
+
+WORDS = "python loop list dict tuple function class scope recursion index value key".split()
+# Contents that break naive regex repairs or string tracking
+TRICKY = ['", ]', "it's", "a } b", "[x]", "{y}", 'say "hi"', "back\\slash", "tab\there", "line\nbreak", "“smart”"]
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(n)]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(TRICKY))
+    return " ".join(words)
+
+
+def make_mcq(rng: random.Random) -> Dict:
+    options = [_sentence(rng, rng.randint(1, 4)) for _ in range(4)]
+    return {"question": _sentence(rng, rng.randint(3, 10)) + "?", "options": options, "answer": rng.choice(options)}
+
+
+def _py_string(value: str) -> str:
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n") + "'"
+
+
+def render(mcq: Dict, rng: random.Random) -> str:
+    """One MCQ object as an LLM might write it, with repairable defects."""
+    style = rng.random()
+    if style < 0.5:
+        return json.dumps(mcq, ensure_ascii=rng.random() < 0.5)
+    if style < 0.7:
+        text = json.dumps(mcq, indent=2)
+        return text[:-2] + ",\n}" if rng.random() < 0.5 else text.replace('"\n  ]', '",\n  ]')
+    if style < 0.85:
+        opts = ", ".join(_py_string(o) for o in mcq["options"])
+        return f"{{'question': {_py_string(mcq['question'])}, 'options': [{opts}], 'answer': {_py_string(mcq['answer'])}, 'checked': True}}"
+    opts = ", ".join(json.dumps(o) for o in mcq["options"])
+    return f"{{question: {json.dumps(mcq['question'])}, options: [{opts},], answer: {json.dumps(mcq['answer'])}, hint: None}}"
+
+
+BROKEN = ['{"question": "oops" "options": []}', "{,}", '{"question": }', "{'a' 'b'}"]
+
+
+def make_output(rng: random.Random):
+    """Returns (text, intact objects a correct extractor must recover)."""
+    mcqs = [make_mcq(rng) for _ in range(rng.randint(1, 8))]
+    items, expected = [], []
+    for mcq in mcqs:
+        if rng.random() < 0.1:
+            items.append(rng.choice(BROKEN))
+        items.append(render(mcq, rng))
+        expected.append(mcq)
+    body = "[" + rng.choice([",", ", ", ",\n"]).join(items) + rng.choice(["]", ",]", ",\n]"])
+
+    if rng.random() < 0.15:
+        # Truncated mid-object: everything before the last object survives
+        cut = body.rfind(items[-1])
+        body = body[:cut + rng.randint(1, max(1, len(items[-1]) - 2))]
+        expected = expected[:-1]
+    if rng.random() < 0.4:
+        body = "```json\n" + body + ("\n```" if rng.random() < 0.8 else "")
+    prefix = rng.choice(["", "Here's your quiz: ", "Sure! I'd pick [these] {questions}:\n", "<think>maybe [{\"no\": 1}]</think>"])
+    suffix = rng.choice(["", "\nLet me know if you'd like more!", " [1] see above"])
+    return prefix + body + suffix, expected
+
+
+def _strip(mcq: Dict) -> Dict:
+    return {k: mcq[k] for k in ("question", "options", "answer") if k in mcq}
+
+
+def adversarial_inputs(n: int) -> Dict[str, str]:
+    return {
+        "open_object_array": "[{" * n,
+        "unclosed_arrays": "[ { " + "[" * n,
+        "many_small_arrays": "[{}] " * n,
+        "long_string": '[{"question": "' + "x, ]" * n + '"}]',
+        "unterminated_strings": '[{"a": "' * n,
+        "closing_flood": "[" * n + "}" * n,
+    }
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=3000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    recovered = expected_total = legacy_recovered = 0
+    for _ in range(args.docs):
+        text, expected = make_output(rng)
+        recovered += sum(1 for obj in robust_parse_mcqs(text) if _strip(obj) in expected)
+        expected_total += len(expected)
+        legacy = legacy_robust_parse_mcqs(text)
+        if isinstance(legacy, list):
+            legacy_recovered += sum(1 for obj in legacy if isinstance(obj, dict) and _strip(obj) in expected)
+
+    worst_case = {}
+    for name in adversarial_inputs(1):
+        worst_case[name] = {}
+        for size in args.sizes:
+            text = adversarial_inputs(size)[name]
+            worst_case[name][len(text)] = {
+                "legacy_ms": round(best_of(lambda: legacy_robust_parse_mcqs(text), args.repeat) * 1000, 3),
+                "scanner_ms": round(best_of(lambda: robust_parse_mcqs(text), args.repeat) * 1000, 3),
+            }
+
+    print(json.dumps({
+        "benchmark": "quiz_json",
+        "docs": args.docs,
+        "objects_expected": expected_total,
+        "objects_recovered": recovered,
+        "legacy_objects_recovered": legacy_recovered,
+        "worst_case": worst_case,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
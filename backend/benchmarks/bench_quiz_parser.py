@@ -0,0 +1,177 @@
+# backend/benchmarks/bench_quiz_parser.py
+#
+# Throughput of the Q/A-format MCQ parser against the original regex parser
+# (kept verbatim below) on generated LLM outputs. The same corpus generator
+# drives backend/tests/test_quiz_parser.py, which checks that parse_mcqs and
+# MCQStreamParser agree with the original.
+#
+#   python -m backend.benchmarks.bench_quiz_parser --docs 2000
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Dict, List
+
+from backend.utils.quiz_parser import MCQStreamParser, parse_mcqs
+
+
+def legacy_parse_mcqs(text: str) -> List[Dict]:
+    mcqs = []
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
+    q_blocks = re.split(r"\n\s*(?=Q\d+[\):])", text)
+    for block in q_blocks:
+        lines = [l.strip() for l in block.splitlines() if l.strip()]
+        if not lines or not re.match(r"^Q\d+[\):]", lines[0]):
+            continue
+        q_line = lines[0]
+        question = re.sub(r"^Q\d+[\):]\s*", "", q_line)
+        if not question:
+            if len(lines) > 1 and not re.match(r"^[A-Za-z][\)\.:\-]", lines[1]):
+                question = lines[1]
+                lines = [lines[0]] + lines[2:]
+        options = {}
+        answer = None
+        for line in lines[1:]:
+            opt_match = re.match(r"^([A-Za-z])[\)\.:\-]?\s*(.*)$", line)
+            if opt_match:
+                key = opt_match.group(1).upper()
+                val = opt_match.group(2).strip()
+                options[key] = val
+                continue
+            ans_match = re.match(r"^Answer\s*[:\-]?\s*(.*)$", line, re.IGNORECASE)
+            if ans_match:
+                raw_ans = ans_match.group(1).strip()
+                if re.fullmatch(r"[A-Za-z]", raw_ans):
+                    answer = raw_ans.upper()
+                elif re.match(r"^[A-Za-z][\)\.:\-]?", raw_ans):
+                    answer = raw_ans[0].upper()
+                else:
+                    for k, v in options.items():
+                        if raw_ans.lower() in v.lower() or v.lower() in raw_ans.lower():
+                            answer = k
+                            break
+        if not answer and options:
+            for k, v in options.items():
+                if 'correct' in v.lower() or 'right' in v.lower():
+                    answer = k
+                    break
+        if question and len(options) >= 2 and answer in options:
+            sorted_keys = sorted(options.keys(), key=lambda x: ord(x))
+            opts = [options[k] for k in sorted_keys]
+            answer_text = options[answer]
+            mcqs.append({
+                "question": question,
+                "options": opts,
+                "answer": answer_text
+            })
+    return mcqs
+
+
+WORDS = "python loop list dict tuple function class variable scope recursion index value key".split()
+DELIMS = [")", ".", ":", "-", "", ") "]
+NOISE_LINES = [
+    "Here are your questions:",
+    "Explanation: the correct answer follows from the definition.",
+    "---",
+    "   ",
+    "Note: right answers are marked.",
+    "1234",
+    "* bullet",
+]
+WHITESPACE = [" ", "\t", "\r", "\x0b", "\x0c", " ", " "]
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def make_output(rng: random.Random) -> str:
+    """One synthetic LLM response, mixing well-formed and broken MCQ blocks."""
+    parts = []
+    if rng.random() < 0.4:
+        parts.append("<think>" + _sentence(rng, rng.randint(5, 60)) + "\nQ9) fake\n</THINK>")
+    if rng.random() < 0.5:
+        parts.append(rng.choice(NOISE_LINES))
+    for qn in range(1, rng.randint(2, 8)):
+        lead = rng.choice(["", "", " ", "\n", rng.choice(WHITESPACE)])
+        header = f"{lead}Q{qn}{rng.choice([')', ':', ')', '.'])}"
+        if rng.random() < 0.85:
+            header += " " + _sentence(rng, rng.randint(3, 12)) + "?"
+        parts.append(header)
+        if not header.strip().endswith("?") and rng.random() < 0.5:
+            parts.append(_sentence(rng, 6) + "?")
+        letters = list("ABCD") if rng.random() < 0.8 else rng.sample("ABCDEFG", rng.randint(1, 5))
+        for letter in letters:
+            text = _sentence(rng, rng.randint(1, 6))
+            if rng.random() < 0.1:
+                text += " (correct)"
+            parts.append(f"{rng.choice(['', ' '])}{letter if rng.random() < 0.9 else letter.lower()}{rng.choice(DELIMS)} {text}")
+        answer = rng.choice([rng.choice(letters), f"{rng.choice(letters)})", _sentence(rng, 2), ""])
+        parts.append(f"{rng.choice(['Answer', 'answer', 'ANSWER'])}{rng.choice([':', ' -', '', ': '])} {answer}")
+        if rng.random() < 0.3:
+            parts.append(rng.choice(NOISE_LINES))
+        if rng.random() < 0.1:
+            parts.append("<think>unfinished " + _sentence(rng, 4))
+    sep = rng.choice(["\n", "\n", "\r\n", "\n\n", "\n \n"])
+    return sep.join(parts)
+
+
+def stream_parse(text: str, rng: random.Random) -> List[Dict]:
+    parser = MCQStreamParser()
+    out = []
+    i = 0
+    while i < len(text):
+        step = rng.randint(1, 40)
+        out.extend(parser.feed(text[i:i + step]))
+        i += step
+    out.extend(parser.close())
+    return out
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [make_output(rng) for _ in range(args.docs)]
+
+    total_bytes = sum(len(t.encode("utf-8")) for t in corpus)
+    chunked = [[t[i:i + 16] for i in range(0, len(t), 16)] for t in corpus]
+
+    def run_stream():
+        for chunks in chunked:
+            p = MCQStreamParser()
+            for c in chunks:
+                p.feed(c)
+            p.close()
+
+    legacy = best_of(lambda: [legacy_parse_mcqs(t) for t in corpus], args.repeat)
+    batch = best_of(lambda: [parse_mcqs(t) for t in corpus], args.repeat)
+    stream = best_of(run_stream, args.repeat)
+
+    print(json.dumps({
+        "benchmark": "quiz_parser",
+        "docs": args.docs,
+        "mcqs": sum(len(legacy_parse_mcqs(t)) for t in corpus),
+        "legacy_mb_per_s": round(total_bytes / legacy / 1e6, 2),
+        "parse_mcqs_mb_per_s": round(total_bytes / batch / 1e6, 2),
+        "stream_16b_chunks_mb_per_s": round(total_bytes / stream / 1e6, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
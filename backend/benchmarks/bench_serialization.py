@@ -0,0 +1,248 @@
+# backend/benchmarks/bench_serialization.py
+#
+# Response serialization cost for a 30-course library. Database calls are
+# replaced by in-memory rows, so only the route handler and response
+# rendering are timed:
+#   - legacy: the previous handlers (kept verbatim below), which build
+#     CourseOut models / plain dicts that FastAPI validates again through
+#     response_model before serializing;
+#   - fast: the current handlers, which shape rows with the CourseOut
+#     projector and render them with FastJSONResponse.
+# Both are served by a FastAPI app over an in-process ASGI client; the
+# responses must be identical JSON. The render step alone is timed as well.
+#
+#   python -m backend.benchmarks.bench_serialization --courses 30 --repeat 20
+
+import os
+
+# Placeholders so the app modules import without a .env; nothing connects
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from pydantic import TypeAdapter
+
+import backend.routers.courses as courses
+from backend.models.schemas import CourseOut
+from backend.utils.fast_json import dumps, orjson
+
+WORDS = "python loop list dict tuple function class scope recursion index value key async await".split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_library(n_courses: int, lessons_per_course: int, seed: int):
+    rng = random.Random(seed)
+    library = []
+    for c in range(n_courses):
+        course_id = f"course-{c}"
+        lessons, videos, quizzes = [], [], []
+        for l in range(lessons_per_course):
+            lesson_id = f"{course_id}-lesson-{l}"
+            lessons.append({
+                "id": lesson_id, "course_id": course_id, "title": _text(rng, 5), "summary": _text(rng, 15),
+                "content_hash": f"{c:04x}{l:04x}", "created_at": "2025-01-01T00:00:00+00:00",
+                "content": "# " + _text(rng, 6) + "\n\n" + _text(rng, 1200),
+            })
+            for position in range(3):
+                videos.append({
+                    "id": f"{lesson_id}-v{position}", "course_id": course_id, "lesson_id": lesson_id,
+                    "video_id": f"vid{c}{l}{position}", "title": _text(rng, 8), "description": _text(rng, 40),
+                    "thumbnail": "https://i.ytimg.com/vi/x/hqdefault.jpg", "url": "https://www.youtube.com/watch?v=x",
+                    "channel": "Channel", "views": rng.randint(1000, 10 ** 7), "duration": rng.randint(60, 3600),
+                    "published_at": "2021-05-01T00:00:00Z",
+                })
+            quizzes.append({
+                "id": f"{lesson_id}-quiz", "course_id": course_id, "lesson_id": lesson_id,
+                "title": "Quiz", "lesson_title": lessons[-1]["title"], "created_at": "2025-01-01T00:00:00+00:00",
+                "questions": [
+                    {"question": _text(rng, 12) + "?", "options": [_text(rng, 4) for _ in range(4)], "answer": "a"}
+                    for _ in range(5)
+                ],
+            })
+        library.append({
+            "course": {"id": course_id, "user_id": "user-1", "title": _text(rng, 4), "description": _text(rng, 12),
+                       "created_at": "2025-01-01T00:00:00+00:00"},
+            "lessons": lessons, "videos": videos, "quizzes": quizzes,
+        })
+    return library
+
+
+def patch_database(library) -> None:
+    by_id = {entry["course"]["id"]: entry for entry in library}
+
+    async def list_courses(user_id=None):
+        return [entry["course"] for entry in library]
+
+    async def get_course(course_id):
+        return by_id[course_id]["course"]
+
+    contents = {lesson["id"]: lesson["content"] for entry in library for lesson in entry["lessons"]}
+
+    async def get_lessons_by_course_id(course_id):
+        return [{k: v for k, v in lesson.items() if k != "content"} for lesson in by_id[course_id]["lessons"]]
+
+    async def hydrate_lesson_content(lessons):
+        for lesson in lessons:
+            lesson["content"] = contents[lesson["id"]]
+        return lessons
+
+    async def get_videos_by_course_id(course_id):
+        return by_id[course_id]["videos"]
+
+    async def get_quizzes_by_course_id(course_id):
+        return by_id[course_id]["quizzes"]
+
+    async def get_courses_children(course_ids):
+        return {
+            course_id: {
+                "lessons": await get_lessons_by_course_id(course_id),
+                "videos": await get_videos_by_course_id(course_id),
+                "quizzes": await get_quizzes_by_course_id(course_id),
+            }
+            for course_id in course_ids
+        }
+
+    for fn in (list_courses, get_course, get_lessons_by_course_id, hydrate_lesson_content,
+               get_videos_by_course_id, get_quizzes_by_course_id, get_courses_children):
+        setattr(courses, fn.__name__, fn)
+
+
+# --- Previous handlers, verbatim apart from the route paths ---
+
+legacy = FastAPI()
+
+
+@legacy.get("/courses/", response_model=List[CourseOut])
+async def legacy_read_all(user_id: str = None):
+    if user_id:
+        course_rows = await courses.list_courses(user_id=user_id)
+    else:
+        course_rows = await courses.list_courses()
+
+    result = []
+    for course in course_rows:
+        lessons = await courses.hydrate_lesson_content(await courses.get_lessons_by_course_id(course["id"]))
+        videos = await courses.get_videos_by_course_id(course["id"])
+        quizzes = await courses.get_quizzes_by_course_id(course["id"])
+        result.append({
+            **course,
+            "lessons": lessons,
+            "videos": videos,
+            "quizzes": quizzes,
+        })
+    return result
+
+
+@legacy.get("/courses/{course_id}", response_model=CourseOut)
+async def legacy_read_course(course_id: str):
+    course = await courses.get_course(course_id)
+    lessons = await courses.hydrate_lesson_content(await courses.get_lessons_by_course_id(course_id))
+    videos = await courses.get_videos_by_course_id(course_id)
+    quizzes = await courses.get_quizzes_by_course_id(course_id)
+
+    return CourseOut(
+        id=course["id"],
+        user_id=course["user_id"],
+        title=course["title"],
+        description=course["description"],
+        lessons=lessons,
+        videos=videos,
+        quizzes=quizzes,
+    )
+
+
+fast = FastAPI()
+fast.include_router(courses.router)
+
+
+async def time_requests(app, paths: List[str], repeat: int):
+    transport = httpx.ASGITransport(app=app)
+    timings = {path: [] for path in paths}
+    bodies = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(repeat):
+            for path in paths:
+                start = time.perf_counter()
+                response = await client.get(path, params={"user_id": "user-1"} if path == "/courses/" else None)
+                timings[path].append(time.perf_counter() - start)
+                response.raise_for_status()
+                bodies[path] = response.content
+    return timings, bodies
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=30)
+    parser.add_argument("--lessons", type=int, default=8, help="lessons per course")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    library = make_library(args.courses, args.lessons, args.seed)
+    patch_database(library)
+    paths = ["/courses/", f"/courses/{library[0]['course']['id']}"]
+
+    legacy_timings, legacy_bodies = asyncio.run(time_requests(legacy, paths, args.repeat))
+    fast_timings, fast_bodies = asyncio.run(time_requests(fast, paths, args.repeat))
+    for path in paths:
+        if json.loads(legacy_bodies[path]) != json.loads(fast_bodies[path]):
+            raise SystemExit(f"Responses differ for {path}")
+
+    # Render step alone, for the whole library with lesson content included
+    rows = [{**e["course"], "lessons": e["lessons"], "videos": e["videos"], "quizzes": e["quizzes"]} for e in library]
+    adapter = TypeAdapter(List[CourseOut])
+
+    def legacy_render():
+        # response_model validation, then pydantic's own JSON dump (the
+        # cheapest path FastAPI takes; older versions add jsonable_encoder)
+        adapter.dump_json(adapter.validate_python(rows))
+
+    def fast_render():
+        dumps([courses.course_view(row) for row in rows])
+
+    report = {
+        "benchmark": "serialization",
+        "courses": args.courses,
+        "lessons_per_course": args.lessons,
+        "encoder": "orjson" if orjson is not None else "json",
+        "library_bytes": len(fast_bodies["/courses/"]),
+
+        "identical_responses": True,
+        "render_only_ms": {
+            "legacy": round(best_of(legacy_render, args.repeat) * 1000, 2),
+            "fast": round(best_of(fast_render, args.repeat) * 1000, 2),
+        },
+        "requests_ms": {
+            path: {
+                "legacy_median": round(statistics.median(legacy_timings[path]) * 1000, 2),
+                "fast_median": round(statistics.median(fast_timings[path]) * 1000, 2),
+            }
+            for path in paths
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# backend/benchmarks/bench_startup.py
+#
+# Cold-start budget for autoscaled workers. Each run is a fresh interpreter:
+#   1. `python -X importtime -c "import backend.main"`: total import time of
+#      the app plus the slowest modules (cumulative and self time);
+#   2. time from interpreter start to the first successful GET /health, with
+#      lifespan startup included. This uses uvicorn on a free port when it is
+#      installed, and an in-process ASGI client otherwise.
+# Exits non-zero when a median exceeds its budget.
+#
+#   python -m backend.benchmarks.bench_startup --runs 5 --import-budget-ms 900 --health-budget-ms 2500
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Placeholders so the app imports without a .env; no client connects during startup
+DUMMY_ENV = {
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_SERVICE_ROLE_KEY": "benchmark",
+    "LLM_URL": "http://127.0.0.1:9/api/generate",
+    "LLM_MODEL": "benchmark",
+    "YOUTUBE_API_KEY": "benchmark",
+    "TRACE_EXPORTER": "none",
+}
+
+# Prints the wall-clock time of the first /health response; lifespan shutdown
+# (and anything it waits for) happens after and is not counted.
+ASGI_HEALTH_SCRIPT = """
+import time, asyncio
+import httpx
+from backend.main import app
+
+async def main():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health")
+            response.raise_for_status()
+            print(time.time(), flush=True)
+
+asyncio.run(main())
+"""
+
+
+def _env(cache_dir: str) -> dict:
+    env = {**DUMMY_ENV, **os.environ}
+    env["LOCAL_CACHE_PATH"] = os.path.join(cache_dir, "cache.db")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_imports(env: dict):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    total_us = None
+    for line in result.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, name = int(m.group(1)), int(m.group(2)), len(m.group(3)), m.group(4)
+        modules.append((name, self_us, cumulative_us, indent))
+        if name == "backend.main":
+            total_us = cumulative_us
+    return total_us / 1000 if total_us else None, modules
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_health_uvicorn(env: dict, timeout: float = 30.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("uvicorn did not answer /health in time")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def measure_health_asgi(env: dict) -> float:
+    start = time.time()
+    result = subprocess.run([sys.executable, "-c", ASGI_HEALTH_SCRIPT], env=env, capture_output=True, text=True, check=True)
+    return (float(result.stdout.split()[-1]) - start) * 1000
+
+
+def _has_uvicorn() -> bool:
+    try:
+        import uvicorn  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to report")
+    parser.add_argument("--server", choices=["auto", "uvicorn", "asgi"], default="auto")
+    parser.add_argument("--import-budget-ms", type=float, default=None)
+    parser.add_argument("--health-budget-ms", type=float, default=None)
+    parser.add_argument("--cache-dir", default=".skillmint/bench_startup")
+    args = parser.parse_args()
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    env = _env(args.cache_dir)
+    server = args.server
+    if server == "auto":
+        server = "uvicorn" if _has_uvicorn() else "asgi"
+    measure_health = measure_health_uvicorn if server == "uvicorn" else measure_health_asgi
+
+    import_ms, health_ms = [], []
+    modules = []
+    for _ in range(args.runs):
+        total, modules = measure_imports(env)
+        import_ms.append(total)
+        health_ms.append(measure_health(env))
+
+    by_cumulative = sorted(modules, key=lambda m: m[2], reverse=True)
+    by_self = sorted(modules, key=lambda m: m[1], reverse=True)
+    report = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "server": server,
+        "import_backend_main_ms": {"median": round(statistics.median(import_ms), 1), "min": round(min(import_ms), 1)},
+        "first_health_ms": {"median": round(statistics.median(health_ms), 1), "min": round(min(health_ms), 1)},
+        "slowest_cumulative_ms": {name: round(cum / 1000, 1) for name, _, cum, _ in by_cumulative[:args.top]},
+        "slowest_self_ms": {name: round(own / 1000, 1) for name, own, _, _ in by_self[:args.top]},
+        "backend_modules_ms": {
+            name: round(cum / 1000, 1) for name, _, cum, _ in by_cumulative if name.startswith("backend.")
+        },
+    }
+
+    failures = []
+    if args.import_budget_ms is not None and report["import_backend_main_ms"]["median"] > args.import_budget_ms:
+        failures.append(f"import median {report['import_backend_main_ms']['median']}ms > {args.import_budget_ms}ms")
+    if args.health_budget_ms is not None and report["first_health_ms"]["median"] > args.health_budget_ms:
+        failures.append(f"first /health median {report['first_health_ms']['median']}ms > {args.health_budget_ms}ms")
+    report["budget_ok"] = not failures
+
+    print(json.dumps(report, indent=2))
+    if failures:
+        raise SystemExit("Startup budget exceeded: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
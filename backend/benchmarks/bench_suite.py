@@ -0,0 +1,306 @@
+# backend/benchmarks/bench_suite.py
+#
+# Regression guard for the parsing and filtering hot paths. Every case runs a
+# seeded corpus of realistic inputs (including large, noisy LLM outputs with
+# <think> blocks, prose and broken items) through one function:
+#   outline_parser    course_pipeline.parse_outline_to_lessons
+#   mcq_parser        quiz_parser.parse_mcqs
+#   mcq_json          quiz_parser.robust_parse_mcqs
+#   mcq_validation    course_pipeline.validate_mcqs
+#   video_ranking     youtube_service.rank_videos (dedupe, filters, sort)
+#   normalize_title   youtube_service.normalize_title
+#   iso_duration      youtube_service.parse_iso_duration
+#   serialize         supabase_service.serialize
+# and reports the best and median time per input over --repeat passes as JSON.
+# A run fails (exit 1) when a case's median exceeds its budget in
+# budgets.json, or regresses by more than --max-regression against a
+# --baseline report from an earlier run.
+#
+#   python -m backend.benchmarks.bench_suite --out bench.json
+#   python -m backend.benchmarks.bench_suite --baseline bench.json --max-regression 0.25
+
+import os
+
+# Placeholders so the service modules import without a .env; nothing connects
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+os.environ.setdefault("TRACE_EXPORTER", "none")
+
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from backend.benchmarks import bench_quiz_json, bench_quiz_parser
+from backend.models.schemas import Lesson, MCQ, VideoItem
+from backend.services.course_pipeline import parse_outline_to_lessons, validate_mcqs
+from backend.services.supabase_service import serialize
+from backend.services.youtube_service import normalize_title, parse_iso_duration, rank_videos
+from backend.utils.quiz_parser import parse_mcqs, robust_parse_mcqs
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "budgets.json")
+
+WORDS = (
+    "python loop list dict tuple function class scope recursion index value key async await "
+    "join query table index schema branch commit merge container volume network hook state"
+).split()
+TOPICS = ["Control Flow in Python", "SQL: Joins and Subqueries", "Git Branching", "React Hooks", "Docker Volumes"]
+CHANNELS = ["Corey Schafer", "freeCodeCamp.org", "Daily Dev", "Learn Fast", "Tech Talks", "Programming with Mosh"]
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _think(rng: random.Random, words: int) -> str:
+    return "<think>" + _sentence(rng, words) + "\n1. **Not a lesson**\n- scratch\n</think>\n"
+
+
+# --- Fixtures ---
+
+def outline_outputs(rng: random.Random, docs: int) -> List[str]:
+    """Outlines in the three formats the parser accepts, with reasoning, prose and stray lines."""
+    outputs = []
+    for d in range(docs):
+        lines = []
+        if rng.random() < 0.6:
+            lines.append(_think(rng, rng.randint(50, 1500)))
+        lines.append(rng.choice(["Here is your course outline:", "## Course Outline", ""]))
+        for i in range(1, rng.randint(3, 30)):
+            title, summary = _sentence(rng, rng.randint(2, 6)).title(), _sentence(rng, rng.randint(6, 20))
+            style = rng.random()
+            if style < 0.35:
+                lines += [f"{i}. **{title}**", f"- {summary}"]
+            elif style < 0.7:
+                lines.append(f"{i}. {title}: {summary}")
+            else:
+                lines += [f"Lesson {i}. {title}", summary, ""]
+            if rng.random() < 0.1:
+                lines.append(rng.choice(["---", "Note: lessons build on each other.", "* optional reading"]))
+        if rng.random() < 0.3:
+            lines.append("Let me know if you want more lessons!")
+        outputs.append("\n".join(lines))
+    return outputs
+
+
+def qa_outputs(rng: random.Random, docs: int) -> List[str]:
+    """Q/A-format quiz outputs; one in ten is a long response of many concatenated blocks."""
+    outputs = [bench_quiz_parser.make_output(rng) for _ in range(docs)]
+    for i in range(0, docs, 10):
+        outputs[i] = _think(rng, 2000) + "\n".join(bench_quiz_parser.make_output(rng) for _ in range(20))
+    return outputs
+
+
+def json_outputs(rng: random.Random, docs: int) -> List[str]:
+    """JSON-array quiz outputs with repairable defects; one in ten wrapped in a long reasoning block."""
+    outputs = [bench_quiz_json.make_output(rng)[0] for _ in range(docs)]
+    for i in range(0, docs, 10):
+        outputs[i] = _think(rng, 3000) + outputs[i]
+    return outputs
+
+
+def parsed_quizzes(rng: random.Random, docs: int) -> List[List[Dict[str, Any]]]:
+    """Parser output as validate_mcqs sees it: mostly good, some duplicates, short option lists and wrong answers."""
+    quizzes = []
+    for _ in range(docs):
+        items = []
+        for _ in range(rng.randint(3, 10)):
+            mcq = bench_quiz_json.make_mcq(rng)
+            defect = rng.random()
+            if defect < 0.1 and items:
+                mcq = dict(items[-1])
+            elif defect < 0.2:
+                mcq["options"] = mcq["options"][:2] + ["", None]
+            elif defect < 0.3:
+                mcq["answer"] = "not an option"
+            elif defect < 0.35:
+                mcq = {"question": mcq["question"]}
+            items.append(mcq)
+        quizzes.append(items)
+    return quizzes
+
+
+def video_candidates(rng: random.Random, docs: int) -> List[tuple]:
+    """(details, query) per search: 50 candidates with duplicate titles, short and low-view videos."""
+    batches = []
+    for _ in range(docs):
+        query = rng.choice(TOPICS)
+        details = []
+        for i in range(50):
+            if details and rng.random() < 0.1:
+                title = details[-1]["title"].upper() + " "
+            elif rng.random() < 0.7:
+                title = f"{query} {_sentence(rng, rng.randint(1, 6))} Tutorial"
+            else:
+                title = _sentence(rng, rng.randint(3, 10)).title()
+            details.append({
+                "video_id": f"v{rng.getrandbits(40):x}", "title": title,
+                "description": f"{query} " * rng.randint(0, 2) + _sentence(rng, rng.randint(20, 150)),
+                "thumbnail": "https://i.ytimg.com/vi/x/hqdefault.jpg", "channel": rng.choice(CHANNELS),
+                "views": rng.choice([rng.randint(0, 9_999), rng.randint(10_000, 9_000_000)]),
+                "duration": rng.choice([rng.randint(10, 290), rng.randint(300, 7200)]),
+                "publishedAt": f"20{rng.randint(12, 25)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T00:00:00Z",
+            })
+        batches.append((details, query))
+    return batches
+
+
+def video_titles(rng: random.Random, docs: int) -> List[str]:
+    decorations = ["", " 🔥", " | Full Course", " — Part 2", " (2024)", " ✅✅", "  Über Ñandú Café  "]
+    return [_sentence(rng, rng.randint(3, 14)).title() + rng.choice(decorations) for _ in range(docs)]
+
+
+def iso_durations(rng: random.Random, docs: int) -> List[str]:
+    forms = [
+        lambda: f"PT{rng.randint(1, 59)}M{rng.randint(0, 59)}S",
+        lambda: f"PT{rng.randint(1, 10)}H{rng.randint(0, 59)}M",
+        lambda: f"PT{rng.randint(1, 59)}S",
+        lambda: f"P{rng.randint(1, 3)}DT{rng.randint(0, 23)}H{rng.randint(0, 59)}M{rng.randint(0, 59)}S",
+        lambda: "P0D",
+        lambda: rng.choice(["", "garbage", "PT", "1:02:03"]),
+    ]
+    return [rng.choice(forms)() for _ in range(docs)]
+
+
+def course_lessons(rng: random.Random, docs: int) -> List[List[Lesson]]:
+    """Lesson models as the pipeline hands them to create_course."""
+    courses = []
+    for _ in range(docs):
+        lessons = []
+        for i in range(rng.randint(3, 15)):
+            videos = [VideoItem(
+                video_id=f"v{i}{k}", title=_sentence(rng, 8), description=_sentence(rng, 40),
+                thumbnail="https://i.ytimg.com/vi/x/hqdefault.jpg", url="https://youtube.com/watch?v=x",
+                channel=rng.choice(CHANNELS), views=rng.randint(10_000, 10 ** 7), duration=rng.randint(300, 3600),
+            ) for k in range(3)]
+            quiz = [MCQ(question=_sentence(rng, 12), options=[_sentence(rng, 3) for _ in range(4)], answer="a")
+                    for _ in range(5)]
+            lessons.append(Lesson(id=f"lesson-{i}", title=_sentence(rng, 5), content=_sentence(rng, 1500),
+                                  videos=videos, quiz=quiz, summary=_sentence(rng, 15)))
+        courses.append(lessons)
+    return courses
+
+
+# --- Cases ---
+
+class Case(NamedTuple):
+    fixtures: Callable[[random.Random, int], List[Any]]
+    run: Callable[[Any], Any]
+    docs: int
+
+
+CASES: Dict[str, Case] = {
+    "outline_parser": Case(outline_outputs, parse_outline_to_lessons, 400),
+    "mcq_parser": Case(qa_outputs, parse_mcqs, 2000),
+    "mcq_json": Case(json_outputs, robust_parse_mcqs, 2000),
+    "mcq_validation": Case(parsed_quizzes, validate_mcqs, 2000),
+    "video_ranking": Case(video_candidates, lambda batch: rank_videos(batch[0], batch[1], 10), 200),
+    "normalize_title": Case(video_titles, normalize_title, 20000),
+    "iso_duration": Case(iso_durations, parse_iso_duration, 20000),
+    "serialize": Case(course_lessons, serialize, 100),
+}
+
+
+def measure(case: Case, seed: int, scale: float, repeat: int) -> Dict[str, Any]:
+    fixtures = case.fixtures(random.Random(seed), max(1, int(case.docs * scale)))
+    run = case.run
+    for item in fixtures[:50]:
+        run(item)
+    passes = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in fixtures:
+            run(item)
+        passes.append((time.perf_counter() - start) / len(fixtures))
+    return {
+        "inputs": len(fixtures),
+        "input_bytes": sum(len(f) for f in fixtures if isinstance(f, str)) or None,
+        "best_us": round(min(passes) * 1e6, 3),
+        "median_us": round(statistics.median(passes) * 1e6, 3),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def check(results: Dict[str, Dict], budgets: Dict[str, float], baseline: Optional[Dict], max_regression: float) -> List[str]:
+    violations = []
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if budget is not None and result["median_us"] > budget:
+            violations.append(f"{name}: median {result['median_us']}us exceeds budget {budget}us")
+        previous = (baseline or {}).get("cases", {}).get(name)
+        if previous and result["median_us"] > previous["median_us"] * (1 + max_regression):
+            violations.append(
+                f"{name}: median {result['median_us']}us is more than {max_regression:.0%} "
+                f"above the baseline {previous['median_us']}us"
+            )
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parsing and filtering micro-benchmarks with regression thresholds.")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default all): {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every case's corpus size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--budgets", default=BUDGETS_PATH, help="JSON of per-case median budgets in microseconds")
+    parser.add_argument("--baseline", default=None, help="report from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--out", default=None, help="also write the JSON report here")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        raise SystemExit(f"Unknown case(s) {', '.join(unknown)}; choose from {', '.join(CASES)}")
+
+    # Skipped-item warnings are part of the cost, but not worth printing
+    service_logger = logging.getLogger("uvicorn.error")
+    service_logger.addHandler(logging.NullHandler())
+    service_logger.propagate = False
+
+    results = {name: measure(CASES[name], args.seed, args.scale, args.repeat) for name in (args.cases or CASES)}
+
+    with open(args.budgets) as f:
+        budgets = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    violations = check(results, budgets, baseline, args.max_regression)
+
+    report = {
+        "benchmark": "suite",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "cases": results,
+        "violations": violations,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# backend/benchmarks/bench_video_filters.py
+#
+# Screening cost per candidate video: the compiled rule engine in
+# backend.utils.text_filters against the original per-keyword substring scans.
+#
+#   python -m backend.benchmarks.bench_video_filters --videos 5000
+
+import argparse
+import json
+import random
+import time
+
+from backend.utils.text_filters import VideoFilterEngine, is_relevant
+
+WORDS = (
+    "python loops functions classes recursion arrays pointers sql joins tutorial course lecture "
+    "explained example beginners advanced complete guide full crash data structures algorithms "
+    "calculus physics chemistry biology history machine learning neural networks statistics"
+).split()
+CHANNEL_NOISE = ["Daily Dev", "Learn Fast", "Tech Talks", "Random Uploads", "Study Hub", "Code Corner"]
+SPAM_NOISE = ["whatsapp +91 98765", "join our app now", "telegram: @study", "call now for classes"]
+QUERIES = [
+    "Control Flow in Python",
+    "Variables and Data Types in Python",
+    "SQL: Joins and Subqueries",
+    "Recursion in Data Structures",
+    "Neural Networks in Machine Learning",
+]
+
+
+def legacy_is_relevant(title, description, query):
+    required_keywords = query.lower().split()
+    content = f"{title} {description}".lower()
+    matches = sum(1 for kw in required_keywords if kw in content)
+    return matches >= max(1, len(required_keywords) // 2)
+
+
+def legacy_is_preferred(channel, preferred_channels):
+    return any(pc in channel.lower() for pc in preferred_channels)
+
+
+def legacy_is_spammy(description, spam_keywords):
+    desc = description.lower()
+    return any(keyword in desc for keyword in spam_keywords)
+
+
+def make_candidates(n, preferred_channels, seed=7):
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(n):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(4, 10))).title()
+        description = " ".join(rng.choices(WORDS, k=rng.randint(30, 120)))
+        if rng.random() < 0.1:
+            description += " " + rng.choice(SPAM_NOISE)
+        if rng.random() < 0.3:
+            channel = rng.choice(preferred_channels).title()
+        else:
+            channel = rng.choice(CHANNEL_NOISE)
+        candidates.append((title, description, channel, rng.choice(QUERIES)))
+    return candidates
+
+
+def run_legacy(candidates, preferred_channels, spam_keywords):
+    return [
+        (
+            legacy_is_relevant(title, description, query),
+            legacy_is_preferred(channel, preferred_channels),
+            legacy_is_spammy(description, spam_keywords),
+        )
+        for title, description, channel, query in candidates
+    ]
+
+
+def run_engine(candidates, engine):
+    return [
+        (
+            is_relevant(title, description, query),
+            engine.is_preferred_channel(channel),
+            engine.is_spammy(description),
+        )
+        for title, description, channel, query in candidates
+    ]
+
+
+def best_of(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--videos", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = VideoFilterEngine()
+    preferred = engine.preferred_channels.keywords
+    spam = engine.spam_keywords.keywords
+    candidates = make_candidates(args.videos, preferred)
+
+    legacy_time, legacy = best_of(lambda: run_legacy(candidates, preferred, spam), args.repeat)
+    engine_time, compiled = best_of(lambda: run_engine(candidates, engine), args.repeat)
+
+    if legacy != compiled:
+        mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+        raise SystemExit(f"Engine disagrees with legacy filters on {mismatches} candidates")
+
+    print(json.dumps({
+        "benchmark": "video_filters",
+        "videos": args.videos,
+        "legacy_seconds": round(legacy_time, 4),
+        "engine_seconds": round(engine_time, 4),
+        "legacy_us_per_video": round(legacy_time / args.videos * 1e6, 2),
+        "engine_us_per_video": round(engine_time / args.videos * 1e6, 2),
+        "speedup": round(legacy_time / engine_time, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,610 @@
+# backend/loadtest/fakes.py
+#
+# Local stand-ins for the services the backend calls, for load tests:
+#   - FakeOllama: POST /api/generate, streamed NDJSON at a set token rate,
+#     optionally opening with a <think> block; answers outline, lesson, quiz
+#     and evaluation prompts with output the real parsers accept;
+#   - FakeYouTube: GET /youtube/v3/search and /youtube/v3/videos;
+#   - FakePostgREST: an in-memory /rest/v1 covering the tables, filters,
+#     upserts, the view and the RPC that supabase_service uses.
+# Each runs a threaded stdlib HTTP server, so no extra dependencies.
+#
+#   python -m backend.loadtest.fakes --tokens-per-second 50
+#
+# serves all three until interrupted and prints the environment that points a
+# backend at them.
+
+import re
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+WORDS = (
+    "variable function loop index value object class method module package list dict set tuple "
+    "string number boolean scope closure iterator generator exception syntax example pattern data"
+).split()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: "FakeServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, payload: Any = None, headers: Optional[Dict[str, str]] = None) -> None:
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_chunked(self, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _end_chunked(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _dispatch(self) -> None:
+        self.fake.requests += 1
+        if self.fake.error_rate and self.fake.rng.random() < self.fake.error_rate:
+            self._send(503, {"error": "injected failure"})
+            return
+        try:
+            self.fake.handle(self, self.command, urlsplit(self.path))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
+
+
+class FakeServer:
+    """A threaded HTTP server on 127.0.0.1; subclasses implement `handle`."""
+
+    name = "fake"
+
+    def __init__(self, error_rate: float = 0.0, seed: int = 7):
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def handle(self, request: _Handler, method: str, url) -> None:
+        raise NotImplementedError
+
+    def start(self, port: int = 0) -> "FakeServer":
+        handler = type(f"{type(self).__name__}Handler", (_Handler,), {"fake": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=self.name, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# --- Ollama ---
+
+TOPIC_RES = [
+    re.compile(r"following topic: \*\*(.+?)\*\*"),
+    re.compile(r"user's topic: \*\*(.+?)\*\*"),
+    re.compile(r"^\s*Topic: (.+)$", re.MULTILINE),
+    re.compile(r"^Title: (.+)$", re.MULTILINE),
+]
+
+
+class FakeOllama(FakeServer):
+    """
+    Streams `/api/generate` answers as Ollama does: one JSON object per line
+    with a `response` token, then a `done` line with token counts. Tokens are
+    paced at `tokens_per_second` after `first_token_ms`; with `think` set the
+    answer opens with a <think> block, as reasoning models do.
+    """
+
+    name = "fake-ollama"
+
+    def __init__(self, tokens_per_second: float = 200.0, first_token_ms: float = 50.0, think: bool = True,
+                 lessons: int = 4, lesson_words: int = 600, **kwargs):
+        super().__init__(**kwargs)
+        self.tokens_per_second = tokens_per_second
+        self.first_token_ms = first_token_ms
+        self.think = think
+        self.lessons = lessons
+        self.lesson_words = lesson_words
+
+    @staticmethod
+    def _topic(prompt: str) -> str:
+        for pattern in TOPIC_RES:
+            m = pattern.search(prompt)
+            if m:
+                return re.sub(r"^(I want to learn about|Tell me about|Teach me)\s+", "", m.group(1).strip(), flags=re.I)
+        return "Python"
+
+    def answer(self, prompt: str) -> str:
+        topic = self._topic(prompt)
+        rng = random.Random(prompt)
+        lowered = prompt.lower()
+        if "evaluate the user's answer" in lowered:
+            return "The answer is correct: it matches the concept the question tests."
+        if "multiple choice questions" in lowered:
+            questions = []
+            for i in range(5):
+                options = [f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}{k}" for k in range(4)]
+                questions.append({"question": f"Which {rng.choice(WORDS)} applies to {topic} ({i + 1})?",
+                                  "options": options, "answer": rng.choice(options)})
+            return json.dumps(questions, indent=2)
+        if "course outline" in lowered or "generate the best outline" in lowered:
+            return "\n".join(
+                f"{i}. {rng.choice(WORDS).capitalize()} and {rng.choice(WORDS)}s in {topic}: "
+                f"Learn how {rng.choice(WORDS)}s work in {topic}."
+                for i in range(1, self.lessons + 1)
+            )
+        paragraphs = [f"# {topic}\n"]
+        words = 0
+        while words < self.lesson_words:
+            sentence = " ".join(rng.choice(WORDS) for _ in range(12))
+            paragraphs.append(f"{sentence.capitalize()}.")
+            words += 12
+        return "\n\n".join(paragraphs)
+
+    def _tokens(self, text: str) -> List[str]:
+        tokens = re.findall(r"\s*\S+", text)
+        if self.think:
+            tokens = ["<think>", " Let", " me", " plan", " this", " answer.", "</think>", "\n"] + tokens
+        return tokens
+
+    def handle(self, request: _Handler, method: str, url) -> None:
+        if method != "POST" or url.path != "/api/generate":
+            request._send(404, {"error": "not found"})
+            return
+        body = json.loads(request._body() or b"{}")
+        prompt = body.get("prompt", "")
+        tokens = self._tokens(self.answer(prompt))
+        model = body.get("model", "fake")
+
+        request._start_chunked("application/x-ndjson")
+        start = time.perf_counter() + self.first_token_ms / 1000
+        for i, token in enumerate(tokens):
+            delay = start + i / self.tokens_per_second - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            line = {"model": model, "created_at": _now(), "response": token, "done": False}
+            request._chunk(json.dumps(line).encode() + b"\n")
+        done = {"model": model, "created_at": _now(), "response": "", "done": True,
+                "prompt_eval_count": len(prompt) // 4, "eval_count": len(tokens)}
+        request._chunk(json.dumps(done).encode() + b"\n")
+        request._end_chunked()
+
+
+# --- YouTube ---
+
+class FakeYouTube(FakeServer):
+    """
+    `search` returns `results` deterministic video ids per query; `videos`
+    returns details whose titles and descriptions repeat the query words, so
+    the relevance and quality filters keep them.
+    """
+
+    name = "fake-youtube"
+
+    def __init__(self, results: int = 25, latency_ms: float = 20.0, **kwargs):
+        super().__init__(**kwargs)
+        self.results = results
+        self.latency_ms = latency_ms
+        self._queries: Dict[str, str] = {}
+
+    @staticmethod
+    def _video_id(query: str, i: int) -> str:
+        return hashlib.sha1(f"{query}:{i}".encode()).hexdigest()[:11]
+
+    def _video(self, video_id: str) -> Dict[str, Any]:
+        query = self._queries.get(video_id, "programming")
+        rng = random.Random(video_id)
+        return {
+            "id": video_id,
+            "snippet": {
+                "title": f"{query} tutorial part {rng.randint(1, 20)}",
+                "description": f"Learn {query} step by step with examples.",
+                "channelTitle": rng.choice(["Corey Schafer", "freeCodeCamp.org", "Programming with Mosh", "Tech Channel"]),
+                "publishedAt": "2022-03-01T00:00:00Z",
+                "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}},
+            },
+            "statistics": {"viewCount": str(rng.randint(20_000, 5_000_000))},
+            "contentDetails": {"duration": f"PT{rng.randint(6, 45)}M{rng.randint(0, 59)}S"},
+        }
+
+    def handle(self, request: _Handler, method: str, url) -> None:
+        time.sleep(self.latency_ms / 1000)
+        params = dict(parse_qsl(url.query))
+        if url.path.endswith("/search"):
+            query = params.get("q", "").split(" tutorial OR ")[0].strip()
+            items = []
+            for i in range(self.results):
+                video_id = self._video_id(query, i)
+                self._queries[video_id] = query
+                items.append({"id": {"kind": "youtube#video", "videoId": video_id}})
+            request._send(200, {"items": items})
+        elif url.path.endswith("/videos"):
+            ids = [i for i in params.get("id", "").split(",") if i]
+            request._send(200, {"items": [self._video(i) for i in ids]})
+        else:
+            request._send(404, {"error": {"message": "not found"}})
+
+
+# --- PostgREST ---
+
+class PostgrestError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, current = [], 0, ""
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _like(pattern: str, case_insensitive: bool) -> re.Pattern:
+    regex = "".join(".*" if ch in "%*" else re.escape(ch) for ch in pattern)
+    return re.compile(f"^{regex}$", re.DOTALL | (re.IGNORECASE if case_insensitive else 0))
+
+
+def _compare(value: Any, op: str, operand: str) -> bool:
+    if op == "is":
+        return (value is None) if operand == "null" else str(value).lower() == operand
+    if value is None:
+        return False
+    if op in ("like", "ilike"):
+        return bool(_like(operand, op == "ilike").match(str(value)))
+    if op == "in":
+        items = [i.strip().strip('"') for i in operand.strip("()").split(",")]
+        return str(value) in items
+    text = str(value).lower() if isinstance(value, bool) else str(value)
+    if op == "eq":
+        return text == operand
+    if op == "neq":
+        return text != operand
+    try:
+        left, right = float(value), float(operand)
+    except (TypeError, ValueError):
+        left, right = text, operand
+    return {"gt": left > right, "gte": left >= right, "lt": left < right, "lte": left <= right}[op]
+
+
+def _condition(column: str, expression: str) -> Callable[[Dict[str, Any]], bool]:
+    if column in ("or", "and"):
+        parts = [_condition(*_or_part(p)) for p in _split_top_level(expression.strip()[1:-1])]
+        if column == "or":
+            return lambda row: any(p(row) for p in parts)
+        return lambda row: all(p(row) for p in parts)
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, operand = expression.partition(".")
+    return lambda row: _compare(row.get(column), op, operand) != negate
+
+
+def _or_part(part: str) -> Tuple[str, str]:
+    column, _, expression = part.partition(".")
+    return column, expression
+
+
+class FakePostgREST(FakeServer):
+    """
+    In-memory tables behind PostgREST's URL grammar, enough for supabase-py:
+    select with column lists, eq/neq/gt/lt/in/like/ilike/is/or filters,
+    order, limit/offset, single-object responses, inserts with generated ids,
+    upserts on a conflict column, updates and deletes. Also serves the
+    `lesson_content_savings` view and the `course_progress_summary` and
+    `clone_course_template` RPCs.
+    """
+
+    name = "fake-postgrest"
+
+    RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(self, latency_ms: float = 2.0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency_ms = latency_ms
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    # Direct access, for seeding from the harness
+
+    def insert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._insert(table, rows, None, None)
+
+    def _insert(self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[str], resolution: Optional[str]):
+        store = self.tables.setdefault(table, [])
+        out = []
+        for row in rows:
+            row = dict(row)
+            if on_conflict:
+                key = [c.strip() for c in on_conflict.split(",")]
+                existing = next((r for r in store if all(r.get(k) == row.get(k) for k in key)), None)
+                if existing is not None:
+                    if resolution == "ignore-duplicates":
+                        continue
+                    if resolution == "merge-duplicates":
+                        existing.update(row)
+                        out.append(existing)
+                        continue
+                    raise PostgrestError(409, "23505", f"duplicate key value violates unique constraint on {table}")
+            self._sequence += 1
+            row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", f"{_now()[:-6]}.{self._sequence:06d}+00:00"[:32])
+            store.append(row)
+            out.append(row)
+        return out
+
+    def _view(self, table: str, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        if table == "lesson_content_savings":
+            contents = self.tables.get("lesson_contents", [])
+            logical = sum(r.get("raw_size", 0) for r in contents)
+            stored = sum(r.get("stored_size", 0) for r in contents)
+            return [{"unique_bodies": len(contents), "logical_bytes": logical, "stored_bytes": stored}]
+        return None
+
+    def _rpc(self, name: str, args: Dict[str, Any]) -> Any:
+        if name == "course_progress_summary":
+            user_id = args.get("p_user_id")
+            lessons = self.tables.get("lessons", [])
+            progress = self.tables.get("progress", [])
+            rows = []
+            for course in self.tables.get("courses", []):
+                if course.get("user_id") != user_id:
+                    continue
+                course_lessons = {l["id"] for l in lessons if l.get("course_id") == course["id"]}
+                done = {p.get("lesson_id") for p in progress
+                        if p.get("user_id") == user_id and p.get("lesson_id") in course_lessons and p.get("completed")}
+                rows.append({"course_id": course["id"], "total_lessons": len(course_lessons), "completed_lessons": len(done)})
+            return rows
+        if name == "course_lesson_outline":
+            course_id = args.get("p_course_id")
+            lessons = [l for l in self.tables.get("lessons", []) if l.get("course_id") == course_id]
+            rows = []
+            for lesson in self._order(lessons, "created_at"):
+                videos = sum(1 for v in self.tables.get("lesson_videos", []) if v.get("lesson_id") == lesson["id"])
+                if not videos:
+                    videos = sum(1 for v in self.tables.get("videos", []) if v.get("lesson_id") == lesson["id"])
+                questions = sum(len(q.get("questions") or []) for q in self.tables.get("quizzes", [])
+                                if q.get("course_id") == course_id and q.get("lesson_id") == lesson["id"])
+                rows.append({
+                    "id": lesson["id"], "title": lesson.get("title"), "summary": lesson.get("summary"),
+                    "content_status": lesson.get("content_status") or "ready",
+                    "video_count": videos, "quiz_questions": questions,
+                })
+            return rows
+        if name == "delete_unused_lesson_contents":
+            used = {l.get("content_hash") for l in self.tables.get("lessons", [])}
+            used.update(item.get("content_hash") for t in self.tables.get("course_templates", []) for item in t["lessons"])
+            contents = self.tables.get("lesson_contents", [])
+            unused = [c for c in contents if c["hash"] in args.get("p_hashes", []) and c["hash"] not in used]
+            self.tables["lesson_contents"] = [c for c in contents if c not in unused]
+            return len(unused)
+        if name == "clone_course_template":
+            template = next((t for t in self.tables.get("course_templates", []) if t["key"] == args.get("p_key")), None)
+            if template is None:
+                return None
+            course = self._insert("courses", [{
+                "user_id": args.get("p_user_id"), "title": template["title"],
+                "description": template.get("description"), "build_status": "ready",
+            }], None, None)[0]
+            for item in template["lessons"]:
+                lesson = self._insert("lessons", [{
+                    "course_id": course["id"], "title": item["title"], "summary": item["summary"],
+                    "content_hash": item.get("content_hash"),
+                }], None, None)[0]
+                self._insert("lesson_videos", [
+                    {"course_id": course["id"], "lesson_id": lesson["id"], "video_id": video_id, "position": position}
+                    for position, video_id in enumerate(item.get("video_ids") or [])
+                ], None, None)
+                if item.get("quiz"):
+                    self._insert("quizzes", [{
+                        "course_id": course["id"], "lesson_id": lesson["id"],
+                        "title": f"Quiz for {item['title']}", "questions": item["quiz"],
+                    }], None, None)
+            return course["id"]
+        raise PostgrestError(404, "PGRST202", f"Could not find the function public.{name}")
+
+    def _matching(self, rows: List[Dict[str, Any]], filters) -> List[Dict[str, Any]]:
+        return [row for row in rows if all(f(row) for f in filters)]
+
+    @staticmethod
+    def _project(rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        columns = [c.strip() for c in select.split(",") if c.strip()]
+        if not columns or "*" in columns:
+            return [dict(r) for r in rows]
+        return [{c: r.get(c) for c in columns} for r in rows]
+
+    @staticmethod
+    def _order(rows: List[Dict[str, Any]], order: str) -> List[Dict[str, Any]]:
+        for term in reversed(order.split(",")):
+            column, *modifiers = term.split(".")
+            descending = "desc" in modifiers
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=descending)
+            rows = present + missing if "nullsfirst" not in modifiers else missing + present
+        return rows
+
+    def handle(self, request: _Handler, method: str, url) -> None:
+        time.sleep(self.latency_ms / 1000)
+        try:
+            status, payload, headers = self._route(request, method, url)
+        except PostgrestError as e:
+            request._send(e.status, {"code": e.code, "message": e.message, "details": None, "hint": None})
+            return
+        except (ValueError, KeyError) as e:
+            request._send(400, {"code": "PGRST100", "message": str(e), "details": None, "hint": None})
+            return
+        request._send(status, payload, headers)
+
+    def _route(self, request: _Handler, method: str, url):
+        path = url.path
+        if not path.startswith("/rest/v1/"):
+            raise PostgrestError(404, "PGRST000", "not found")
+        name = path[len("/rest/v1/"):]
+        query = parse_qsl(url.query, keep_blank_values=True)
+        params = {k: v for k, v in query if k in self.RESERVED}
+        filters = [_condition(k, v) for k, v in query if k not in self.RESERVED]
+        prefer = request.headers.get("Prefer", "")
+        single = "vnd.pgrst.object" in request.headers.get("Accept", "")
+        body = request._body()
+
+        with self._lock:
+            if name.startswith("rpc/"):
+                args = json.loads(body or b"{}")
+                return 200, self._rpc(name[4:], args), {}
+
+            if method == "GET":
+                rows = self._view(name, params)
+                if rows is None:
+                    rows = self._matching(self.tables.get(name, []), filters)
+                if "order" in params:
+                    rows = self._order(rows, params["order"])
+                offset = int(params.get("offset", 0))
+                if "limit" in params:
+                    rows = rows[offset:offset + int(params["limit"])]
+                elif offset:
+                    rows = rows[offset:]
+                rows = self._project(rows, params.get("select", "*"))
+            elif method == "POST":
+                data = json.loads(body or b"[]")
+                rows = data if isinstance(data, list) else [data]
+                resolution = next((p.split("=", 1)[1] for p in prefer.split(",") if p.strip().startswith("resolution=")), None)
+                rows = self._insert(name, rows, params.get("on_conflict"), resolution and resolution.strip())
+                if "return=representation" not in prefer:
+                    return 201, None, {}
+                rows = self._project(rows, params.get("select", "*"))
+                status = 201
+            elif method == "PATCH":
+                changes = json.loads(body or b"{}")
+                rows = self._matching(self.tables.get(name, []), filters)
+                for row in rows:
+                    row.update(changes)
+                rows = [dict(r) for r in rows]
+            elif method == "DELETE":
+                store = self.tables.get(name, [])
+                rows = self._matching(store, filters)
+                self.tables[name] = [r for r in store if r not in rows]
+            else:
+                raise PostgrestError(405, "PGRST000", f"{method} not supported")
+
+        if single:
+            if len(rows) != 1:
+                raise PostgrestError(406, "PGRST116", f"JSON object requested, multiple (or no) rows returned ({len(rows)})")
+            return 200 if method != "POST" else 201, rows[0], {}
+        headers = {"Content-Range": f"0-{max(len(rows) - 1, 0)}/*"}
+        return (201 if method == "POST" else 200), rows, headers
+
+
+# --- Command line ---
+
+def start_fakes(args) -> Tuple[FakeOllama, FakeYouTube, FakePostgREST]:
+    ollama = FakeOllama(
+        tokens_per_second=args.tokens_per_second, first_token_ms=args.first_token_ms, think=not args.no_think,
+        lessons=args.lessons, lesson_words=args.lesson_words, error_rate=args.llm_error_rate,
+    ).start(args.ollama_port)
+    youtube = FakeYouTube(latency_ms=args.youtube_latency_ms, error_rate=args.youtube_error_rate).start(args.youtube_port)
+    postgrest = FakePostgREST(latency_ms=args.db_latency_ms).start(args.postgrest_port)
+    return ollama, youtube, postgrest
+
+
+def backend_env(ollama: FakeOllama, youtube: FakeYouTube, postgrest: FakePostgREST) -> Dict[str, str]:
+    """Environment pointing a backend process at the fakes."""
+    return {
+        "LLM_URL": f"{ollama.url}/api/generate",
+        "LLM_MODEL": "fake",
+        "YOUTUBE_API_URL": f"{youtube.url}/youtube/v3",
+        "YOUTUBE_API_KEY": "fake",
+        "YOUTUBE_DAILY_QUOTA": "100000000",
+        "SUPABASE_URL": postgrest.url,
+        # supabase-py only checks that the key looks like a JWT
+        "SUPABASE_SERVICE_ROLE_KEY": "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.fake",
+    }
+
+
+def add_fake_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("fake services")
+    group.add_argument("--tokens-per-second", type=float, default=200.0)
+    group.add_argument("--first-token-ms", type=float, default=50.0)
+    group.add_argument("--no-think", action="store_true", help="do not open answers with a <think> block")
+    group.add_argument("--lessons", type=int, default=4, help="lessons per generated outline")
+    group.add_argument("--lesson-words", type=int, default=600)
+    group.add_argument("--youtube-latency-ms", type=float, default=20.0)
+    group.add_argument("--db-latency-ms", type=float, default=2.0)
+    group.add_argument("--llm-error-rate", type=float, default=0.0)
+    group.add_argument("--youtube-error-rate", type=float, default=0.0)
+    group.add_argument("--ollama-port", type=int, default=0)
+    group.add_argument("--youtube-port", type=int, default=0)
+    group.add_argument("--postgrest-port", type=int, default=0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the fake Ollama, YouTube and PostgREST services.")
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+    fakes = start_fakes(args)
+    for name, value in backend_env(*fakes).items():
+        print(f"{name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for fake in fakes:
+            fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+# backend/loadtest/run.py
+#
+# End-to-end load test against local stand-ins for Ollama, YouTube and
+# PostgREST (backend/loadtest/fakes.py). Virtual users each loop over a
+# weighted mix of scenarios:
+#   - outline_stream: POST /generate/?stream=true, reading the whole SSE stream;
+#   - full_build:     POST /generate/full/, and in queue mode polling the job
+#                     until it finishes (full_build.enqueue is the POST alone);
+#   - course_list:    GET /courses/?user_id=...;
+#   - quiz_evaluate:  POST /quiz/evaluate.
+# Reports count, errors, 429s, p50/p95/p99 latency and throughput per route.
+#
+# The backend runs under uvicorn when it is installed, otherwise in this
+# process over an ASGI client (streamed responses are then buffered, so
+# outline_stream.first_chunk is only reported with uvicorn). With --url the
+# fakes still start, but pointing that backend at them is up to you.
+#
+#   python -m backend.loadtest.run --users 8 --duration 60 --mix outline_stream=3,full_build=1,course_list=4,quiz_evaluate=2
+#   python -m backend.loadtest.run --generation-mode queue --workers 2 --tokens-per-second 80
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from collections import defaultdict
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+from backend.loadtest.fakes import FakePostgREST, add_fake_arguments, backend_env, start_fakes
+
+SCENARIOS = ("outline_stream", "full_build", "course_list", "quiz_evaluate")
+DEFAULT_MIX = "outline_stream=3,full_build=1,course_list=4,quiz_evaluate=2"
+TOPICS = ["Python Lists", "SQL Joins", "Git Branching", "Docker Volumes", "React Hooks", "Rust Ownership"]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"ok": 0, "errors": 0, "rejected": 0})
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, route: str, seconds: float, outcome: str) -> None:
+        self.counts[route][outcome] += 1
+        if outcome == "ok":
+            self.latencies[route].append(seconds * 1000)
+
+    def report(self) -> Dict[str, Dict]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        routes = {}
+        for route in sorted(self.counts):
+            counts = self.counts[route]
+            latencies = self.latencies[route]
+            routes[route] = {
+                "count": sum(counts.values()),
+                **counts,
+                "p50_ms": _round(percentile(latencies, 50)),
+                "p95_ms": _round(percentile(latencies, 95)),
+                "p99_ms": _round(percentile(latencies, 99)),
+                "max_ms": _round(max(latencies) if latencies else None),
+                "throughput_rps": round(counts["ok"] / elapsed, 3) if elapsed else None,
+            }
+        return {"elapsed_s": round(elapsed, 2), "routes": routes}
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+def _outcome(response: httpx.Response) -> str:
+    if response.status_code == 429:
+        return "rejected"
+    return "ok" if response.status_code < 400 else "errors"
+
+
+class VirtualUser:
+    def __init__(self, index: int, client: httpx.AsyncClient, recorder: Recorder, args, streaming: bool):
+        self.user_id = f"loadtest-user-{index}"
+        self.client = client
+        self.recorder = recorder
+        self.args = args
+        self.streaming = streaming
+        self.rng = random.Random(args.seed + index)
+
+    async def outline_stream(self) -> None:
+        body = {"prompt": f"I want to learn about {self.rng.choice(TOPICS)}", "user_id": self.user_id}
+        start = time.perf_counter()
+        first = None
+        async with self.client.stream("POST", "/generate/", params={"stream": "true"}, json=body) as response:
+            async for line in response.aiter_lines():
+                if first is None and line.startswith("data:"):
+                    first = time.perf_counter() - start
+                if '"error"' in line:
+                    response.status_code = 502
+        outcome = _outcome(response)
+        self.recorder.record("outline_stream", time.perf_counter() - start, outcome)
+        if self.streaming and first is not None and outcome == "ok":
+            self.recorder.record("outline_stream.first_chunk", first, outcome)
+
+    async def full_build(self) -> None:
+        body = {"prompt": f"I want to learn about {self.rng.choice(TOPICS)}", "user_id": self.user_id}
+        start = time.perf_counter()
+        response = await self.client.post("/generate/full/", json=body)
+        if response.status_code != 202:
+            self.recorder.record("full_build", time.perf_counter() - start, _outcome(response))
+            return
+        self.recorder.record("full_build.enqueue", time.perf_counter() - start, "ok")
+        status_url = response.json()["status_url"]
+        deadline = start + self.args.build_timeout
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(self.args.poll_interval)
+            job = (await self.client.get(status_url)).json()
+            if job.get("status") in ("succeeded", "failed"):
+                outcome = "ok" if job["status"] == "succeeded" else "errors"
+                self.recorder.record("full_build", time.perf_counter() - start, outcome)
+                return
+        self.recorder.record("full_build", time.perf_counter() - start, "errors")
+
+    async def course_list(self) -> None:
+        start = time.perf_counter()
+        response = await self.client.get("/courses/", params={"user_id": self.user_id})
+        self.recorder.record("course_list", time.perf_counter() - start, _outcome(response))
+
+    async def quiz_evaluate(self) -> None:
+        body = {"question": "Which method appends an item to a list?",
+                "options": ["append", "extend", "insert", "add"], "answer": self.rng.choice(["append", "add"])}
+        start = time.perf_counter()
+        response = await self.client.post("/quiz/evaluate", json=body, headers={"X-User-Id": self.user_id})
+        self.recorder.record("quiz_evaluate", time.perf_counter() - start, _outcome(response))
+
+    async def run(self, mix: Dict[str, float], deadline: float, budget: List[int]) -> None:
+        names, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline:
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+            scenario = self.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                await getattr(self, scenario)()
+            except httpx.HTTPError:
+                self.recorder.record(scenario, time.perf_counter() - start, "errors")
+            if self.args.think_ms:
+                await asyncio.sleep(self.rng.expovariate(1000 / self.args.think_ms))
+
+
+def seed_courses(postgrest: FakePostgREST, users: int, per_user: int, lessons: int) -> None:
+    """Existing courses for every virtual user, so course_list has rows to read."""
+    for u in range(users):
+        for c in range(per_user):
+            course = postgrest.insert("courses", [{
+                "user_id": f"loadtest-user-{u}", "title": f"{TOPICS[c % len(TOPICS)]} Course",
+                "description": f"A course about {TOPICS[c % len(TOPICS)]}.",
+            }])[0]
+            lesson_rows = postgrest.insert("lessons", [
+                {"course_id": course["id"], "title": f"Lesson {i + 1}", "summary": "Seeded lesson.", "content_hash": None}
+                for i in range(lessons)
+            ])
+            postgrest.insert("quizzes", [{
+                "course_id": course["id"], "lesson_id": lesson["id"], "title": lesson["title"],
+                "questions": [{"question": "Seeded?", "options": ["a", "b", "c", "d"], "answer": "a"}],
+            } for lesson in lesson_rows])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _has_uvicorn() -> bool:
+    try:
+        import uvicorn  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@asynccontextmanager
+async def uvicorn_backend(env: Dict[str, str], workers: int, args):
+    port = _free_port()
+    env = {**os.environ, **env, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.getenv("PYTHONPATH")]))}
+    out = None if args.verbose else subprocess.DEVNULL
+    procs = [subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=out, stderr=out,
+    )]
+    procs += [
+        subprocess.Popen([sys.executable, "-m", "backend.worker", "--concurrency", str(args.worker_concurrency),
+                          "--drain-timeout", "5"], env=env, stdout=out, stderr=out)
+        for _ in range(workers)
+    ]
+    try:
+        url = f"http://127.0.0.1:{port}"
+        for _ in range(300):
+            try:
+                with urllib.request.urlopen(f"{url}/health", timeout=1):
+                    break
+            except OSError:
+                await asyncio.sleep(0.1)
+        else:
+            raise RuntimeError("uvicorn did not answer /health in time")
+        async with httpx.AsyncClient(base_url=url, timeout=args.request_timeout) as client:
+            yield client
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=15)
+
+
+@asynccontextmanager
+async def asgi_backend(env: Dict[str, str], workers: int, args):
+    # Settings are read at import time, so the environment goes in first
+    os.environ.update(env)
+    from backend.main import app
+    from backend.services.job_queue import job_queue
+    from backend.worker import Worker
+
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(app.router.lifespan_context(app))
+        tasks = []
+        worker_list = [Worker(job_queue, args.worker_concurrency, poll_seconds=0.2) for _ in range(workers)]
+        for worker in worker_list:
+            tasks.append(asyncio.create_task(worker.run(drain_timeout=5)))
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.request_timeout) as client:
+                yield client
+        finally:
+            for worker in worker_list:
+                worker.stop()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@asynccontextmanager
+async def url_backend(env: Dict[str, str], workers: int, args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.request_timeout) as client:
+        yield client
+
+
+async def run(args) -> Dict:
+    mix = parse_mix(args.mix)
+    fakes = start_fakes(args)
+    postgrest = fakes[2]
+    seed_courses(postgrest, args.users, args.seed_courses, args.lessons)
+
+    state_dir = tempfile.mkdtemp(prefix="skillmint-loadtest-")
+    env = {
+        **backend_env(*fakes),
+        "LOCAL_CACHE_PATH": os.path.join(state_dir, "cache.db"),
+        "JOB_QUEUE_PATH": os.path.join(state_dir, "jobs.db"),
+        "BUILD_CHECKPOINT_PATH": os.path.join(state_dir, "builds.db"),
+        "GENERATION_MODE": args.generation_mode,
+        "TRACE_EXPORTER": "none",
+        "ACCESS_LOG_SAMPLE_RATE": "0",
+        "RATE_LIMIT_ENABLED": "true" if args.keep_rate_limits else "false",
+    }
+    server = args.server if args.url is None else "url"
+    if server == "auto":
+        server = "uvicorn" if _has_uvicorn() else "asgi"
+    backend = {"uvicorn": uvicorn_backend, "asgi": asgi_backend, "url": url_backend}[server]
+    workers = args.workers if args.generation_mode == "queue" else 0
+
+    recorder = Recorder()
+    try:
+        async with backend(env, workers, args) as client:
+            recorder.started = time.perf_counter()
+            deadline = recorder.started + args.duration
+            budget = [args.requests or sys.maxsize]
+            users = [VirtualUser(i, client, recorder, args, streaming=server != "asgi") for i in range(args.users)]
+            await asyncio.gather(*(user.run(mix, deadline, budget) for user in users))
+            recorder.finished = time.perf_counter()
+    finally:
+        for fake in fakes:
+            fake.stop()
+
+    return {
+        "loadtest": "end_to_end",
+        "server": server,
+        "generation_mode": args.generation_mode,
+        "users": args.users,
+        "mix": mix,
+        "fakes": {
+            "tokens_per_second": args.tokens_per_second,
+            "think_block": not args.no_think,
+            "lessons": args.lessons,
+            "requests": {fake.name: fake.requests for fake in fakes},
+        },
+        **recorder.report(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a mixed workload against the backend and local fakes.")
+    parser.add_argument("--users", type=int, default=4, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many scenarios (0: no limit)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, name=weight,...")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's scenarios")
+    parser.add_argument("--server", choices=["auto", "uvicorn", "asgi"], default="auto")
+    parser.add_argument("--url", default=None, help="drive an already running backend instead")
+    parser.add_argument("--generation-mode", choices=["inline", "queue"], default="inline")
+    parser.add_argument("--workers", type=int, default=1, help="generation workers in queue mode")
+    parser.add_argument("--worker-concurrency", type=int, default=2)
+    parser.add_argument("--keep-rate-limits", action="store_true", help="leave per-user rate limits on")
+    parser.add_argument("--seed-courses", type=int, default=3, help="existing courses per user")
+    parser.add_argument("--build-timeout", type=float, default=300.0)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--request-timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default=None, help="also write the JSON report here")
+    parser.add_argument("--verbose", action="store_true", help="show backend output")
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
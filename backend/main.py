@@ -7,11 +7,12 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
 # 2) Standard imports
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 # 3) Routers
 from backend.routers.generate import router as generate_router
@@ -21,25 +22,54 @@ from backend.routers.courses import router as courses_router
 from backend.routers.custom_courses import router as custom_courses_router
 from backend.routers.progress import router as progress_router
 from backend.routers.lessons import router as lessons_router
+from backend.services.youtube_client import youtube_client
+from backend.services.llm_service import close_client as close_llm_client
+from backend.services.supabase_service import get_supabase
+from backend.services.build_checkpoints import build_checkpoints
 
 # 4) Logging Middleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from backend.utils.request_logging import AccessLogMiddleware, start_log_queue, stop_log_queue
+from backend.utils.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware
 
 logger = logging.getLogger("uvicorn.error")
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info(f"Incoming request: {request.method} {request.url}")
-        response = await call_next(request)
-        logger.info(f"Response status: {response.status_code}")
-        return response
+# Old rows of the local state files are pruned this often
+HOUSEKEEPING_INTERVAL_SECONDS = float(os.getenv("HOUSEKEEPING_INTERVAL_SECONDS", "3600"))
 
 # 5) Lifespan events
+def _warm_supabase():
+    try:
+        get_supabase()
+    except Exception as e:
+        logger.error(f"[startup] Supabase client unavailable: {e}")
+
+async def _housekeeping():
+    while True:
+        try:
+            purged = await asyncio.to_thread(build_checkpoints.purge_finished)
+            if purged:
+                logger.info(f"[housekeeping] Purged {purged} old build checkpoints")
+        except Exception as e:
+            logger.warning(f"[housekeeping] Purging build checkpoints failed: {e}")
+        await asyncio.sleep(HOUSEKEEPING_INTERVAL_SECONDS)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    start_log_queue()
     logger.info("✅ SkillMint backend starting up...")
+    if not os.getenv("LLM_URL") or not os.getenv("LLM_MODEL"):
+        logger.warning("[startup] LLM_URL/LLM_MODEL not set, using the local Ollama defaults")
+    await youtube_client.start()
+    # Clients are created lazily; build the Supabase one off the event loop
+    # now so the first database request does not pay for it.
+    asyncio.get_running_loop().run_in_executor(None, _warm_supabase)
+    housekeeping = asyncio.create_task(_housekeeping())
     yield
+    housekeeping.cancel()
+    await youtube_client.close()
+    await close_llm_client()
     logger.info("🔴 SkillMint backend shutting down...")
+    stop_log_queue()
 
 # 6) Create FastAPI app
 app = FastAPI(
@@ -59,7 +89,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(AccessLogMiddleware)
 
 # 8) Global exception handler
 @app.exception_handler(Exception)
@@ -75,6 +106,11 @@ async def global_exception_handler(request: Request, exc: Exception):
 async def health_check():
     return {"status": "ok"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 # 10) Include routers (prefix only where needed)
 app.include_router(generate_router)
 app.include_router(youtube_router, prefix="/api")
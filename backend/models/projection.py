@@ -0,0 +1,60 @@
+# backend/models/projection.py
+
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+Projector = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+_projectors: Dict[type, Projector] = {}
+
+
+def _nested(annotation) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """(model, is_list) for `Model`, `List[Model]` and Optional forms of those; (None, False) otherwise."""
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) != 1:
+            return None, False
+        annotation = args[0]
+    if get_origin(annotation) is list:
+        inner, _ = _nested((get_args(annotation) or (Any,))[0])
+        return inner, inner is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+def projector(model: Type[BaseModel]) -> Projector:
+    """
+    Function shaping a trusted database row like `model(**row).model_dump()`
+    would: the model's fields in declaration order, defaults for missing
+    keys, nested models shaped recursively and extra columns dropped. Nothing
+    is validated, so this is for read paths serving rows that were validated
+    when they were written.
+    """
+    if model in _projectors:
+        return _projectors[model]
+
+    fields = []
+    for name, info in model.model_fields.items():
+        default = None if info.is_required() else info.default
+        nested, is_list = _nested(info.annotation)
+        fields.append((name, info.default_factory, default, projector(nested) if nested else None, is_list))
+
+    def project(row: Dict[str, Any]) -> Dict[str, Any]:
+        out = {}
+        for name, factory, default, nested, is_list in fields:
+            if name in row:
+                value = row[name]
+            else:
+                value = factory() if factory is not None else default
+            if nested is not None and value is not None:
+                if is_list:
+                    value = [nested(item) if isinstance(item, dict) else item for item in value]
+                elif isinstance(value, dict):
+                    value = nested(value)
+            out[name] = value
+        return out
+
+    _projectors[model] = project
+    return project
@@ -27,6 +27,11 @@ class VideoItem(BaseModel):
     description: str = Field(..., description="Video description")
     thumbnail: str = Field(..., description="URL to video thumbnail")
     url: str = Field(..., description="URL to video")
+    channel: Optional[str] = Field(None, description="Channel title")
+    views: Optional[int] = Field(None, description="View count when fetched")
+    duration: Optional[int] = Field(None, description="Duration in seconds")
+    published_at: Optional[str] = Field(None, description="Publish timestamp (ISO 8601)")
+    fetched_at: Optional[str] = Field(None, description="When views and duration were fetched (ISO 8601)")
 
 class YoutubeResponse(BaseModel):
     videos: List[VideoItem]
@@ -58,6 +63,7 @@ class Lesson(BaseModel):
     videos: Optional[List[VideoItem]] = None
     quiz: Optional[List[MCQ]] = None
     summary: Optional[str] = None            
+    content_status: Optional[str] = None    # "pending" until a lazily built lesson is first opened
 
 class CourseCreate(BaseModel):
     user_id: str                        
@@ -75,6 +81,27 @@ class CourseOut(BaseModel):
     lessons: List[Lesson]
     videos: Optional[List[VideoItem]] = None
     quizzes: Optional[List[Quiz]] = None
+    build_status: Optional[str] = None   # "building" while lessons are still being generated
+
+class LessonOutline(BaseModel):
+    id: str
+    title: str
+    summary: Optional[str] = None
+    content_status: Optional[str] = None
+    video_count: int = 0
+    quiz_questions: int = 0
+
+class CourseOutline(BaseModel):
+    """A course without lesson bodies, videos or quizzes; lessons are fetched one at a time."""
+    id: str
+    user_id: str
+    title: str
+    description: Optional[str] = None
+    build_status: Optional[str] = None
+    lessons: List[LessonOutline]
+    lesson_count: int
+    video_count: int
+    quiz_questions: int
 
 class BuildCourseRequest(BaseModel):
     user_id: str = Field(..., description="ID of the user building the course")
@@ -0,0 +1,116 @@
+# backend/prewarm.py
+#
+# Pre-generates template courses for popular topics, offline, through the
+# regular generation pipeline. /generate/full/ then clones a template for a
+# user asking for one of these topics instead of generating it again:
+#
+#   python -m backend.prewarm topics.txt --concurrency 2
+#   python -m backend.prewarm --topic "Python programming" --topic "SQL joins"
+#
+# Topic files hold one topic per line (blank lines and # comments ignored).
+# Topics that already have a template are skipped unless --force is given;
+# each topic's lessons are checkpointed, so re-running after a failure or
+# Ctrl+C generates only what is missing.
+
+import os
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Dict, List
+
+from backend.services.course_templates import build_course_template, template_key
+from backend.services.llm_service import close_client as close_llm_client
+from backend.services.supabase_service import get_course_templates
+from backend.services.youtube_client import youtube_client
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def read_topics(paths: List[str], topics: List[str]) -> List[str]:
+    """Topics from the files and --topic flags, first occurrence of each template key kept."""
+    found = list(topics)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            found.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith("#"))
+
+    unique: Dict[str, str] = {}
+    for topic in found:
+        key = template_key(topic)
+        if not key:
+            logger.warning(f"[prewarm] Skipping {topic!r}: no topic words")
+            continue
+        unique.setdefault(key, topic)
+    return list(unique.values())
+
+
+async def prewarm(topics: List[str], concurrency: int, force: bool) -> List[dict]:
+    if not force:
+        existing = {t["key"] for t in await get_course_templates([template_key(t) for t in topics])}
+        for topic in topics:
+            if template_key(topic) in existing:
+                logger.info(f"[prewarm] {topic!r}: template exists, skipping")
+        topics = [t for t in topics if template_key(t) not in existing]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[dict] = []
+
+    async def run(position: int, topic: str) -> None:
+        async with semaphore:
+            def report(stage: str) -> None:
+                logger.info(f"[prewarm] [{position}/{len(topics)}] {topic!r}: {stage}")
+
+            start = time.perf_counter()
+            try:
+                result = await build_course_template(topic, report, force=force)
+            except Exception as e:
+                logger.exception(f"[prewarm] {topic!r} failed; run again to resume it")
+                results.append({"topic": topic, "ok": False, "error": f"{type(e).__name__}: {e}"})
+                return
+            seconds = round(time.perf_counter() - start, 1)
+            logger.info(f"[prewarm] {topic!r}: {result['lessons']} lessons in {seconds}s")
+            results.append({"topic": topic, "ok": True, "seconds": seconds, **result})
+
+    await youtube_client.start()
+    try:
+        await asyncio.gather(*(run(i, topic) for i, topic in enumerate(topics, start=1)))
+    finally:
+        await youtube_client.close()
+        await close_llm_client()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-generate template courses for popular topics.")
+    parser.add_argument("files", nargs="*", help="files with one topic per line")
+    parser.add_argument("--topic", action="append", default=[], help="a topic (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=2, help="topics generated at once")
+    parser.add_argument("--force", action="store_true", help="regenerate topics that already have a template")
+    parser.add_argument("--out", default=None, help="also write the JSON summary here")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if os.getenv("DEBUG", "false").lower() == "true" else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    topics = read_topics(args.files, args.topic)
+    if not topics:
+        parser.error("no topics given")
+
+    results = asyncio.run(prewarm(topics, max(1, args.concurrency), args.force))
+    summary = json.dumps(results, indent=2)
+    print(summary)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(summary)
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,21 @@
 # backend/routers/courses.py
 
+import json
+import hashlib
 from fastapi import APIRouter
 from typing import List
-from backend.models.schemas import CourseCreate, CourseOut
-from backend.services.supabase_service import get_quiz_by_lesson_id
+from backend.models.schemas import CourseCreate, CourseOut, CourseOutline, Lesson
+from backend.services.supabase_service import get_course_lesson, get_course_outline, get_quiz_by_lesson_id
+from backend.services.lesson_materializer import (
+    LAZY_PREFETCH_NEXT,
+    PENDING,
+    cached_lesson_detail,
+    forget_lessons,
+    lesson_complete,
+    lesson_detail,
+    materialize,
+    prefetch_next,
+)
 from backend.services.supabase_service import (
     create_course,
     get_course,
@@ -17,23 +29,44 @@ from backend.services.supabase_service import (
     get_course,
     list_courses,
     get_lessons_by_course_id,
-    get_videos_by_course_id,      # <-- add this
-    get_quizzes_by_course_id      # <-- add this
+    get_courses_children,
+    get_videos_by_course_id,
+    get_quizzes_by_course_id,
+    hydrate_lesson_content,
+    get_content_storage_stats,
 )
 from fastapi import HTTPException
 from backend.services.build_course_service import build_and_save_course
 from backend.models.schemas import BuildCourseRequest 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from backend.utils.idempotency import run_idempotent
+from backend.utils.rate_limit import build_slots, rate_limit
 from backend.services.supabase_service import get_course, get_lessons_by_course_id
 from backend.models.schemas import CourseOut
+from backend.models.projection import projector
+from backend.utils.fast_json import FastJSONResponse, dumps
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 logger = logging.getLogger("uvicorn.error")
 
+# Read endpoints shape rows into CourseOut's JSON directly; rows were
+# validated on the way in, so response_model only documents the schema.
+course_view = projector(CourseOut)
+lesson_view = projector(Lesson)
+outline_view = projector(CourseOutline)
+
+# Browsers may reuse a complete lesson this long without asking again
+LESSON_MAX_AGE_SECONDS = 3600
+
 @router.post("/", response_model=CourseOut)
-async def create_new(course: CourseCreate):
-    logger.info(f"[courses] Creating course: {course.title}")
-    return await create_course(course)
+async def create_new(course: CourseCreate, request: Request):
+    async def create(context: dict):
+        logger.info(f"[courses] Creating course: {course.title}")
+        return FastJSONResponse((await create_course(course)).model_dump(mode="json"))
+
+    # A resubmitted form with the same Idempotency-Key returns the first course instead of inserting another
+    return await run_idempotent(request, "courses_create", create)
 
 @router.get("/", response_model=List[CourseOut])
 async def read_all(user_id: str = None):
@@ -44,18 +77,10 @@ async def read_all(user_id: str = None):
     else:
         courses = await list_courses()
 
-    result = []
-    for course in courses:
-        lessons = await get_lessons_by_course_id(course["id"])
-        videos = await get_videos_by_course_id(course["id"])
-        quizzes = await get_quizzes_by_course_id(course["id"])
-        result.append({
-            **course,
-            "lessons": lessons,
-            "videos": videos,
-            "quizzes": quizzes,
-        })
-    return result
+    # Lessons, videos and quizzes of every course in one batch, not per course
+    children = await get_courses_children([course["id"] for course in courses])
+    await hydrate_lesson_content([lesson for course in children.values() for lesson in course["lessons"]])
+    return FastJSONResponse([course_view({**course, **children[course["id"]]}) for course in courses])
 
 @router.put("/{course_id}", response_model=CourseOut)
 async def update(course_id: str, course: CourseCreate):
@@ -65,17 +90,27 @@ async def update(course_id: str, course: CourseCreate):
 @router.delete("/{course_id}")
 async def remove(course_id: str):
     logger.info(f"[courses] Deleting course ID: {course_id}")
+    lessons = await get_lessons_by_course_id(course_id)
     await delete_course(course_id)
+    await forget_lessons(course_id, [lesson["id"] for lesson in lessons])
     return {"status": "deleted"}
 
-@router.post("/courses/build", response_model=CourseOut, tags=["Courses"])
+@router.post("/courses/build", response_model=CourseOut, tags=["Courses"], dependencies=[Depends(rate_limit("course_build"))])
 async def build_course(request: BuildCourseRequest):
+    with build_slots.slot():
+        try:
+            course = await build_and_save_course(request)
+            return course
+        except Exception as e:
+            logger.error(f"[router] build_course failed: {e}")
+            raise HTTPException(status_code=500, detail="Failed to build course")
+
+@router.get("/storage/stats")
+async def content_storage_stats():
     try:
-        course = await build_and_save_course(request)
-        return course
-    except Exception as e:
-        logger.error(f"[router] build_course failed: {e}")
-        raise HTTPException(status_code=500, detail="Failed to build course")
+        return await get_content_storage_stats()
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{course_id}/lessons/{lesson_id}/quiz")
 async def get_lesson_quiz(course_id: str, lesson_id: str):
@@ -83,7 +118,93 @@ async def get_lesson_quiz(course_id: str, lesson_id: str):
     quiz = await get_quiz_by_lesson_id(course_id, lesson_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    return quiz
+    return FastJSONResponse(quiz)
+
+@router.get("/{course_id}/outline", response_model=CourseOutline)
+async def read_course_outline(course_id: str):
+    """
+    The course overview: lesson ids, titles, summaries and video/quiz counts,
+    without lesson content, videos or quizzes (see read_lesson for those).
+    """
+    try:
+        course = await get_course(course_id)
+    except Exception:
+        raise HTTPException(404, "Course not found")
+    try:
+        lessons = await get_course_outline(course_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return FastJSONResponse(outline_view({
+        **course,
+        "lessons": lessons,
+        "lesson_count": len(lessons),
+        "video_count": sum(lesson["video_count"] for lesson in lessons),
+        "quiz_questions": sum(lesson["quiz_questions"] for lesson in lessons),
+    }))
+
+@router.get("/{course_id}/lessons/{lesson_id}", response_model=Lesson)
+async def read_lesson(course_id: str, lesson_id: str, request: Request):
+    """
+    One lesson with its content, videos and quiz. A pending lesson (lazily
+    built course) comes back without content; read it from the stream
+    endpoint, which writes it.
+    """
+    lesson = await cached_lesson_detail(course_id, lesson_id)
+    if lesson is None:
+        raise HTTPException(404, "Lesson not found")
+
+    body = dumps(lesson_view(lesson))
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    cache_control = f"private, max-age={LESSON_MAX_AGE_SECONDS}" if lesson_complete(lesson) else "no-cache"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+@router.get("/{course_id}/lessons/{lesson_id}/stream")
+async def stream_lesson(course_id: str, lesson_id: str, prefetch: bool = Query(LAZY_PREFETCH_NEXT)):
+    """
+    Server-sent events for reading a lesson: {"title": ...}, {"chunk": ...}
+    events with its markdown, generated as it streams if the lesson is still
+    pending (lazily built courses), then {"lesson": ...} with content, videos
+    and quiz.
+    """
+    lesson = await get_course_lesson(course_id, lesson_id)
+    if lesson is None:
+        raise HTTPException(404, "Lesson not found")
+    materialization = materialize(course_id, lesson) if lesson.get("content_status") == PENDING else None
+    if prefetch:
+        prefetch_next(course_id, lesson_id)
+
+    def event(payload: dict) -> str:
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def events():
+        yield event({"title": lesson["title"]})
+        if materialization is not None:
+            async for chunk in materialization.follow():
+                yield event({"chunk": chunk})
+            if materialization.error:
+                yield event({"error": "Lesson generation failed, please retry."})
+                return
+        try:
+            if materialization is None:
+                detail = await cached_lesson_detail(course_id, lesson_id)
+            else:
+                detail = await lesson_detail(course_id, lesson_id)
+        except Exception as e:
+            logger.error(f"[courses] Reading lesson {lesson_id} of course {course_id} failed: {e}")
+            detail = None
+        if detail is None:
+            # Deleted (or unreadable) while the stream was open
+            yield event({"error": "Lesson not found"})
+            return
+        if materialization is None:
+            yield event({"chunk": detail["content"] or ""})
+        yield event({"lesson": lesson_view(detail)})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 @router.get("/{course_id}", response_model=CourseOut)
 async def read_course(course_id: str):
@@ -92,16 +213,13 @@ async def read_course(course_id: str):
     except Exception:
         raise HTTPException(404, "Course not found")
 
-    lessons = await get_lessons_by_course_id(course_id)
+    lessons = await hydrate_lesson_content(await get_lessons_by_course_id(course_id))
     videos = await get_videos_by_course_id(course_id)
     quizzes = await get_quizzes_by_course_id(course_id)
 
-    return CourseOut(
-        id=course["id"],
-        user_id=course["user_id"],
-        title=course["title"],
-        description=course["description"],
-        lessons=lessons,
-        videos=videos,
-        quizzes=quizzes,
-    )
\ No newline at end of file
+    return FastJSONResponse(course_view({
+        **course,
+        "lessons": lessons,
+        "videos": videos,
+        "quizzes": quizzes,
+    }))
\ No newline at end of file
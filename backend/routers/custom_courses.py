@@ -1,6 +1,5 @@
 # backend/routers/custom_courses.py
 from fastapi import APIRouter, HTTPException
-from supabase import Client
 from backend.models.custom_course import CustomCourseInput, CustomCourseOutput, LessonOutput, VideoOutput
 from backend.services.supabase_service import supabase
 import logging
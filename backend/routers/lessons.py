@@ -7,8 +7,11 @@ from pydantic import BaseModel
 
 from backend.services.supabase_service import supabase
 from backend.models.custom_course import LessonInput, LessonOutput
+from backend.models.projection import projector
+from backend.utils.fast_json import FastJSONResponse
 
 router = APIRouter(prefix="/lessons", tags=["Lessons"])
+lesson_view = projector(LessonOutput)
 
 
 @router.get("/", response_model=List[LessonOutput])
@@ -21,7 +24,7 @@ def list_lessons(course_id: Optional[int] = None):
         if course_id is not None:
             query = query.eq("course_id", course_id)
         res = query.order("created_at", desc=False).execute()
-        return [LessonOutput(**row) for row in res.data]
+        return FastJSONResponse([lesson_view(row) for row in res.data])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing lessons: {e}")
 
@@ -42,7 +45,7 @@ def get_lesson(lesson_id: int):
         )
         if not res.data:
             raise HTTPException(status_code=404, detail="Lesson not found")
-        return LessonOutput(**res.data)
+        return FastJSONResponse(lesson_view(res.data))
     except HTTPException:
         raise
     except Exception as e:
@@ -119,7 +122,7 @@ async def get_lessons_by_course_id(course_id: str) -> list:
     """
     try:
         res = supabase.table("custom_lessons").select("*").eq("course_id", course_id).order("created_at", desc=False).execute()
-        return [LessonOutput(**row) for row in res.data]
+        return [lesson_view(row) for row in res.data]
     except Exception as e:
         logging.error(f"Error fetching lessons for course_id={course_id}: {e}")
         return []
\ No newline at end of file
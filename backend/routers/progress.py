@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from backend.services.supabase_service import supabase
 from backend.models.schemas import LessonProgressIn
-from backend.services.supabase_service import supabase
+from backend.services.supabase_service import get_progress_summary
 
 router = APIRouter(tags=["Progress"])
 
@@ -31,6 +31,17 @@ def get_user_progress(user_id: str):
 
 from backend.routers.lessons import get_lessons_by_course_id
 
+@router.get("/progress/summary")
+async def get_progress_summary_for_user(user_id: str = Query(...)):
+    """
+    Returns, for every course owned by the user:
+      { course_id: { total_lessons: int, completed_lessons: int } }
+    """
+    try:
+        return await get_progress_summary(user_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/progress/course/{course_id}")
 async def get_course_progress(course_id: str, user_id: str = Query(...)):
     """
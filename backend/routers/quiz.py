@@ -1,17 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from backend.models.schemas import (
     QuizRequest,
     QuizResponse,
 )
 from backend.services.llm_service import evaluate_quiz_answer
 from backend.services.supabase_service import supabase
+from backend.utils.rate_limit import rate_limit
 import logging
 
 router = APIRouter(prefix="/quiz", tags=["Quiz"])
 logger = logging.getLogger("uvicorn.error")
 
 
-@router.post("/evaluate", response_model=QuizResponse)
+@router.post("/evaluate", response_model=QuizResponse, dependencies=[Depends(rate_limit("quiz_evaluate"))])
 async def evaluate(request: QuizRequest):
     try:
         logger.info(f"[quiz] Evaluating answer for question: {request.question[:60]}...")
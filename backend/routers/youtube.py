@@ -1,17 +1,20 @@
 # backend/routers/youtube.py
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
 from backend.models.schemas import YoutubeRequest
 from backend.services.youtube_service import fetch_videos
+from backend.services.youtube_client import youtube_client
 from backend.models.schemas import YoutubeResponse
 from backend.models.schemas import VideoItem
+from backend.utils.rate_limit import rate_limit
 from typing import List
 import logging
 
 router = APIRouter()
 logger = logging.getLogger("uvicorn.error")
 
-@router.post("/search", response_model=YoutubeResponse, tags=["YouTube"])
+@router.post("/search", response_model=YoutubeResponse, tags=["YouTube"], dependencies=[Depends(rate_limit("youtube_search"))])
 async def search_videos(request: YoutubeRequest):
     """
     Fetch relevant YouTube videos for a lesson
@@ -25,7 +28,7 @@ async def search_videos(request: YoutubeRequest):
         logger.exception(f"[youtube] Search failed: {str(e)}")
         raise HTTPException(status_code=500, detail="YouTube search failed")
 
-@router.get("/search-youtube", response_model=YoutubeResponse, tags=["YouTube"])
+@router.get("/search-youtube", response_model=YoutubeResponse, tags=["YouTube"], dependencies=[Depends(rate_limit("youtube_search"))])
 async def search_youtube(
     q: str = Query(..., min_length=1, description="Search term"),
     max_results: int = Query(5, ge=1, le=20, description="Max number of videos to fetch")
@@ -38,4 +41,11 @@ async def search_youtube(
         return YoutubeResponse(videos=videos)
     except Exception as e:
         logger.exception(f"[youtube] Search failed: {str(e)}")
-        raise HTTPException(status_code=500, detail="YouTube search failed")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="YouTube search failed")
+
+@router.get("/youtube/quota", tags=["YouTube"])
+async def youtube_quota():
+    """
+    Today's YouTube Data API quota usage plus this worker's call counters.
+    """
+    return await asyncio.to_thread(youtube_client.stats)
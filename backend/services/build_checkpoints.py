@@ -0,0 +1,219 @@
+# backend/services/build_checkpoints.py
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+BUILD_CHECKPOINT_PATH = os.getenv("BUILD_CHECKPOINT_PATH", ".skillmint/builds.db")
+# A build marked running but silent for this long is treated as abandoned and may be resumed
+BUILD_STALE_SECONDS = float(os.getenv("BUILD_STALE_SECONDS", "900"))
+# Succeeded builds are kept this long for status lookups, failed ones this long to be resumed
+BUILD_RETENTION_SECONDS = float(os.getenv("BUILD_RETENTION_HOURS", "168")) * 3600
+BUILD_FAILED_RETENTION_SECONDS = float(os.getenv("BUILD_FAILED_RETENTION_HOURS", "720")) * 3600
+
+RUNNING, FAILED, SUCCEEDED = "running", "failed", "succeeded"
+
+
+class Build(NamedTuple):
+    id: str
+    user_id: str
+    prompt: str
+    outline: List[Dict[str, str]]
+    course_id: Optional[str]
+    status: str
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+    lazy: bool = False  # lessons saved as outline entries, generated when first opened
+
+    @property
+    def stale(self) -> bool:
+        return self.status == RUNNING and time.time() - self.updated_at > BUILD_STALE_SECONDS
+
+    @property
+    def resumable(self) -> bool:
+        return self.status == FAILED or self.stale
+
+
+class LessonCheckpoint(NamedTuple):
+    position: int
+    lesson: Dict[str, Any]
+    lesson_id: Optional[str]
+
+
+_COLUMNS = "id, user_id, prompt, outline, course_id, status, error, created_at, updated_at, lazy"
+
+
+def _build(row) -> Build:
+    return Build(*row[:3], json.loads(row[3]), *row[4:9], bool(row[9]))
+
+
+class BuildCheckpoints:
+    """
+    Progress of course builds in a local SQLite file: the outline, the course
+    row created for the build, and every finished lesson (content, videos and
+    quiz) as soon as it is generated. A failed or interrupted build is resumed
+    from here, regenerating only the lessons that are missing. `lesson_id` is
+    set once a lesson is also saved to the course, so a lesson generated but
+    not yet saved is saved on resume rather than generated again.
+    """
+
+    def __init__(self, path: str = BUILD_CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS builds ("
+                " id TEXT PRIMARY KEY,"
+                " user_id TEXT NOT NULL,"
+                " prompt TEXT NOT NULL,"
+                " outline TEXT NOT NULL,"
+                " course_id TEXT,"
+                " status TEXT NOT NULL,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " lazy INTEGER NOT NULL DEFAULT 0)"
+            )
+            if "lazy" not in {row[1] for row in conn.execute("PRAGMA table_info(builds)")}:
+                # Files written before lazy builds
+                try:
+                    conn.execute("ALTER TABLE builds ADD COLUMN lazy INTEGER NOT NULL DEFAULT 0")
+                except sqlite3.OperationalError:
+                    pass  # added by another process meanwhile
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS build_lessons ("
+                " build_id TEXT NOT NULL,"
+                " position INTEGER NOT NULL,"
+                " lesson TEXT NOT NULL,"
+                " lesson_id TEXT,"
+                " PRIMARY KEY (build_id, position))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def start(
+        self, build_id: str, user_id: str, prompt: str, outline: List[Dict[str, str]], lazy: bool = False
+    ) -> Build:
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO builds (id, user_id, prompt, outline, status, created_at, updated_at, lazy) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (build_id, user_id, prompt, json.dumps(outline), RUNNING, now, now, int(lazy)),
+            )
+        return Build(build_id, user_id, prompt, outline, None, RUNNING, None, now, now, lazy)
+
+    def _update(self, build_id: str, assignments: str, params: tuple) -> None:
+        with self._lock:
+            self._connect().execute(
+                f"UPDATE builds SET {assignments}, updated_at = ? WHERE id = ?", (*params, time.time(), build_id)
+            )
+
+    def resume(self, build_id: str) -> None:
+        self._update(build_id, "status = ?, error = NULL", (RUNNING,))
+
+    def set_course(self, build_id: str, course_id: str) -> None:
+        self._update(build_id, "course_id = ?", (course_id,))
+
+    def finish(self, build_id: str) -> None:
+        """Mark the build succeeded. Its lessons are in the course now, so their checkpoints are dropped."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE builds SET status = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (SUCCEEDED, time.time(), build_id),
+            )
+            conn.execute("DELETE FROM build_lessons WHERE build_id = ?", (build_id,))
+
+    def fail(self, build_id: str, error: str) -> None:
+        self._update(build_id, "status = ?, error = ?", (FAILED, error))
+
+    def save_lesson(self, build_id: str, position: int, lesson: Dict[str, Any]) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO build_lessons (build_id, position, lesson, lesson_id) VALUES (?, ?, ?, NULL)",
+                (build_id, position, json.dumps(lesson)),
+            )
+            conn.execute("UPDATE builds SET updated_at = ? WHERE id = ?", (time.time(), build_id))
+
+    def mark_saved(self, build_id: str, position: int, lesson_id: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE build_lessons SET lesson_id = ? WHERE build_id = ? AND position = ?",
+                (lesson_id, build_id, position),
+            )
+
+    def get(self, build_id: str) -> Optional[Build]:
+        with self._lock:
+            row = self._connect().execute(f"SELECT {_COLUMNS} FROM builds WHERE id = ?", (build_id,)).fetchone()
+        return _build(row) if row else None
+
+    def lessons(self, build_id: str) -> Dict[int, LessonCheckpoint]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT position, lesson, lesson_id FROM build_lessons WHERE build_id = ? ORDER BY position",
+                (build_id,),
+            ).fetchall()
+        return {row[0]: LessonCheckpoint(row[0], json.loads(row[1]), row[2]) for row in rows}
+
+    def public(self, build: Build) -> Dict[str, Any]:
+        """What the build status endpoint returns."""
+        if build.status == SUCCEEDED:
+            saved = len(build.outline)
+        else:
+            saved = sum(1 for c in self.lessons(build.id).values() if c.lesson_id)
+        return {
+            "build_id": build.id,
+            "status": build.status,
+            "course_id": build.course_id,
+            "lessons_total": len(build.outline),
+            "lessons_saved": saved,
+            "resumable": build.resumable,
+            "lazy": build.lazy,
+            "error": build.error,
+            "created_at": build.created_at,
+            "updated_at": build.updated_at,
+        }
+
+    def discard(self, build_id: str) -> None:
+        """Forget a build and its lessons, so the id can start over."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM build_lessons WHERE build_id = ?", (build_id,))
+            conn.execute("DELETE FROM builds WHERE id = ?", (build_id,))
+
+    def purge_finished(
+        self, older_than: float = BUILD_RETENTION_SECONDS, failed_older_than: float = BUILD_FAILED_RETENTION_SECONDS
+    ) -> int:
+        """
+        Delete succeeded builds last updated more than `older_than` seconds
+        ago and failed ones (no longer worth resuming) past `failed_older_than`.
+        """
+        now = time.time()
+        expired = "(status = ? AND updated_at < ?) OR (status = ? AND updated_at < ?)"
+        params = (SUCCEEDED, now - older_than, FAILED, now - failed_older_than)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM build_lessons WHERE build_id IN (SELECT id FROM builds WHERE {expired})", params)
+            cur = conn.execute(f"DELETE FROM builds WHERE {expired}", params)
+        return cur.rowcount
+
+
+build_checkpoints = BuildCheckpoints()
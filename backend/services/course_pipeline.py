@@ -0,0 +1,592 @@
+# backend/services/course_pipeline.py
+#
+# The full course build: outline -> per-lesson content, videos and quiz, each
+# lesson checkpointed and saved as it finishes. Shared by the /generate/full/
+# endpoint (inline mode) and the generation worker (queue mode), so neither
+# depends on the other.
+
+import os
+import re
+import asyncio
+import sqlite3
+import logging
+from typing import AsyncIterator, Callable, Collection, List, Optional, Tuple
+from uuid import uuid4
+
+from backend.models.schemas import Lesson, MCQ
+from backend.services.build_checkpoints import build_checkpoints
+from backend.services.llm_service import generate_content
+from backend.services.outline_cache import OUTLINE_CACHE_ENABLED, outline_cache, outline_cache_lookups
+from backend.services.supabase_service import add_course_lessons, create_course_record, set_course_build_status
+from backend.services.youtube_service import fetch_videos_batch
+from backend.utils.quiz_parser import robust_parse_mcqs
+from backend.utils.request_logging import current_request_id, log_payload
+from backend.utils.text_filters import video_filters
+from backend.utils.tracing import span
+
+logger = logging.getLogger("uvicorn.error")
+
+# Job kind of queued builds (see backend/worker.py)
+COURSE_BUILD_JOB = "course.build"
+
+# Save lessons as outline entries and generate each one when it is first opened
+LAZY_LESSONS = os.getenv("LAZY_LESSONS", "false").lower() == "true"
+# Whether lazy builds still search videos up front (one batched search per build)
+LAZY_LESSON_VIDEOS = os.getenv("LAZY_LESSON_VIDEOS", "true").lower() == "true"
+
+
+# Quiz generation prompt template (used for both lesson quizzes and unit exams)
+QUIZ_PROMPT_TEMPLATE = r"""
+You are an expert AI quiz generator.
+
+Your task is to generate **5 high-quality multiple choice questions (MCQs)** from the lesson content below.
+
+Each question must:
+- Test understanding of key concepts from the lesson.
+- Avoid superficial or overly simplistic questions.
+- Include plausible distractors (wrong options).
+- Vary in difficulty, with at least one being a conceptual or application-based question.
+
+Return the result as a **valid JSON array**, where each question is an object with the following fields:
+- "question": the question text
+- "options": an array of 4 options (strings)
+- "answer": the correct option (must exactly match one of the options)
+
+Example:
+[
+  {{
+    "question": "What is the main purpose of using functions in Python?",
+    "options": ["To store data", "To reduce code repetition", "To handle exceptions", "To create classes"],
+    "answer": "To reduce code repetition"
+  }},
+  {{
+    "question": "Which of the following is a correct syntax for a while loop in Python?",
+    "options": ["while x > 0", "while (x > 0):", "while x > 0:", "x > 0 while:"],
+    "answer": "while x > 0:"
+  }}
+]
+
+IMPORTANT RULES:
+- Only output valid **JSON** — no markdown, no comments, no code blocks.
+- Do NOT include trailing commas.
+- Do NOT include any text before or after the JSON array.
+- Do NOT wrap the output in ```json or any other formatting.
+- This is because your response will be parsed by a program and must strictly be valid JSON.
+
+To help you understand how your output will be parsed, here is the parser code that will consume your response:
+
+[BEGIN PARSER CODE]
+
+import re
+from typing import List, Dict
+import json
+
+def parse_mcqs(text: str) -> List[Dict]:
+    ""
+    Extremely forgiving MCQ parser for LLM output.
+    ""
+    mcqs = []
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
+    q_blocks = re.split(r"\n\s*(?=Q\d+[\):])", text)
+    for block in q_blocks:
+        lines = [l.strip() for l in block.splitlines() if l.strip()]
+        if not lines or not re.match(r"^Q\d+[\):]", lines[0]):
+            continue
+        q_line = lines[0]
+        question = re.sub(r"^Q\d+[\):]\s*", "", q_line)
+        if not question:
+            if len(lines) > 1 and not re.match(r"^[A-Da-d][\)\.:\-]", lines[1]):
+                question = lines[1]
+                lines = [lines[0]] + lines[2:]
+        options = {{}}
+        answer = None
+        for line in lines[1:]:
+            opt_match = re.match(r"^([A-Da-d])[\)\.:\-]?\s*(.*)$", line)
+            if opt_match:
+                key = opt_match.group(1).upper()
+                val = opt_match.group(2).strip()
+                options[key] = val
+                continue
+            ans_match = re.match(r"^Answer\s*[:\-]?\s*(.*)$", line, re.IGNORECASE)
+            if ans_match:
+                raw_ans = ans_match.group(1).strip()
+                if re.fullmatch(r"[A-Da-d]", raw_ans):
+                    answer = raw_ans.upper()
+                elif re.match(r"^[A-Da-d][\)\.:\-]?", raw_ans):
+                    answer = raw_ans[0].upper()
+                else:
+                    for k, v in options.items():
+                        if raw_ans.lower() in v.lower() or v.lower() in raw_ans.lower():
+                            answer = k
+                            break
+        if not answer and options:
+            for k, v in options.items():
+                if 'correct' in v.lower() or 'right' in v.lower():
+                    answer = k
+                    break
+        if question and len(options) >= 2 and answer in options:
+            all_keys = ['A', 'B', 'C', 'D']
+            opts = [options.get(k, "") for k in all_keys]
+            mcqs.append({{
+                "question": question,
+                "options": opts,
+                "answer": options[answer]
+            }})
+    return mcqs
+
+def robust_parse_mcqs(text: str):
+    ""
+    Extracts and parses the first JSON array from text, even if wrapped in markdown or with trailing commas.
+    Returns a list of dicts or [] if parsing fails.
+    ""
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
+    json_match = re.search(r"```json\s*(.*?)\s*```", text, re.DOTALL)
+    if json_match:
+        text = json_match.group(1)
+    array_match = re.search(r"\[\s*{{.*?}}\s*\]", text, re.DOTALL)
+    if array_match:
+        text = array_match.group(0)
+    text = re.sub(r",\s*([\]}}])", r"\1", text)
+    text = re.sub(r",\s*\]", "]", text)
+    try:
+        return json.loads(text)
+    except Exception:
+        return []
+
+[END PARSER CODE]
+
+Lesson Content:
+{lesson_content}
+"""
+
+def parse_outline_to_lessons(outline_raw: str) -> list[dict]:
+    lines = [l.strip() for l in outline_raw.splitlines() if l.strip()]
+    lessons = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        # Existing: 1. **Title**
+        title_match = re.match(r'^\d+\.\s+\*\*(.+?)\*\*$', line)
+        if title_match:
+            current_title = title_match.group(1).strip()
+            # Look ahead for summary
+            if i + 1 < len(lines):
+                summary_line = lines[i + 1].strip()
+                if summary_line.startswith("-"):
+                    summary = summary_line.lstrip("- ").strip()
+                    lessons.append({
+                        "title": current_title,
+                        "summary": summary
+                    })
+                    i += 2
+                    continue
+        # Existing: 1. Title: Summary
+        elif "." in line:
+            parts = line.split(".", 1)
+            if parts[0].strip().isdigit():
+                title_desc = parts[1].split(":", 1)
+                if len(title_desc) == 2:
+                    lessons.append({
+                        "title": title_desc[0].strip(),
+                        "summary": title_desc[1].strip()
+                    })
+                    i += 1
+                    continue
+        # NEW: Lesson N. Title [newline] Summary
+        lesson_match = re.match(r'^Lesson\s*\d+\.\s*(.+)$', line, re.IGNORECASE)
+        if lesson_match:
+            title = lesson_match.group(1).strip()
+            # Look ahead for summary (next non-empty line)
+            summary = ""
+            j = i + 1
+            while j < len(lines):
+                next_line = lines[j].strip()
+                if next_line and not next_line.lower().startswith("lesson"):
+                    summary = next_line
+                    break
+                j += 1
+            if title and summary:
+                lessons.append({
+                    "title": title,
+                    "summary": summary
+                })
+                i = j + 1
+                continue
+        i += 1
+    return lessons
+
+
+def validate_mcqs(parsed_mcqs: List[dict]) -> List[MCQ]:
+    """
+    Keep the parsed questions fit to show: four non-empty options, a unique
+    question and an answer that is one of the options.
+    """
+    mcqs = []
+    seen_questions = set()
+    for idx, m in enumerate(parsed_mcqs):
+        try:
+            # Ensure options is a list of 4 non-empty strings
+            options = m.get("options", [])
+            options = [opt for opt in options if isinstance(opt, str) and opt.strip()]
+            if len(options) < 4:
+                logger.warning(f"[Quiz Q{idx+1}] Skipped: fewer than 4 options")
+                continue
+
+            # Ensure question is unique and non-empty
+            question_text = m.get("question", "").strip()
+            if not question_text or question_text in seen_questions:
+                logger.warning(f"[Quiz Q{idx+1}] Skipped: duplicate or empty question")
+                continue
+            seen_questions.add(question_text)
+
+            # Ensure answer is present and matches one of the options
+            answer = m.get("answer", "").strip()
+            if not answer or answer not in options:
+                logger.warning(f"[Quiz Q{idx+1}] Skipped: answer missing or not in options")
+                continue
+
+            mcq = MCQ(
+                question=question_text,
+                options=options,
+                answer=answer
+            )
+            mcqs.append(mcq)
+            logger.debug(f"[Quiz Q{idx+1}] {mcq.question} | Answer: {mcq.answer}")
+        except Exception as e:
+            logger.warning(f"[Quiz Q{idx+1}] Skipped due to parse error: {e}")
+    return mcqs
+
+
+def topic_from_prompt(prompt: str) -> str:
+    return (
+        prompt.replace("I want to learn about", "")
+        .replace("Tell me about", "")
+        .replace("Teach me", "")
+        .replace("What is", "")
+        .strip().capitalize()
+    )
+
+async def generate_outline(prompt: str, outline: Optional[list] = None) -> List[dict]:
+    """
+    The lessons ({"title", "summary"}) to build: `outline` when the client
+    sent one, else the cached outline of a near-identical earlier topic, else
+    written by the LLM (and cached). Raises ValueError when none parse.
+    """
+    cached = None
+    if not outline and OUTLINE_CACHE_ENABLED:
+        try:
+            cached = await asyncio.to_thread(outline_cache.lookup, prompt)
+        except sqlite3.Error as e:
+            logger.warning(f"[outline-cache] Lookup failed: {e}")
+        outline_cache_lookups.inc(result="hit" if cached else "miss")
+
+    source = "request" if outline else "cache" if cached else "llm"
+    with span("outline", source=source) as outline_span:
+        if outline:
+            logger.info("[generate/full] Using outline provided by frontend...")
+            lessons_meta = [
+                {"title": item["title"], "summary": item["summary"]}
+                for item in outline
+            ]
+        elif cached:
+            logger.info(
+                f"[generate/full] Reusing cached outline of {cached.topic!r} (similarity {cached.similarity:.2f})"
+            )
+            outline_span.set(similarity=round(cached.similarity, 3))
+            lessons_meta = cached.outline
+        else:
+            logger.info("[generate/full] No outline provided — generating with LLM...")
+            outline_prompt = f"""
+            You're an expert curriculum designer. Based on the user's topic, generate a course outline.
+
+            Instructions:
+            - You decide the number of lessons for the topic given by the user.
+            - If you think that the topic the user gave needs only 1 or two lessons, because it is a short topic, then make it like that. For example, if the user gives a topic like "SQL Join Operations", then make the course outline for just that one lesson.
+            - Similarly, if you think that the topic the user gave is broad, which comprises many chapters, then make each lesson for a respective chapter. For example, if the user gives a topic like "Python programming", then this will have all the lessons, like data types, operators, control flow (conditionals and loops), functions, and object-oriented programming (OOP), etc.
+            - So yeah you think and decide the appropriate number of lessons needed to be generated as per the user's topic.
+            - For each lesson, use the format:
+            - Lesson number., Title:, A concise Summary
+            - Do NOT include quizzes, videos, or any extra text.
+            - Only output the lessons in numbered list format.
+
+            Topic: {prompt}
+            """
+
+            outline_raw = await generate_content(outline_prompt)
+            logger.info(f"[generate/full] Outline returned ({len(outline_raw)} chars)")
+            log_payload("generate/full", "Raw outline", outline_raw)
+            lessons_meta = parse_outline_to_lessons(outline_raw)
+            if lessons_meta and OUTLINE_CACHE_ENABLED:
+                try:
+                    await asyncio.to_thread(outline_cache.add, prompt, lessons_meta)
+                except sqlite3.Error as e:
+                    logger.warning(f"[outline-cache] Could not store outline: {e}")
+        outline_span.set(lessons=len(lessons_meta))
+
+    if not lessons_meta:
+        logger.warning("[generate/full] No lessons parsed from outline.")
+        raise ValueError("Could not parse course outline.")
+    return lessons_meta
+
+
+def lesson_prompt(title: str, summary: str) -> str:
+    """The prompt for one lesson's markdown body."""
+    return (
+        f"You are an expert technical educator, curriculum designer, and professional textbook author.\n"
+        f"Your task is to generate a single, standalone lesson in **Markdown** that is polished, engaging, and at least 1000 words long (excluding code blocks, tables, and lists). Every lesson produced must be “pure gold” — pedagogically robust, crystal‑clear, and immediately actionable.\n\n"
+        "## Lesson Context\n"
+        f"Title: {title}\n"
+        f"Summary: {summary}\n\n"
+        "## Uncompromising Quality Guidelines\n\n"
+        "1. **Introduction & Motivation**  \n"
+        "   - Begin with a vivid real‑world scenario or question to spark curiosity.  \n"
+        "   - Explain *why* the topic matters now (applications, industry relevance, everyday life).  \n"
+        "   - State 3–5 precise learning objectives as bullet points.\n\n"
+        "2. **Logical Progression & Chunking**  \n"
+        "   - Break the content into 4–6 major sections (`## Section Name`) that build from simple to complex.  \n"
+        "   - Within each section, use 2–3 subsections (`### Subsection Name`) for focused ideas or steps.\n\n"
+        "3. **Pedagogical Enhancements**  \n"
+        "   - **Concept Quiz:** After introducing a key concept, insert a very short “Check Your Understanding” question (one sentence).  \n"
+        "   - **Analogy Spotlight:** Provide at least one vivid analogy per section to anchor abstract ideas in everyday experience.  \n"
+        "   - **Common Pitfalls:** In each major section, include a **Warning:** block highlighting 1–2 misconceptions and how to avoid them.\n\n"
+        "4. **Worked Examples & Practice**  \n"
+        "   - For analytical topics (Math, Physics, CS, Engineering):  \n"
+        "     - Include **4–6 detailed worked examples** with step‑by‑step reasoning, diagrams (ASCII or descriptive), and “Why this step?” explanations.  \n"
+        "     - Add **5–7 practice problems** at the end with brief answer hints or full solutions in a collapsible block (using `<details>` if desired).  \n"
+        "   - For conceptual or qualitative topics:  \n"
+        "     - Include **3 realistic scenarios** illustrating the concept in different contexts.  \n"
+        "     - Provide **3 reflective questions** prompting learners to apply the idea to their own projects.\n\n"
+        "5. **Formatting & Accessibility**  \n"
+        "   - Use callout blocks: **Note:** for extra tips, **Tip:** for best practices, **Warning:** for pitfalls.  \n"
+        "   - Present formulas/code in fenced blocks, labeling language or math.  \n"
+        "   - Provide alt‑text descriptions for any mentioned diagrams or images.  \n"
+        "   - Use tables for comparisons, flowcharts as ASCII diagrams, and numbered lists for procedures.\n\n"
+        "6. **Reinforcement & Reflection**  \n"
+        "   - After each major section, include a **Key Takeaways** box with 3–5 bullets.  \n"
+        "   - Insert a short **Reflection Prompt** encouraging learners to write or think (e.g., “How would you explain X to a peer?”).\n\n"
+        "7. **Conclusion & Next Steps**  \n"
+        "   - Conclude with a concise **Recap** tying back to the learning objectives.  \n"
+        "   - Suggest 3 curated **Further Reading & Resources** (articles, videos, docs) with 1‑line annotations.  \n"
+        "   - End with an **Action Challenge**: a small project or experiment to solidify understanding.\n\n"
+        "8. **Tone & Style**  \n"
+        "   - Maintain a confident, supportive, and jargon‑free voice.  \n"
+        "   - Write in second person (“you”) to engage the learner.  \n"
+        "   - Keep paragraphs to 2–4 sentences; use whitespace generously.\n\n"
+        "9. **Length & Depth**  \n"
+        "   - Ensure the lesson is deep enough to satisfy intermediate learners but clear enough for motivated beginners.  \n"
+        "   - Enforce a minimum of **1000 words** (excluding structural elements), but prioritize clarity over fluff.\n\n"
+        "Stay laser‑focused on the given Title and Summary. Do not reference any other lessons, external platforms, or hypothetical prerequisites. All content must be original, accurate, and designed to deliver maximum learning impact.\n"
+    )
+
+
+def screen_videos(videos_raw: list) -> list:
+    """Drop candidate videos without a usable thumbnail or with a spammy description."""
+    clean_lesson_videos = []
+
+    for video in videos_raw:
+        logger.debug("Checking video: %s | Thumbnail: %s", video.title, getattr(video, "thumbnail", ""))
+        if not getattr(video, "thumbnail", "") or "http" not in getattr(video, "thumbnail", ""):
+            logger.debug("Filtered out: missing or invalid thumbnail")
+            continue
+        if hasattr(video, "description") and video_filters.is_spammy(video.description):
+            logger.debug("Filtered out: spammy description")
+            continue
+        clean_lesson_videos.append(video)
+    return clean_lesson_videos
+
+
+async def generate_quiz(title: str, content: str) -> List[MCQ]:
+    """Validated MCQs on a lesson's content, or a placeholder question when none are usable."""
+    with span("lesson.quiz") as quiz_span:
+        quiz_prompt = QUIZ_PROMPT_TEMPLATE.format(num_questions=5, lesson_content=content)
+
+        quiz_raw = await generate_content(quiz_prompt)
+        log_payload("generate/full", f"Raw quiz for '{title}'", quiz_raw)
+
+        # Handles <think> blocks, markdown fences and surrounding prose itself
+        parsed_mcqs = robust_parse_mcqs(quiz_raw)
+
+        mcqs = validate_mcqs(parsed_mcqs)
+        quiz_span.set(parsed=len(parsed_mcqs), valid=len(mcqs))
+
+        # Check if no valid MCQs were generated
+        if not mcqs:
+            logger.warning(f"[Quiz] No valid MCQs generated for lesson '{title}'. Adding placeholder.")
+            mcqs.append(MCQ(
+                question="No valid quiz questions could be generated for this lesson.",
+                options=["N/A", "N/A", "N/A", "N/A"],
+                answer="N/A"
+            ))
+    return mcqs
+
+
+def clean_content(content: str) -> str:
+    """The lesson markdown without the model's <think> block."""
+    return re.sub(r"<think>.*?</think>", "", content, flags=re.DOTALL).strip()
+
+
+async def generate_lesson(index: int, meta: dict, videos_raw: list) -> Lesson:
+    """Content, screened videos (from the batched search) and quiz for one outline entry."""
+    title = meta["title"]
+    with span("lesson", index=index, title=title):
+        summary = meta["summary"]
+        logger.info(f"[generate/full] Generating lesson: {title}")
+
+        with span("lesson.content") as content_span:
+            content = clean_content(await generate_content(lesson_prompt(title, summary)))
+            logger.info(f"[generate/full] Lesson content for '{title}': {len(content)} chars")
+            log_payload("generate/full", f"Lesson content for '{title}'", content)
+            content_span.set(chars=len(content))
+
+        with span("lesson.videos") as videos_span:
+            logger.info(f"[generate/full] {len(videos_raw)} candidate videos for '{title}'")
+            log_payload("generate/full", f"Raw videos for '{title}'", videos_raw)
+            clean_lesson_videos = screen_videos(videos_raw)
+            videos_span.set(candidates=len(videos_raw), kept=len(clean_lesson_videos))
+
+        mcqs = await generate_quiz(title, content)
+
+    return Lesson(
+        id=str(uuid4()),
+        title=title,
+        summary=summary,
+        content=content,
+        videos=clean_lesson_videos,
+        quiz=mcqs
+    )
+
+
+async def build_full_course(
+    prompt: str,
+    user_id: str,
+    outline: Optional[list] = None,
+    on_progress: Optional[Callable[[str], None]] = None,
+    build_id: Optional[str] = None,
+    lazy: Optional[bool] = None,
+) -> dict:
+    """
+    Generate, save and return a summary of a full course for `prompt`.
+    `outline` is a list of {"title", "summary"} items; without one the LLM
+    writes it. `on_progress` is called with a short stage label ("outline",
+    "lesson 2/5", ...) as the build advances. Raises ValueError when no
+    lessons can be parsed; anything else propagates from the services.
+
+    The course row is created as soon as the outline is known and every
+    lesson is checkpointed and saved to it when finished, so learners can
+    start before the build ends. Passing the `build_id` of a build that
+    stopped resumes it: only the missing lessons are generated.
+
+    A `lazy` build (default LAZY_LESSONS) saves each lesson with its title,
+    summary and videos only; the body and quiz are generated when the lesson
+    is first opened (see services/lesson_materializer.py).
+    """
+    progress = on_progress or (lambda stage: None)
+    build_id = build_id or uuid4().hex
+    lazy = LAZY_LESSONS if lazy is None else lazy
+    build = await asyncio.to_thread(build_checkpoints.get, build_id)
+    if build is not None:
+        # A resumed build keeps its original prompt, owner, outline and mode
+        prompt, user_id, lazy = build.prompt, build.user_id, build.lazy
+    clean_topic = topic_from_prompt(prompt)
+    title = f"Course on {clean_topic}"
+
+    with span("course.build", root=True, topic=clean_topic, request_id=current_request_id(),
+              build_id=build_id, resumed=build is not None, lazy=lazy) as build_span:
+        if build is None:
+            logger.info(f"[generate/full] Building full course for: {prompt[:80]}...")
+            progress("outline")
+            lessons_meta = await generate_outline(prompt, outline)
+            build = await asyncio.to_thread(build_checkpoints.start, build_id, user_id, prompt, lessons_meta, lazy=lazy)
+        else:
+            logger.info(f"[generate/full] Resuming build {build_id} for: {prompt[:80]}...")
+            await asyncio.to_thread(build_checkpoints.resume, build_id)
+            lessons_meta = build.outline
+
+        course_id = build.course_id
+        try:
+            if course_id is None:
+                course_id = await create_course_record(
+                    user_id, title, f"An AI-generated course on {clean_topic}", build_status="building"
+                )
+                await asyncio.to_thread(build_checkpoints.set_course, build_id, course_id)
+            else:
+                await set_course_build_status(course_id, "building")
+            build_span.set(course_id=course_id)
+
+            # Lessons run in order, so checkpointed ones are always a prefix of the outline
+            checkpoints = await asyncio.to_thread(build_checkpoints.lessons, build_id)
+            for position, checkpoint in checkpoints.items():
+                if checkpoint.lesson_id is None:
+                    # Generated before the interruption but never saved to the course
+                    await _save_lesson(build_id, course_id, position, Lesson(**checkpoint.lesson), pending=lazy)
+            if checkpoints:
+                logger.info(f"[generate/full] {len(checkpoints)} of {len(lessons_meta)} lessons already built")
+            build_span.set(lessons=len(lessons_meta), lessons_resumed=len(checkpoints))
+
+            async for index, lesson in generate_missing_lessons(build_id, lessons_meta, checkpoints, progress, lazy):
+                await _save_lesson(build_id, course_id, index, lesson, pending=lazy)
+
+            progress("saving")
+            await set_course_build_status(course_id, "ready")
+            await asyncio.to_thread(build_checkpoints.finish, build_id)
+        except Exception as e:
+            await asyncio.to_thread(build_checkpoints.fail, build_id, f"{type(e).__name__}: {e}")
+            if course_id is not None:
+                try:
+                    await set_course_build_status(course_id, "incomplete")
+                except Exception as status_error:
+                    logger.warning(f"[generate/full] Could not mark course {course_id} incomplete: {status_error}")
+            logger.warning(f"[generate/full] Build {build_id} stopped; resume it to finish the missing lessons")
+            raise
+
+        logger.info(f"[generate/full] ✅ Saved course ID: {course_id}")
+        return {
+            "message": "Course successfully generated",
+            "course_id": course_id,
+            "title": title,
+            "build_id": build_id,
+        }
+
+
+async def generate_missing_lessons(
+    build_id: str,
+    lessons_meta: List[dict],
+    done: Collection[int],
+    progress: Callable[[str], None],
+    lazy: bool = False,
+) -> AsyncIterator[Tuple[int, Lesson]]:
+    """
+    Generate, in order, the outline entries whose positions (from 1) are not
+    in `done`, checkpointing each one before yielding (position, lesson).
+    `lazy` lessons have no content or quiz yet, and no videos unless
+    LAZY_LESSON_VIDEOS is set.
+    """
+    missing = [(i, meta) for i, meta in enumerate(lessons_meta, start=1) if i not in done]
+    if not missing:
+        return
+
+    videos_by_title = {}
+    if not lazy or LAZY_LESSON_VIDEOS:
+        # Search videos for every missing lesson up front so detail lookups are batched
+        progress("videos")
+        with span("videos.batch", queries=len(missing)) as batch_span:
+            videos_by_title = await fetch_videos_batch([meta["title"] for _, meta in missing], max_results=3)
+            batch_span.set(videos=sum(len(v) for v in videos_by_title.values()))
+
+    for index, meta in missing:
+        progress(f"lesson {index}/{len(lessons_meta)}")
+        videos_raw = videos_by_title.get(meta["title"], [])
+        if lazy:
+            lesson = Lesson(
+                id=str(uuid4()), title=meta["title"], summary=meta["summary"], videos=screen_videos(videos_raw)
+            )
+        else:
+            lesson = await generate_lesson(index, meta, videos_raw)
+        await asyncio.to_thread(build_checkpoints.save_lesson, build_id, index, lesson.model_dump())
+        yield index, lesson
+
+
+async def _save_lesson(build_id: str, course_id: str, position: int, lesson: Lesson, pending: bool = False) -> None:
+    with span("lesson.save", index=position):
+        lesson_ids = await add_course_lessons(course_id, [lesson], pending=pending)
+    await asyncio.to_thread(build_checkpoints.mark_saved, build_id, position, lesson_ids[0])
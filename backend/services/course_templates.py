@@ -0,0 +1,170 @@
+# backend/services/course_templates.py
+#
+# Template courses for popular topics: generated ahead of time by the prewarm
+# CLI (python -m backend.prewarm) through the regular pipeline, and cloned for
+# a user by /generate/full/ instead of being generated again.
+
+import os
+import asyncio
+import sqlite3
+import hashlib
+import logging
+from typing import Callable, Dict, List, Optional
+
+from backend.models.schemas import Lesson
+from backend.services.build_checkpoints import build_checkpoints
+from backend.services.course_pipeline import generate_missing_lessons, generate_outline, topic_from_prompt
+from backend.services.outline_cache import OUTLINE_CACHE_ENABLED, normalize_topic, outline_cache
+from backend.services.supabase_service import clone_course_template, get_course_templates, save_course_template
+from backend.utils.metrics import REGISTRY, Counter
+from backend.utils.tracing import span
+
+logger = logging.getLogger("uvicorn.error")
+
+COURSE_TEMPLATES_ENABLED = os.getenv("COURSE_TEMPLATES_ENABLED", "true").lower() == "true"
+# Owner recorded on template build checkpoints
+TEMPLATE_OWNER = "template"
+
+template_clones = REGISTRY.register(Counter(
+    "course_template_clones_total", "Course builds answered by cloning a template, by result.", ("result",)))
+
+
+def template_key(topic: str) -> str:
+    """Templates are keyed by the topic words, so "Teach me Python" and "python" share one."""
+    return normalize_topic(topic)
+
+
+def template_build_id(key: str) -> str:
+    """Fixed per topic, so an interrupted prewarm run picks up the checkpointed lessons."""
+    return "template-" + hashlib.sha256(key.encode()).hexdigest()[:24]
+
+
+def _outline_line(title: str, summary: str) -> str:
+    return " ".join(f"{title}: {summary}".lower().split())
+
+
+def outline_matches(template: dict, outline: List[dict]) -> bool:
+    """
+    Whether a client's outline is the template's, e.g. one the outline
+    endpoint served from it. Lines are compared whole because the frontend
+    splits "Python: Control Flow: summary" at the first colon.
+    """
+    try:
+        sent = [_outline_line(item["title"], item["summary"]) for item in outline]
+    except (KeyError, TypeError):
+        return False
+    return sent == [_outline_line(item["title"], item["summary"]) for item in template["lessons"]]
+
+
+def outline_text(template: dict) -> str:
+    """The template's outline in the format the outline prompt asks the LLM for."""
+    lines = [
+        f"Lesson {i}. {item['title']}: {item['summary']}"
+        for i, item in enumerate(template["lessons"], start=1)
+    ]
+    return "\n".join(lines) + "\n---END---"
+
+
+async def find_template(prompt: str, outline: Optional[List[dict]] = None) -> Optional[dict]:
+    """
+    The template for `prompt` (its own topic words, else those of the most
+    similar cached outline topic), provided `outline` is absent or the
+    template's own. None when there is none or the store is unavailable.
+    """
+    if not COURSE_TEMPLATES_ENABLED:
+        return None
+    keys = [template_key(prompt)]
+    if OUTLINE_CACHE_ENABLED:
+        try:
+            hit = await asyncio.to_thread(outline_cache.lookup, prompt)
+        except sqlite3.Error as e:
+            logger.warning(f"[templates] Outline cache lookup failed: {e}")
+            hit = None
+        if hit is not None:
+            keys.append(template_key(hit.topic))
+    keys = [key for key in dict.fromkeys(keys) if key]
+
+    try:
+        templates = {t["key"]: t for t in await get_course_templates(keys)}
+    except Exception as e:
+        logger.warning(f"[templates] Template lookup failed: {e}")
+        return None
+    for key in keys:
+        template = templates.get(key)
+        if template and template["lessons"] and (not outline or outline_matches(template, outline)):
+            return template
+    return None
+
+
+async def clone_for_user(template: dict, user_id: str) -> Optional[Dict[str, str]]:
+    """
+    Copy `template` into a course for `user_id`, answering like a finished
+    build. None if the clone failed, in which case the caller generates.
+    """
+    with span("template.clone", template=template["key"]) as clone_span:
+        try:
+            course_id = await clone_course_template(template["key"], user_id)
+        except Exception as e:
+            logger.warning(f"[templates] Cloning template {template['key']!r} failed: {e}")
+            course_id = None
+        clone_span.set(course_id=course_id)
+    template_clones.inc(result="cloned" if course_id else "failed")
+    if not course_id:
+        return None
+    logger.info(f"[templates] Cloned template {template['key']!r} into course {course_id}")
+    return {
+        "message": "Course successfully generated",
+        "course_id": course_id,
+        "title": template["title"],
+        "template": template["key"],
+    }
+
+
+async def build_course_template(
+    topic: str, on_progress: Optional[Callable[[str], None]] = None, force: bool = False
+) -> Dict[str, object]:
+    """
+    Generate a course for `topic` (outline, lessons, quizzes, videos) and
+    store it as a template, replacing any earlier one. Lessons are
+    checkpointed under a build id fixed for the topic, so running this again
+    after a failure generates only the missing lessons; `force` starts over.
+    Raises ValueError for a topic without content words or outline.
+    """
+    key = template_key(topic)
+    if not key:
+        raise ValueError(f"No topic words in {topic!r}")
+    progress = on_progress or (lambda stage: None)
+    build_id = template_build_id(key)
+    build = await asyncio.to_thread(build_checkpoints.get, build_id)
+    if build is not None and force:
+        await asyncio.to_thread(build_checkpoints.discard, build_id)
+        build = None
+    clean_topic = topic_from_prompt(topic)
+    title = f"Course on {clean_topic}"
+
+    with span("template.build", root=True, topic=key, build_id=build_id, resumed=build is not None) as build_span:
+        if build is None:
+            progress("outline")
+            lessons_meta = await generate_outline(topic)
+            build = await asyncio.to_thread(build_checkpoints.start, build_id, TEMPLATE_OWNER, topic, lessons_meta)
+        else:
+            await asyncio.to_thread(build_checkpoints.resume, build_id)
+            lessons_meta = build.outline
+
+        try:
+            done = await asyncio.to_thread(build_checkpoints.lessons, build_id)
+            build_span.set(lessons=len(lessons_meta), lessons_resumed=len(done))
+            async for _ in generate_missing_lessons(build_id, lessons_meta, done, progress):
+                pass
+
+            progress("saving")
+            checkpoints = await asyncio.to_thread(build_checkpoints.lessons, build_id)
+            lessons = [Lesson(**c.lesson) for c in checkpoints.values()]
+            await save_course_template(key, topic, title, f"An AI-generated course on {clean_topic}", lessons)
+            await asyncio.to_thread(build_checkpoints.finish, build_id)
+        except Exception as e:
+            await asyncio.to_thread(build_checkpoints.fail, build_id, f"{type(e).__name__}: {e}")
+            raise
+
+    logger.info(f"[templates] Saved template {key!r} ({len(lessons)} lessons)")
+    return {"key": key, "title": title, "lessons": len(lessons), "resumed": len(done), "build_id": build_id}
@@ -0,0 +1,256 @@
+# backend/services/job_queue.py
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+from uuid import uuid4
+
+from backend.utils.metrics import REGISTRY, Gauge
+
+logger = logging.getLogger("uvicorn.error")
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", ".skillmint/jobs.db")
+# A running job whose worker has not heartbeated for this long is handed to another worker
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Delay before a failed attempt is retried, doubled on every further attempt
+JOB_RETRY_DELAY_SECONDS = float(os.getenv("JOB_RETRY_DELAY_SECONDS", "10"))
+# Succeeded and failed jobs (with payload and result) are kept this long for status lookups
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_HOURS", "168")) * 3600
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+STATUSES = (QUEUED, RUNNING, SUCCEEDED, FAILED)
+
+
+class Job(NamedTuple):
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    progress: Optional[str]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    def public(self) -> Dict[str, Any]:
+        """What the status endpoint returns: everything but the payload."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+_COLUMNS = "id, kind, payload, status, attempts, max_attempts, progress, result, error, created_at, updated_at"
+
+
+def _job(row) -> Job:
+    return Job(
+        id=row[0],
+        kind=row[1],
+        payload=json.loads(row[2]),
+        status=row[3],
+        attempts=row[4],
+        max_attempts=row[5],
+        progress=row[6],
+        result=json.loads(row[7]) if row[7] is not None else None,
+        error=row[8],
+        created_at=row[9],
+        updated_at=row[10],
+    )
+
+
+class JobQueue:
+    """
+    Durable job queue in a local SQLite file, shared by the API processes
+    (which enqueue and read status) and any number of generation workers
+    (which claim and run jobs). A claimed job is leased to its worker and the
+    lease is extended by heartbeats; if the worker dies, the lease runs out
+    and the next `claim` picks the job up again, up to `max_attempts` times.
+    All calls are short blocking SQLite statements.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " max_attempts INTEGER NOT NULL,"
+                " progress TEXT,"
+                " result TEXT,"
+                " error TEXT,"
+                " lease_owner TEXT,"
+                " lease_expires_at REAL,"
+                " run_after REAL NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, run_after)")
+            self._conn = conn
+        return self._conn
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        job_id = uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (id, kind, payload, status, max_attempts, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), QUEUED, max_attempts, now, now, now),
+            )
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """
+        Lease the oldest runnable job to `worker_id`: a queued job that is due,
+        or a running one whose lease expired. Jobs that expired on their last
+        attempt are failed instead. Returns None when there is nothing to do.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = conn.execute(
+                        f"SELECT {_COLUMNS} FROM jobs "
+                        "WHERE (status = ? AND run_after <= ?) OR (status = ? AND lease_expires_at < ?) "
+                        "ORDER BY created_at LIMIT 1",
+                        (QUEUED, now, RUNNING, now),
+                    ).fetchone()
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+                    job = _job(row)
+                    if job.status == RUNNING and job.attempts >= job.max_attempts:
+                        logger.warning(f"[jobs] Job {job.id} lost its worker on the last attempt, failing it")
+                        conn.execute(
+                            "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                            "updated_at = ? WHERE id = ?",
+                            (FAILED, "Worker stopped responding", now, job.id),
+                        )
+                        continue
+                    if job.status == RUNNING:
+                        logger.warning(f"[jobs] Lease on job {job.id} expired, reclaiming it")
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                        "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                        (RUNNING, worker_id, now + self.lease_seconds, now, job.id),
+                    )
+                    conn.execute("COMMIT")
+                    return job._replace(status=RUNNING, attempts=job.attempts + 1, updated_at=now)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _update_leased(self, job_id: str, worker_id: str, assignments: str, params: tuple) -> bool:
+        with self._lock:
+            cur = self._connect().execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (*params, time.time(), job_id, RUNNING, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: Optional[str] = None) -> bool:
+        """Extend the lease (and record progress); False means the lease was lost to another worker."""
+        return self._update_leased(
+            job_id, worker_id,
+            "lease_expires_at = ?, progress = COALESCE(?, progress)",
+            (time.time() + self.lease_seconds, progress),
+        )
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._update_leased(
+            job_id, worker_id,
+            "status = ?, result = ?, error = NULL, progress = 'done', lease_owner = NULL, lease_expires_at = NULL",
+            (SUCCEEDED, json.dumps(result)),
+        )
+
+    def fail(self, job: Job, worker_id: str, error: str, retry: bool = True) -> bool:
+        """Requeue the job with backoff while attempts remain (and `retry` is set), else mark it failed."""
+        if retry and job.attempts < job.max_attempts:
+            delay = JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            return self._update_leased(
+                job.id, worker_id,
+                "status = ?, error = ?, run_after = ?, lease_owner = NULL, lease_expires_at = NULL",
+                (QUEUED, error, time.time() + delay),
+            )
+        return self._update_leased(
+            job.id, worker_id,
+            "status = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL",
+            (FAILED, error),
+        )
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Hand an unfinished job back (worker shutting down) without using up an attempt."""
+        return self._update_leased(
+            job_id, worker_id,
+            "status = ?, attempts = MAX(attempts - 1, 0), run_after = 0, lease_owner = NULL, lease_expires_at = NULL",
+            (QUEUED,),
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._connect().execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        found = dict(rows)
+        return {status: found.get(status, 0) for status in STATUSES}
+
+    def purge_finished(self, older_than: float = JOB_RETENTION_SECONDS) -> int:
+        """Delete succeeded and failed jobs last updated more than `older_than` seconds ago."""
+        with self._lock:
+            cur = self._connect().execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (SUCCEEDED, FAILED, time.time() - older_than),
+            )
+        return cur.rowcount
+
+
+job_queue = JobQueue()
+
+jobs_by_status = REGISTRY.register(Gauge(
+    "generation_jobs", "Generation jobs in the shared queue by status.", ("status",)))
+
+
+def _collect_job_counts() -> None:
+    if not os.path.exists(job_queue.path):
+        return
+    for status, count in job_queue.counts().items():
+        jobs_by_status.set(count, status=status)
+
+
+REGISTRY.add_collector(_collect_job_counts)
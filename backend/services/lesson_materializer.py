@@ -0,0 +1,234 @@
+# backend/services/lesson_materializer.py
+#
+# Lessons of lazily built courses (LAZY_LESSONS) are saved as outline entries;
+# their markdown and quiz are generated here when a learner first opens them,
+# streamed to every reader of the lesson as they are written, and stored so
+# later views are plain reads. Finished lessons do not change, so their
+# details are also cached on the host.
+
+import os
+import asyncio
+import sqlite3
+import logging
+from typing import AsyncIterator, Coroutine, Dict, List, Optional, Set
+
+from backend.services.llm_service import stream_content
+from backend.services.supabase_service import (
+    get_course_lesson,
+    get_lessons_by_course_id,
+    get_quiz_by_lesson_id,
+    get_videos_by_lesson_id,
+    hydrate_lesson_content,
+    save_lesson_materialization,
+)
+from backend.utils.metrics import REGISTRY, Counter
+from backend.utils.request_logging import current_request_id
+from backend.utils.tracing import span
+from backend.utils.ttl_cache import SqliteTTLCache
+
+logger = logging.getLogger("uvicorn.error")
+
+# Start generating the next pending lesson while the current one is read
+LAZY_PREFETCH_NEXT = os.getenv("LAZY_PREFETCH_NEXT", "true").lower() == "true"
+
+PENDING = "pending"
+
+LESSON_CACHE_TTL = float(os.getenv("LESSON_CACHE_TTL_HOURS", "24")) * 3600
+lesson_cache = SqliteTTLCache("lesson_detail", max_age=LESSON_CACHE_TTL)
+
+lesson_materializations = REGISTRY.register(Counter(
+    "lesson_materializations_total", "Lazily built lessons generated on first open, by trigger and result.",
+    ("trigger", "result")))
+
+
+class Materialization:
+    """One lesson being generated; any number of readers follow its text."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[str] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        # A fresh event per change, so every waiting reader wakes up once
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def push(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self.error = error
+        self.done = True
+        self._notify()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """The text so far, then each new chunk until the lesson is stored (or failed)."""
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.chunks):
+                yield self.chunks[sent]
+                sent += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+class _ThinkFilter:
+    """Holds streamed text back until a leading <think> block is over, and drops it."""
+
+    OPEN, CLOSE = "<think>", "</think>"
+
+    def __init__(self):
+        self.buffer = ""
+        self.passing = False
+
+    def feed(self, chunk: str) -> str:
+        if self.passing:
+            return chunk
+        self.buffer += chunk
+        head = self.buffer.lstrip()
+        if head.startswith(self.OPEN):
+            end = head.find(self.CLOSE)
+            if end < 0:
+                return ""
+            self.passing = True
+            return head[end + len(self.CLOSE):].lstrip()
+        if self.OPEN.startswith(head):
+            return ""  # may still turn out to be a think block
+        self.passing = True
+        return self.buffer
+
+    def flush(self) -> str:
+        return "" if self.passing else self.buffer
+
+
+_running: Dict[str, Materialization] = {}
+_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn(coro: Coroutine) -> None:
+    # Runs on after the request that started it: a reader leaving early does not waste the generation
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _generate(course_id: str, lesson: dict, materialization: Materialization, trigger: str) -> None:
+    # Imported here so the pipeline is not loaded at app startup
+    from backend.services.course_pipeline import clean_content, generate_quiz, lesson_prompt
+
+    title = lesson["title"]
+    try:
+        with span("lesson.materialize", root=True, course_id=course_id, lesson_id=lesson["id"],
+                  trigger=trigger, request_id=current_request_id()) as materialize_span:
+            logger.info(f"[lessons] Generating lesson '{title}' of course {course_id} ({trigger})")
+            think = _ThinkFilter()
+            raw = []
+            with span("lesson.content") as content_span:
+                async for chunk in stream_content(lesson_prompt(title, lesson.get("summary") or "")):
+                    raw.append(chunk)
+                    if visible := think.feed(chunk):
+                        materialization.push(visible)
+                if tail := think.flush():
+                    materialization.push(tail)
+                content = clean_content("".join(raw))
+                content_span.set(chars=len(content))
+
+            quiz = await generate_quiz(title, content)
+            stored = await save_lesson_materialization(course_id, lesson, content, quiz)
+            materialize_span.set(stored=stored)
+        if not stored:
+            logger.info(f"[lessons] Lesson {lesson['id']} was generated elsewhere first; keeping that one")
+        lesson_materializations.inc(trigger=trigger, result="stored" if stored else "raced")
+        materialization.finish()
+    except Exception as e:
+        logger.exception(f"[lessons] Generating lesson {lesson['id']} failed")
+        lesson_materializations.inc(trigger=trigger, result="failed")
+        materialization.finish(error=f"{type(e).__name__}: {e}")
+    finally:
+        _running.pop(lesson["id"], None)
+
+
+def materialize(course_id: str, lesson: dict, trigger: str = "open") -> Materialization:
+    """The generation of a pending lesson in this process, started unless already running."""
+    materialization = _running.get(lesson["id"])
+    if materialization is None:
+        materialization = _running[lesson["id"]] = Materialization()
+        _spawn(_generate(course_id, lesson, materialization, trigger))
+    return materialization
+
+
+async def _prefetch_next(course_id: str, lesson_id: str) -> None:
+    try:
+        lessons = await get_lessons_by_course_id(course_id)
+    except Exception as e:
+        logger.warning(f"[lessons] Prefetch lookup for course {course_id} failed: {e}")
+        return
+    ids = [lesson["id"] for lesson in lessons]
+    if lesson_id not in ids:
+        return
+    position = ids.index(lesson_id)
+    if position + 1 < len(lessons) and lessons[position + 1].get("content_status") == PENDING:
+        materialize(course_id, lessons[position + 1], trigger="prefetch")
+
+
+def prefetch_next(course_id: str, lesson_id: str) -> None:
+    """Start generating the lesson after `lesson_id` in the background, if it is pending."""
+    _spawn(_prefetch_next(course_id, lesson_id))
+
+
+async def lesson_detail(course_id: str, lesson_id: str) -> Optional[dict]:
+    """One lesson with its content, videos and quiz questions, or None if the course has no such lesson."""
+    lesson = await get_course_lesson(course_id, lesson_id)
+    if lesson is None:
+        return None
+    (lesson,) = await hydrate_lesson_content([lesson])
+    lesson["videos"] = await get_videos_by_lesson_id(lesson_id)
+    quiz = None if lesson.get("content_status") == PENDING else await get_quiz_by_lesson_id(course_id, lesson_id)
+    lesson["quiz"] = quiz["questions"] if quiz else None
+    return lesson
+
+
+def lesson_complete(lesson: dict) -> bool:
+    """
+    Whether a lesson's details are final: written, with its quiz. Lessons are
+    stored before their videos and quiz, so one without a quiz may still be
+    mid-save (or simply have none, and is then read uncached).
+    """
+    return lesson.get("content_status") != PENDING and bool(lesson.get("quiz"))
+
+
+async def cached_lesson_detail(course_id: str, lesson_id: str) -> Optional[dict]:
+    """lesson_detail, from lesson_cache once the lesson is complete."""
+    key = f"{course_id}:{lesson_id}"
+    try:
+        entry = await asyncio.to_thread(lesson_cache.get, key)
+    except sqlite3.Error as e:
+        logger.warning(f"[lessons] Lesson cache read failed: {e}")
+        entry = None
+    if entry is not None:
+        return entry.value
+
+    lesson = await lesson_detail(course_id, lesson_id)
+    if lesson is not None and lesson_complete(lesson):
+        try:
+            await asyncio.to_thread(lesson_cache.set, key, lesson)
+        except sqlite3.Error as e:
+            logger.warning(f"[lessons] Lesson cache write failed: {e}")
+    return lesson
+
+
+async def forget_lessons(course_id: str, lesson_ids: List[str]) -> None:
+    """Drop cached details of a course's lessons, e.g. when it is deleted."""
+    def delete() -> None:
+        for lesson_id in lesson_ids:
+            lesson_cache.delete(f"{course_id}:{lesson_id}")
+
+    try:
+        await asyncio.to_thread(delete)
+    except sqlite3.Error as e:
+        logger.warning(f"[lessons] Lesson cache invalidation failed: {e}")
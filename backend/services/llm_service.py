@@ -3,9 +3,13 @@
 import os
 import json
 import logging
-from typing import AsyncGenerator, List
+from typing import AsyncGenerator, List, Optional
 import httpx
 
+from backend.utils.metrics import timed
+from backend.utils.request_logging import log_payload
+from backend.utils.tracing import span
+
 # Load environment variables
 LLM_URL = os.getenv("LLM_URL") or "http://localhost:11434/api/generate"  # Ensure trailing slash matches server
 MODEL_NAME = os.getenv("LLM_MODEL", "deepseek-r1:1.5b")
@@ -20,8 +24,25 @@ timeout = httpx.Timeout(
     write=10.0,    # seconds to send request data
     pool=None,
 )
-client = httpx.AsyncClient(timeout=60, follow_redirects=True)
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared pooled client, created on first use (inside the running event loop)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=timeout, follow_redirects=True)
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
+@timed("llm")
 async def generate_content(prompt: str) -> str:
     payload = {
         "model": MODEL_NAME,
@@ -30,14 +51,13 @@ async def generate_content(prompt: str) -> str:
     }
 
     try:
-        logger.info("=== Sending LLM Prompt ===")
-        logger.info(prompt[:500])  # Preview only
-        logger.info(f"[LLM] Payload to {LLM_URL}: {payload}")
+        logger.info(f"[LLM] Sending prompt to {MODEL_NAME} ({len(prompt)} chars)")
+        log_payload("LLM", f"Prompt for {MODEL_NAME}", prompt)
 
         full_text = ""
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            async with client.stream("POST", LLM_URL, json=payload) as response:
+        with span("llm.generate", model=MODEL_NAME, prompt_chars=len(prompt)) as s:
+            async with get_client().stream("POST", LLM_URL, json=payload, timeout=120.0) as response:
                 response.raise_for_status()
 
                 async for chunk in response.aiter_lines():
@@ -45,8 +65,15 @@ async def generate_content(prompt: str) -> str:
                         try:
                             data = json.loads(chunk)
                             full_text += data.get("response", "")
+                            if data.get("done"):
+                                # Ollama reports token counts on the final chunk
+                                s.set(
+                                    prompt_tokens=data.get("prompt_eval_count"),
+                                    output_tokens=data.get("eval_count"),
+                                )
                         except Exception:
                             logger.warning(f"[LLM] Failed to parse chunk: {chunk[:100]}")
+            s.set(output_chars=len(full_text))
 
         return full_text.strip()
 
@@ -62,6 +89,7 @@ async def generate_content(prompt: str) -> str:
 
 
 # 🌊 Streaming generation
+@timed("llm")
 async def stream_generate_content(prompt: str) -> AsyncGenerator[str, None]:
     payload = {
         "model": MODEL_NAME,
@@ -70,7 +98,7 @@ async def stream_generate_content(prompt: str) -> AsyncGenerator[str, None]:
     }
 
     try:
-        async with client.stream("POST", LLM_URL, json=payload) as response:
+        async with get_client().stream("POST", LLM_URL, json=payload) as response:
             response.raise_for_status()
             async for line in response.aiter_lines():
                 if not line.strip():
@@ -91,6 +119,45 @@ async def stream_generate_content(prompt: str) -> AsyncGenerator[str, None]:
         logger.exception("[LLM] Unexpected streaming error")
         yield "[Error: Unexpected streaming failure]"
 
+@timed("llm")
+async def stream_content(prompt: str) -> AsyncGenerator[str, None]:
+    """
+    Response chunks as the model writes them. Unlike stream_generate_content,
+    failures raise RuntimeError (as in generate_content) instead of being
+    yielded as text, for callers that store what they stream.
+    """
+    payload = {
+        "model": MODEL_NAME,
+        "prompt": prompt,
+        "stream": True
+    }
+
+    try:
+        with span("llm.generate", model=MODEL_NAME, prompt_chars=len(prompt), streamed=True) as s:
+            output_chars = 0
+            async with get_client().stream("POST", LLM_URL, json=payload, timeout=120.0) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"[LLM] Skipping invalid JSON line: {line[:100]}")
+                        continue
+                    if chunk := data.get("response"):
+                        output_chars += len(chunk)
+                        yield chunk
+                    if data.get("done"):
+                        s.set(prompt_tokens=data.get("prompt_eval_count"), output_tokens=data.get("eval_count"))
+            s.set(output_chars=output_chars)
+    except httpx.RequestError as e:
+        logger.error(f"[LLM] Streaming request error: {e}")
+        raise RuntimeError(f"Failed to contact LLM service at {LLM_URL}: {e}")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"[LLM] Streaming HTTP {e.response.status_code}")
+        raise RuntimeError(f"LLM service error {e.response.status_code}")
+
 async def evaluate_quiz_answer(question: str, options: List[str], answer: str) -> str:
     formatted_options = "\n".join([f"{chr(65+i)}. {opt}" for i, opt in enumerate(options)])
     prompt = (
@@ -0,0 +1,292 @@
+# backend/services/outline_cache.py
+
+import os
+import re
+import json
+import math
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
+from unidecode import unidecode
+
+from backend.utils.metrics import REGISTRY, Counter as MetricCounter
+from backend.utils.ttl_cache import LOCAL_CACHE_PATH
+
+logger = logging.getLogger("uvicorn.error")
+
+OUTLINE_CACHE_ENABLED = os.getenv("OUTLINE_CACHE_ENABLED", "true").lower() == "true"
+# Cosine similarity a prior topic needs for its outline to be reused
+OUTLINE_CACHE_THRESHOLD = float(os.getenv("OUTLINE_CACHE_THRESHOLD", "0.8"))
+OUTLINE_CACHE_MAX_ENTRIES = int(os.getenv("OUTLINE_CACHE_MAX_ENTRIES", "5000"))
+
+# Hashed feature space; topics are short, so collisions are rare at this size
+DIM = 1 << 10
+NGRAM_SIZES = (3, 4, 5)
+# Shortest prefix accepted as an abbreviation of a topic word ("chem")
+ABBREVIATION_MIN_LENGTH = 4
+# Relative weight of each feature kind before idf
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.5
+NGRAM_WEIGHT = 0.25
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+# Ways of asking for a course that say nothing about its topic
+REQUEST_RE = re.compile(
+    r"\b(?:i\s+(?:want|would\s+like|wanna|need)\s+to\s+(?:learn|know|understand|study)"
+    r"|(?:teach|show)\s+me|tell\s+me|help\s+me\s+(?:learn|understand)"
+    r"|what\s+(?:is|are)|how\s+(?:to|do(?:es)?)(?:\s+(?:i|you|we))?(?:\s+(?:do|use))?|(?:an?\s+)?(?:intro(?:duction)?|guide|course)\s+(?:to|on)"
+    r"|(?:the\s+)?basics\s+of|learn|please|explain)\b"
+)
+STOPWORDS = frozenset(
+    "a an and about all as at by for from in into is it me my of on or the to with "
+    "programming language course tutorial lesson lessons basics fundamentals beginner beginners "
+    "complete everything more some work works concept concepts operation operations overview "
+    "principle principles technique techniques".split()
+)
+
+outline_cache_lookups = REGISTRY.register(MetricCounter(
+    "outline_cache_lookups_total", "Outline cache lookups, by result.", ("result",)))
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """numpy, imported on first use rather than at app startup; None if not installed."""
+    try:
+        import numpy
+    except ImportError:  # optional: without it every outline is generated by the LLM
+        return None
+    return numpy
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3 or not word.endswith("s") or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    return word[:-1]
+
+
+def normalize_topic(text: str) -> str:
+    """The topic words of a prompt: lowercased, request phrasing and filler removed, plurals folded."""
+    text = REQUEST_RE.sub(" ", unidecode(text).lower())
+    words = []
+    for word in TOKEN_RE.findall(text):
+        if word in STOPWORDS:
+            continue
+        words.append(_singular(word))
+    return " ".join(words)
+
+
+def _same_word(a: str, b: str) -> bool:
+    short, long = sorted((a, b), key=len)
+    return short == long or (len(short) >= ABBREVIATION_MIN_LENGTH and long.startswith(short))
+
+
+def topic_words_match(a: str, b: str) -> bool:
+    """
+    Whether two normalized topics have the same words, in any order, allowing
+    abbreviations ("organic chem"). Similar topics that add or swap a word
+    ("machine learning python" / "machine learning", "calculus 2" /
+    "calculus") score high on similarity but are different courses.
+    """
+    words_a, words_b = set(a.split()), set(b.split())
+    return all(any(_same_word(w, v) for v in words_b) for w in words_a) and \
+        all(any(_same_word(w, v) for v in words_a) for w in words_b)
+
+
+def _bucket(feature: str) -> int:
+    # crc32 rather than hash(): indexes must agree across processes and restarts
+    h = zlib.crc32(feature.encode())
+    return (h & (DIM - 1)) if h & 0x80000000 else -1 - (h & (DIM - 1))
+
+
+def features(normalized: str) -> Dict[int, float]:
+    """Signed hashed term frequencies (sublinear) of words, word pairs and character n-grams."""
+    words = normalized.split()
+    counts: Counter = Counter()
+    for word in words:
+        counts["w:" + word] += 1
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                counts["c:" + padded[i:i + n]] += 1
+    for pair in zip(words, words[1:]):
+        counts["b:" + " ".join(pair)] += 1
+
+    weights = {"w": WORD_WEIGHT, "b": BIGRAM_WEIGHT, "c": NGRAM_WEIGHT}
+    vector: Dict[int, float] = {}
+    for feature, tf in counts.items():
+        bucket = _bucket(feature)
+        index, sign = (bucket, 1.0) if bucket >= 0 else (-1 - bucket, -1.0)
+        vector[index] = vector.get(index, 0.0) + sign * (1 + math.log(tf)) * weights[feature[0]]
+    return vector
+
+
+class OutlineHit(NamedTuple):
+    topic: str  # the prompt the outline was written for
+    outline: List[Dict[str, str]]
+    similarity: float
+
+
+class OutlineCache:
+    """
+    Parsed outlines of earlier builds, looked up by topic similarity so a
+    paraphrase ("Teach me Python" / "I want to learn about python
+    programming") reuses the outline instead of asking the LLM again.
+
+    Topics are embedded locally, with no model to download: hashed word,
+    word-pair and character n-gram frequencies, weighted by idf over the
+    cached topics and compared by cosine similarity. A hit must also have the
+    same topic words, since one added word makes another course. Rows live in
+    the local SQLite file, so the index survives restarts and is shared by
+    every worker; each process keeps the vectors in memory and picks up rows
+    added by others before a lookup.
+    """
+
+    def __init__(self, path: str = LOCAL_CACHE_PATH, max_entries: int = OUTLINE_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._ids: List[int] = []
+        self._normalized: List[str] = []
+        self._raw = None     # hashed feature rows, one per id; created on the first sync
+        self._matrix = None  # idf-weighted, normalised rows of _raw; rebuilt when rows change
+        self._idf = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outline_cache ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " topic TEXT NOT NULL,"
+                " normalized TEXT NOT NULL UNIQUE,"
+                " outline TEXT NOT NULL,"
+                " hits INTEGER NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL,"
+                " used_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _dense(normalized: str):
+        np = _numpy()
+        vector = np.zeros(DIM, dtype=np.float32)
+        for index, value in features(normalized).items():
+            vector[index] = value
+        return vector
+
+    def _sync(self, conn: sqlite3.Connection) -> None:
+        """Bring the in-memory vectors up to date with the table (caller holds the lock)."""
+        np = _numpy()
+        if self._raw is None:
+            self._raw = np.zeros((0, DIM), dtype=np.float32)
+        count, max_id = conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM outline_cache").fetchone()
+        last_id = self._ids[-1] if self._ids else 0
+        if count == len(self._ids) and max_id == last_id:
+            return
+        if count - len(self._ids) == conn.execute(
+            "SELECT COUNT(*) FROM outline_cache WHERE id > ?", (last_id,)
+        ).fetchone()[0]:
+            # Only appends since the last sync
+            rows = conn.execute(
+                "SELECT id, normalized FROM outline_cache WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+            ids, normalized, raw = self._ids, self._normalized, [self._raw]
+        else:
+            # Rows were evicted: reload everything
+            rows = conn.execute("SELECT id, normalized FROM outline_cache ORDER BY id").fetchall()
+            ids, normalized, raw = [], [], []
+        ids = ids + [row[0] for row in rows]
+        normalized = normalized + [row[1] for row in rows]
+        raw.append(np.array([self._dense(row[1]) for row in rows], dtype=np.float32).reshape(-1, DIM))
+        self._ids, self._normalized, self._raw = ids, normalized, np.concatenate(raw)
+
+        # Smoothed idf per bucket, then unit-length rows for cosine similarity
+        df = np.count_nonzero(self._raw, axis=0)
+        self._idf = (np.log((1 + len(ids)) / (1 + df)) + 1).astype(np.float32)
+        weighted = self._raw * self._idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        self._matrix = weighted / np.maximum(norms, 1e-12)
+
+    def lookup(self, topic: str, threshold: float = OUTLINE_CACHE_THRESHOLD) -> Optional[OutlineHit]:
+        """
+        The cached outline of the most similar prior topic that scores at
+        least `threshold` and has the same topic words (topic_words_match).
+        """
+        normalized = normalize_topic(topic)
+        np = _numpy()
+        if np is None or not normalized:
+            return None
+        query = self._dense(normalized)
+
+        with self._lock:
+            conn = self._connect()
+            self._sync(conn)
+            if not self._ids:
+                return None
+            weighted = query * self._idf
+            norm = np.linalg.norm(weighted)
+            if norm == 0:
+                return None
+            scores = self._matrix @ (weighted / norm)
+            candidates = np.flatnonzero(scores >= threshold)
+            match = next(
+                (int(i) for i in candidates[np.argsort(-scores[candidates])]
+                 if topic_words_match(normalized, self._normalized[i])),
+                None,
+            )
+            if match is None:
+                return None
+            similarity = float(scores[match])
+            row_id = self._ids[match]
+            row = conn.execute("SELECT topic, outline FROM outline_cache WHERE id = ?", (row_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE outline_cache SET hits = hits + 1, used_at = ? WHERE id = ?", (time.time(), row_id)
+            )
+        return OutlineHit(row[0], json.loads(row[1]), similarity)
+
+    def add(self, topic: str, outline: List[Dict[str, str]]) -> bool:
+        """Cache `outline` for `topic`; False when the topic has no content words or is already cached."""
+        normalized = normalize_topic(topic)
+        if _numpy() is None or not normalized or not outline:
+            return False
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO outline_cache (topic, normalized, outline, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (topic, normalized, json.dumps(outline), now, now),
+            )
+            if cur.rowcount and self.max_entries > 0:
+                # Keep the most recently used topics
+                conn.execute(
+                    "DELETE FROM outline_cache WHERE id NOT IN "
+                    "(SELECT id FROM outline_cache ORDER BY used_at DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+        return bool(cur.rowcount)
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM outline_cache").fetchone()[0]
+
+
+outline_cache = OutlineCache()
@@ -1,25 +1,58 @@
 # backend/services/supabase_service.py
 import os
-from supabase import create_client
+import threading
 from uuid import uuid4
 from backend.models.schemas import CourseOut
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set in the .env file")
+_client = None
+_client_lock = threading.Lock()
 
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+
+def get_supabase():
+    """
+    The shared Supabase client, created on first use. The `supabase` package
+    (auth, storage, realtime, ...) is slow to import, so neither it nor the
+    env check runs when the app is imported.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                url = os.getenv("SUPABASE_URL")
+                key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+                if not url or not key:
+                    raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set in the .env file")
+                from supabase import create_client
+                _client = create_client(url, key)
+    return _client
+
+
+class _LazySupabase:
+    """Module-level stand-in so `from supabase_service import supabase` keeps working."""
+
+    def __getattr__(self, name):
+        return getattr(get_supabase(), name)
+
+
+supabase = _LazySupabase()
 
 import logging
+import re
+from datetime import datetime, timezone
 from typing import List, Dict, Any
-from backend.models.schemas import CourseCreate
+from backend.models.schemas import CourseCreate, Lesson
 from typing import Optional
+from backend.utils.content_codec import encode_content, decode_content
+from backend.utils.metrics import timed
 
 logger = logging.getLogger("uvicorn.error")
 
 MAX_QUESTIONS = 5
 
+# Lesson columns needed for listings; the markdown body is loaded separately
+# (see hydrate_lesson_content) only where a lesson is actually rendered.
+LESSON_COLUMNS = "id, course_id, title, summary, content_hash, content_status, created_at"
+
 # --- Utility to convert Pydantic objects to dict (recursive) ---
 def serialize(obj):
     if isinstance(obj, list):
@@ -34,67 +67,129 @@ def add_lesson_title_to_quizzes(quizzes, lessons):
         quiz["lesson_title"] = lesson_id_to_title.get(quiz["lesson_id"], "")
     return quizzes
 
-async def create_course(course: CourseCreate) -> CourseOut:
-    try:
-        # Step 1: Insert course without lessons first
-        course_payload = {
-            "user_id": course.user_id,
-            "title": course.title,
-            "description": course.description,
+@timed("db")
+async def create_course_record(user_id: str, title: str, description: Optional[str], build_status: str = "ready") -> str:
+    """Insert the course row alone and return its id; lessons are added with `add_course_lessons`."""
+    course_resp = supabase.table("courses").insert({
+        "user_id": user_id,
+        "title": title,
+        "description": description,
+        "build_status": build_status,
+    }).execute()
+    return course_resp.data[0]["id"]
+
+@timed("db")
+async def add_course_lessons(course_id: str, lessons: List[Lesson], pending: bool = False) -> List[str]:
+    """
+    Insert lessons (in order, after any the course already has) with their
+    content, video links and quizzes. Returns the new lesson ids. `pending`
+    lessons have no content yet; it is generated when they are first opened.
+    """
+    lesson_ids = []
+    videos_payload = []
+    catalog_payload = {}
+    quizzes_payload = []
+
+    content_hashes = await store_lesson_contents([lesson.content for lesson in lessons])
+
+    for lesson, content_hash in zip(lessons, content_hashes):
+        lesson_data = {
+            "course_id": course_id,
+            "title": lesson.title,
+            "summary": getattr(lesson, "summary", "") or "No summary provided.",  # <-- PATCHED LINE
+            "content_hash": content_hash,
         }
-        course_resp = supabase.table("courses").insert(course_payload).execute()
-        course_data = course_resp.data[0]
-        course_id = course_data["id"]
-
-        # Step 2: Insert each lesson with foreign key to course_id
-        lessons_payload = []
-        videos_payload = []
-        quizzes_payload = []
-
-        for lesson in course.lessons:
-            lesson_data = {
-                "course_id": course_id,
-                "title": lesson.title,
-                "summary": getattr(lesson, "summary", "") or "No summary provided.",  # <-- PATCHED LINE
-                "content": lesson.content,
-            }
-            # Insert lesson first to get lesson_id
-            inserted_lesson = supabase.table("lessons").insert(lesson_data).execute().data[0]
-            lesson_id = inserted_lesson["id"]
-
-            # Videos
-            if lesson.videos:
-                for video in lesson.videos:
-                    # Use attribute access, not .get()
-                    videos_payload.append({
-                        "id": str(uuid4()), 
-                        "course_id": course_id,
-                        "lesson_id": lesson_id,
-                        "title": getattr(video, "title", None),
-                        "video_id": getattr(video, "video_id", None),
-                        "description": getattr(video, "description", None),
-                        "thumbnail": getattr(video, "thumbnail", None),
-                        "url": getattr(video, "url", None),
-                    })
-
-            # Quizzes
-            if lesson.quiz:
-                quizzes_payload.append({
+        if pending:
+            lesson_data["content_status"] = "pending"
+        # Insert lesson first to get lesson_id
+        inserted_lesson = supabase.table("lessons").insert(lesson_data).execute().data[0]
+        lesson_id = inserted_lesson["id"]
+        lesson_ids.append(lesson_id)
+
+        # Videos: metadata goes to the shared catalog, the lesson only keeps links
+        if lesson.videos:
+            for position, video in enumerate(lesson.videos):
+                catalog_payload.setdefault(video.video_id, video)
+                videos_payload.append({
                     "course_id": course_id,
                     "lesson_id": lesson_id,
-                    "title": f"Quiz for {lesson.title}",
-                    "questions": [q if isinstance(q, dict) else q.model_dump() for q in lesson.quiz],
+                    "video_id": video.video_id,
+                    "position": position,
                 })
 
-        # Bulk insert videos and quizzes
-        if videos_payload:
-            supabase.table("videos").insert(videos_payload).execute()
-        if quizzes_payload:
-            supabase.table("quizzes").insert(quizzes_payload).execute()
+        # Quizzes
+        if lesson.quiz:
+            quizzes_payload.append({
+                "course_id": course_id,
+                "lesson_id": lesson_id,
+                "title": f"Quiz for {lesson.title}",
+                "questions": [q if isinstance(q, dict) else q.model_dump() for q in lesson.quiz],
+            })
+
+    # Bulk insert videos and quizzes
+    if videos_payload:
+        await upsert_video_catalog(list(catalog_payload.values()))
+        supabase.table("lesson_videos").insert(videos_payload).execute()
+    if quizzes_payload:
+        supabase.table("quizzes").insert(quizzes_payload).execute()
+    return lesson_ids
+
+@timed("db")
+async def set_course_build_status(course_id: str, build_status: str) -> None:
+    """"building" while lessons are still being added, "incomplete" if the build stopped, else "ready"."""
+    supabase.table("courses").update({"build_status": build_status}).eq("id", course_id).execute()
+
+@timed("db")
+async def save_course_template(key: str, topic: str, title: str, description: Optional[str], lessons: List[Lesson]) -> None:
+    """
+    Store `lessons` as template `key`, replacing any earlier one. Bodies go to
+    lesson_contents and videos to the catalog; the template keeps references.
+    """
+    content_hashes = await store_lesson_contents([lesson.content for lesson in lessons])
+    await upsert_video_catalog(list({v.video_id: v for lesson in lessons for v in lesson.videos or []}.values()))
+    items = [
+        {
+            "title": lesson.title,
+            "summary": lesson.summary or "No summary provided.",
+            "content_hash": content_hash,
+            "video_ids": [video.video_id for video in lesson.videos or []],
+            "quiz": [q if isinstance(q, dict) else q.model_dump() for q in lesson.quiz or []],
+        }
+        for lesson, content_hash in zip(lessons, content_hashes)
+    ]
+    supabase.table("course_templates").upsert({
+        "key": key,
+        "topic": topic,
+        "title": title,
+        "description": description,
+        "lessons": items,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }, on_conflict="key").execute()
+
+@timed("db")
+async def get_course_templates(keys: List[str]) -> List[dict]:
+    if not keys:
+        return []
+    res = supabase.table("course_templates").select("key, topic, title, description, lessons") \
+        .in_("key", keys).execute()
+    return res.data or []
+
+@timed("db")
+async def clone_course_template(key: str, user_id: str) -> Optional[str]:
+    """Copy template `key` into a ready course for `user_id` in one round trip; returns the course id."""
+    return supabase.rpc("clone_course_template", {"p_key": key, "p_user_id": user_id}).execute().data
+
+@timed("db")
+async def create_course(course: CourseCreate) -> CourseOut:
+    try:
+        course_id = await create_course_record(course.user_id, course.title, course.description)
+        await add_course_lessons(course_id, course.lessons)
 
         # Fetch all lessons, videos, quizzes for return
-        lessons_with_ids = supabase.table("lessons").select("*").eq("course_id", course_id).execute().data
-        videos = supabase.table("videos").select("*").eq("course_id", course_id).execute().data
+        lessons_with_ids = await hydrate_lesson_content(
+            supabase.table("lessons").select(LESSON_COLUMNS).eq("course_id", course_id).execute().data
+        )
+        videos = await get_videos_by_course_id(course_id)
         quizzes = supabase.table("quizzes").select("*").eq("course_id", course_id).execute().data
 
         # --- PATCH: Add lesson_title to each quiz ---
@@ -115,6 +210,7 @@ async def create_course(course: CourseCreate) -> CourseOut:
         logger.error(f"[supabase] Create failed: {e}")
         raise RuntimeError("Failed to create course")
 
+@timed("db")
 async def get_course(course_id: str) -> Dict[str, Any]:
     try:
         resp = supabase.table("courses").select("*").eq("id", course_id).single().execute()
@@ -126,21 +222,7 @@ async def get_course(course_id: str) -> Dict[str, Any]:
         raise RuntimeError("Failed to fetch course")
 
 
-def list_courses(user_id: Optional[str] = None) -> List[Dict[str, Any]]:
-    try:
-        query = supabase.table("courses").select("*").order("created_at", desc=True)
-        
-        if user_id:
-            query = query.eq("user_id", user_id)
-        
-        result = query.execute()
-        return result.data
-
-    except Exception as e:
-        logger.error(f"[supabase] List failed: {e}")
-        raise RuntimeError("Failed to fetch courses")
-
-
+@timed("db")
 async def update_course(course_id: str, course: CourseCreate) -> Dict[str, Any]:
     try:
         payload = {
@@ -157,14 +239,16 @@ async def update_course(course_id: str, course: CourseCreate) -> Dict[str, Any]:
         raise RuntimeError("Failed to update course")
 
 
+@timed("db")
 async def delete_course(course_id: str) -> None:
     try:
         # Delete quizzes
         supabase.table("quizzes").delete().eq("course_id", course_id).execute()
-        # Delete videos
+        # Delete videos (catalog entries are shared and stay)
+        supabase.table("lesson_videos").delete().eq("course_id", course_id).execute()
         supabase.table("videos").delete().eq("course_id", course_id).execute()
         # Delete lessons
-        supabase.table("lessons").delete().eq("course_id", course_id).execute()
+        lessons = supabase.table("lessons").delete().eq("course_id", course_id).execute().data or []
         # Finally, delete the course itself
         supabase.table("courses").delete().eq("id", course_id).execute()
         logger.info(f"[supabase] Course and related data deleted: {course_id}")
@@ -172,6 +256,17 @@ async def delete_course(course_id: str) -> None:
         logger.error(f"[supabase] Delete failed: {e}")
         raise RuntimeError("Failed to delete course and related data")
 
+    # Lesson bodies are shared by content hash: only those nothing else uses go
+    hashes = sorted({lesson["content_hash"] for lesson in lessons if lesson.get("content_hash")})
+    if hashes:
+        try:
+            removed = supabase.rpc("delete_unused_lesson_contents", {"p_hashes": hashes}).execute().data
+            logger.info(f"[supabase] Removed {removed or 0} of {len(hashes)} lesson bodies of course {course_id}")
+        except Exception as e:
+            # Harmless leftovers: the course is gone either way
+            logger.warning(f"[supabase] Could not remove lesson bodies of course {course_id}: {e}")
+
+@timed("db")
 async def get_course_by_id(course_id: str) -> Optional[dict]:
     course = supabase.from_("courses").select("*").eq("id", course_id).single().execute().data
     if not course:
@@ -185,12 +280,14 @@ async def get_course_by_id(course_id: str) -> Optional[dict]:
     course["videos"] = videos  # <-- Add videos to the course dict
     return course
 
+@timed("db")
 async def get_quizzes_by_course_id(course_id: str):
     lessons = await get_lessons_by_course_id(course_id)
     res = supabase.table("quizzes").select("*").eq("course_id", course_id).execute()
     quizzes = res.data or []
     return add_lesson_title_to_quizzes(quizzes, lessons)
 
+@timed("db")
 async def list_courses(user_id: str) -> List[Dict[str, Any]]:
     try:
         resp = supabase.table("courses").select("*").eq("user_id", user_id).execute()
@@ -200,6 +297,7 @@ async def list_courses(user_id: str) -> List[Dict[str, Any]]:
         raise RuntimeError("Failed to fetch courses")
     
 
+@timed("db")
 async def get_quiz_by_lesson_id(course_id: str, lesson_id: str) -> Optional[dict]:
     try:
         resp = supabase.table("quizzes") \
@@ -218,9 +316,10 @@ async def get_quiz_by_lesson_id(course_id: str, lesson_id: str) -> Optional[dict
 
 # near the bottom, alongside your other async functions
 
+@timed("db")
 async def get_lessons_by_course_id(course_id: str) -> List[dict]:
     resp = supabase.table("lessons") \
-        .select("*") \
+        .select(LESSON_COLUMNS) \
         .eq("course_id", course_id) \
         .order("created_at", desc=False) \
         .execute()
@@ -231,6 +330,269 @@ async def get_lessons_by_course_id(course_id: str) -> List[dict]:
 
     return resp.data  # each item matches your Lesson schema
 
+@timed("db")
+async def get_course_lesson(course_id: str, lesson_id: str) -> Optional[dict]:
+    """One lesson of a course (LESSON_COLUMNS, without its body), or None."""
+    resp = supabase.table("lessons").select(LESSON_COLUMNS) \
+        .eq("course_id", course_id).eq("id", lesson_id).execute()
+    return resp.data[0] if resp.data else None
+
+@timed("db")
+async def save_lesson_materialization(course_id: str, lesson: dict, content: str, quiz: List[Any]) -> bool:
+    """
+    Store the generated body and quiz of a pending lesson. False, and nothing
+    written, when another process materialized the lesson first.
+    """
+    content_hash = (await store_lesson_contents([content]))[0]
+    updated = supabase.table("lessons") \
+        .update({"content_hash": content_hash, "content_status": "ready"}) \
+        .eq("id", lesson["id"]).eq("content_status", "pending") \
+        .execute().data
+    if not updated:
+        return False
+    if quiz:
+        supabase.table("quizzes").insert({
+            "course_id": course_id,
+            "lesson_id": lesson["id"],
+            "title": f"Quiz for {lesson['title']}",
+            "questions": [q if isinstance(q, dict) else q.model_dump() for q in quiz],
+        }).execute()
+    return True
+
+@timed("db")
+async def store_lesson_contents(contents: List[Optional[str]]) -> List[Optional[str]]:
+    """
+    Compress lesson bodies into `lesson_contents` and return their hashes, in order.
+    Identical bodies (within the batch or already stored) share a single row.
+    """
+    rows = {}
+    hashes = []
+    for content in contents:
+        if not content:
+            hashes.append(None)
+            continue
+        row = encode_content(content)
+        rows.setdefault(row["hash"], row)
+        hashes.append(row["hash"])
+
+    if rows:
+        supabase.table("lesson_contents") \
+            .upsert(list(rows.values()), on_conflict="hash", ignore_duplicates=True) \
+            .execute()
+        raw = sum(r["raw_size"] for r in rows.values())
+        stored = sum(r["stored_size"] for r in rows.values())
+        logger.info(f"[supabase] Stored {len(rows)} lesson bodies: {raw} -> {stored} bytes")
+
+    return hashes
+
+@timed("db")
+async def hydrate_lesson_content(lessons: List[dict]) -> List[dict]:
+    """
+    Fill in `content` for lessons fetched with LESSON_COLUMNS.
+    One query for compressed bodies, plus one for legacy rows that still keep
+    their markdown inline.
+    """
+    hashes = list({l["content_hash"] for l in lessons if l.get("content_hash")})
+    legacy_ids = [l["id"] for l in lessons if not l.get("content_hash") and l.get("content_status") != "pending"]
+
+    blobs = {}
+    if hashes:
+        res = supabase.table("lesson_contents").select("hash, codec, body, raw_size, stored_size") \
+            .in_("hash", hashes).execute()
+        blobs = {row["hash"]: row for row in res.data or []}
+        raw = sum(row["raw_size"] for row in blobs.values())
+        stored = sum(row["stored_size"] for row in blobs.values())
+        logger.debug(f"[supabase] Loaded {len(blobs)} lesson bodies: {stored} bytes for {raw} bytes of content")
+
+    inline = {}
+    if legacy_ids:
+        res = supabase.table("lessons").select("id, content").in_("id", legacy_ids).execute()
+        inline = {row["id"]: row.get("content") for row in res.data or []}
+
+    for lesson in lessons:
+        blob = blobs.get(lesson.get("content_hash"))
+        lesson["content"] = decode_content(blob) if blob else inline.get(lesson["id"])
+    return lessons
+
+@timed("db")
+async def get_content_storage_stats() -> Dict[str, Any]:
+    """Storage savings from compressed, deduplicated lesson bodies."""
+    try:
+        row = supabase.table("lesson_content_savings").select("*").single().execute().data or {}
+        logical = row.get("logical_bytes", 0)
+        stored = row.get("stored_bytes", 0)
+        row["saved_bytes"] = logical - stored
+        row["compression_ratio"] = round(logical / stored, 2) if stored else None
+        return row
+    except Exception as e:
+        logger.error(f"[supabase] Content stats failed: {e}")
+        raise RuntimeError("Failed to fetch content storage stats")
+
+# Stamped on catalog rows whose stats are of unknown age (videos cached or
+# saved before fetched_at was kept), so they count as stale and are refetched
+UNKNOWN_FETCH_TIME = datetime.fromtimestamp(0, timezone.utc).isoformat()
+
+def catalog_row(video) -> dict:
+    """`video_catalog` row for a VideoItem; `updated_at` is when its stats were fetched."""
+    return {
+        "video_id": video.video_id,
+        "title": video.title,
+        "description": video.description,
+        "thumbnail": video.thumbnail,
+        "url": video.url,
+        "channel": video.channel,
+        "view_count": video.views,
+        "duration_seconds": video.duration,
+        "published_at": video.published_at,
+        "updated_at": video.fetched_at or UNKNOWN_FETCH_TIME,
+    }
+
+@timed("db")
+async def upsert_video_catalog(videos: List[Any]) -> None:
+    """Insert or refresh catalog entries; metadata is stored once per video_id."""
+    if not videos:
+        return
+    supabase.table("video_catalog").upsert([catalog_row(v) for v in videos], on_conflict="video_id").execute()
+
+@timed("db")
+async def get_catalog_videos(video_ids: List[str]) -> Dict[str, dict]:
+    """Catalog rows for `video_ids`, keyed by video_id, in a single query."""
+    if not video_ids:
+        return {}
+    res = supabase.table("video_catalog").select("*").in_("video_id", list(set(video_ids))).execute()
+    return {row["video_id"]: row for row in res.data or []}
+
+@timed("db")
+async def search_catalog(keywords: List[str], limit: int = 50) -> List[dict]:
+    """Catalog entries whose title mentions any of `keywords`, most viewed first."""
+    terms = [re.sub(r"[^\w]", "", kw) for kw in keywords]
+    terms = [t for t in terms if len(t) > 2]
+    if not terms:
+        return []
+    res = supabase.table("video_catalog") \
+        .select("*") \
+        .or_(",".join(f"title.ilike.%{t}%" for t in terms)) \
+        .order("view_count", desc=True) \
+        .limit(limit) \
+        .execute()
+    return res.data or []
+
+@timed("db")
 async def get_videos_by_course_id(course_id: str):
-    res = supabase.table("videos").select("*").eq("course_id", course_id).execute()
-    return res.data or []
\ No newline at end of file
+    links = supabase.table("lesson_videos") \
+        .select("id, course_id, lesson_id, video_id, position") \
+        .eq("course_id", course_id) \
+        .order("position", desc=False) \
+        .execute().data or []
+
+    if not links:
+        # Courses created before the catalog keep full copies in `videos`
+        res = supabase.table("videos").select("*").eq("course_id", course_id).execute()
+        return res.data or []
+
+    return await _videos_from_links(links)
+
+@timed("db")
+async def get_courses_children(course_ids: List[str]) -> Dict[str, Dict[str, List[dict]]]:
+    """
+    Lessons (LESSON_COLUMNS), videos and quizzes of many courses, keyed by
+    course id, in the same order as the per-course getters. A fixed handful
+    of queries however many courses there are.
+    """
+    children = {course_id: {"lessons": [], "videos": [], "quizzes": []} for course_id in course_ids}
+    if not course_ids:
+        return children
+
+    lessons = supabase.table("lessons").select(LESSON_COLUMNS) \
+        .in_("course_id", course_ids).order("created_at", desc=False).execute().data or []
+    for lesson in lessons:
+        children[lesson["course_id"]]["lessons"].append(lesson)
+
+    links = supabase.table("lesson_videos") \
+        .select("id, course_id, lesson_id, video_id, position") \
+        .in_("course_id", course_ids) \
+        .order("position", desc=False) \
+        .execute().data or []
+    for video in await _videos_from_links(links):
+        children[video["course_id"]]["videos"].append(video)
+    # Courses created before the catalog keep full copies in `videos`
+    legacy_ids = list({course_id for course_id in course_ids} - {link["course_id"] for link in links})
+    if legacy_ids:
+        for video in supabase.table("videos").select("*").in_("course_id", legacy_ids).execute().data or []:
+            children[video["course_id"]]["videos"].append(video)
+
+    quizzes = supabase.table("quizzes").select("*").in_("course_id", course_ids).execute().data or []
+    for quiz in add_lesson_title_to_quizzes(quizzes, lessons):
+        children[quiz["course_id"]]["quizzes"].append(quiz)
+    return children
+
+@timed("db")
+async def get_videos_by_lesson_id(lesson_id: str) -> List[dict]:
+    links = supabase.table("lesson_videos") \
+        .select("id, course_id, lesson_id, video_id, position") \
+        .eq("lesson_id", lesson_id) \
+        .order("position", desc=False) \
+        .execute().data or []
+    if not links:
+        res = supabase.table("videos").select("*").eq("lesson_id", lesson_id).execute()
+        return res.data or []
+    return await _videos_from_links(links)
+
+async def _videos_from_links(links: List[dict]) -> List[dict]:
+    """Lesson video links joined with their catalog entries, in link order."""
+    catalog = await get_catalog_videos([link["video_id"] for link in links])
+    videos = []
+    for link in links:
+        entry = catalog.get(link["video_id"])
+        if not entry:
+            continue
+        videos.append({
+            "id": link["id"],
+            "course_id": link["course_id"],
+            "lesson_id": link["lesson_id"],
+            "video_id": entry["video_id"],
+            "title": entry["title"],
+            "description": entry.get("description") or "",
+            "thumbnail": entry.get("thumbnail") or "",
+            "url": entry["url"],
+            "channel": entry.get("channel"),
+            "views": entry.get("view_count"),
+            "duration": entry.get("duration_seconds"),
+            "published_at": entry.get("published_at"),
+            "fetched_at": entry.get("updated_at"),
+        })
+    return videos
+
+@timed("db")
+async def get_course_outline(course_id: str) -> List[dict]:
+    """
+    The course's lessons in order, without content: id, title, summary,
+    content_status, video_count and quiz_questions. Counted in Postgres (see
+    sql/007_course_outline.sql), so this is one small query per course.
+    """
+    try:
+        resp = supabase.rpc("course_lesson_outline", {"p_course_id": course_id}).execute()
+        return resp.data or []
+    except Exception as e:
+        logger.error(f"[supabase] Course outline failed for {course_id}: {e}")
+        raise RuntimeError("Failed to fetch course outline")
+
+@timed("db")
+async def get_progress_summary(user_id: str) -> Dict[str, Dict[str, int]]:
+    """
+    Lesson totals and completed-lesson counts for every course owned by `user_id`,
+    keyed by course id. Aggregated in Postgres (see sql/001_progress_summary.sql),
+    so this is one query no matter how many courses the user has.
+    """
+    try:
+        resp = supabase.rpc("course_progress_summary", {"p_user_id": user_id}).execute()
+        return {
+            row["course_id"]: {
+                "total_lessons": row["total_lessons"],
+                "completed_lessons": row["completed_lessons"],
+            }
+            for row in resp.data or []
+        }
+    except Exception as e:
+        logger.error(f"[supabase] Progress summary failed for {user_id}: {e}")
+        raise RuntimeError("Failed to fetch progress summary")
@@ -0,0 +1,184 @@
+# backend/services/video_index.py
+
+import os
+import re
+import json
+import math
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from unidecode import unidecode
+
+from backend.utils.ttl_cache import LOCAL_CACHE_PATH
+
+logger = logging.getLogger("uvicorn.error")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2  # title terms count this many times towards tf
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in into is it of on or the this to with what why "
+    "your you vs".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(unidecode(text).lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+class IndexHit(NamedTuple):
+    detail: Dict[str, Any]  # same shape as youtube_service.video_detail_from_api
+    score: float            # BM25 score
+    confidence: float       # idf-weighted share of the query terms found in the video, 0..1
+
+
+class VideoIndex:
+    """
+    On-disk BM25 inverted index over title, description and channel of every
+    video `fetch_videos` has accepted. Lives in the local SQLite file next to
+    the search caches and is updated incrementally as new searches come in.
+    """
+
+    def __init__(self, path: str = LOCAL_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS vi_docs (
+                    video_id TEXT PRIMARY KEY,
+                    doc_len INTEGER NOT NULL,
+                    payload TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS vi_postings (
+                    term TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, video_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS vi_postings_video_idx ON vi_postings (video_id);
+                CREATE TABLE IF NOT EXISTS vi_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    n_docs INTEGER NOT NULL,
+                    total_len INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO vi_stats VALUES (0, 0, 0);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _terms(detail: Dict[str, Any]) -> Counter:
+        terms = Counter()
+        for _ in range(TITLE_WEIGHT):
+            terms.update(tokenize(detail.get("title", "")))
+        terms.update(tokenize(detail.get("description", "")))
+        terms.update(tokenize(detail.get("channel", "")))
+        return terms
+
+    def add(self, details: List[Dict[str, Any]]) -> int:
+        """Index (or re-index) videos; returns how many were written."""
+        if not details:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for detail in details:
+                    video_id = detail["video_id"]
+                    terms = self._terms(detail)
+                    doc_len = sum(terms.values())
+
+                    old = conn.execute("SELECT doc_len FROM vi_docs WHERE video_id = ?", (video_id,)).fetchone()
+                    if old is not None:
+                        conn.execute("DELETE FROM vi_postings WHERE video_id = ?", (video_id,))
+                        conn.execute(
+                            "UPDATE vi_stats SET n_docs = n_docs - 1, total_len = total_len - ? WHERE id = 0",
+                            (old[0],),
+                        )
+
+                    conn.execute(
+                        "INSERT OR REPLACE INTO vi_docs VALUES (?, ?, ?)",
+                        (video_id, doc_len, json.dumps(detail)),
+                    )
+                    conn.executemany(
+                        "INSERT INTO vi_postings VALUES (?, ?, ?)",
+                        [(term, video_id, tf) for term, tf in terms.items()],
+                    )
+                    conn.execute(
+                        "UPDATE vi_stats SET n_docs = n_docs + 1, total_len = total_len + ? WHERE id = 0",
+                        (doc_len,),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(details)
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT n_docs FROM vi_stats WHERE id = 0").fetchone()[0]
+
+    def query(self, text: str, limit: int = 25) -> List[IndexHit]:
+        """Top `limit` videos for `text` by BM25, each with a confidence score."""
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms:
+            return []
+
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            conn = self._connect()
+            n_docs, total_len = conn.execute("SELECT n_docs, total_len FROM vi_stats WHERE id = 0").fetchone()
+            if n_docs == 0:
+                return []
+            rows = conn.execute(
+                f"SELECT p.term, p.video_id, p.tf, d.doc_len FROM vi_postings p "
+                f"JOIN vi_docs d ON d.video_id = p.video_id WHERE p.term IN ({placeholders})",
+                terms,
+            ).fetchall()
+
+        avg_len = total_len / n_docs
+        df = Counter(term for term, _, _, _ in rows)
+        idf = {t: math.log(1 + (n_docs - df[t] + 0.5) / (df[t] + 0.5)) for t in terms}
+        total_idf = sum(idf.values())
+
+        scores: Dict[str, float] = {}
+        matched: Dict[str, float] = {}
+        for term, video_id, tf, doc_len in rows:
+            norm = tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc_len / avg_len))
+            scores[video_id] = scores.get(video_id, 0.0) + idf[term] * norm
+            matched[video_id] = matched.get(video_id, 0.0) + idf[term]
+
+        top = sorted(scores, key=scores.get, reverse=True)[:limit]
+        if not top:
+            return []
+
+        with self._lock:
+            payloads = dict(self._connect().execute(
+                f"SELECT video_id, payload FROM vi_docs WHERE video_id IN ({','.join('?' * len(top))})",
+                top,
+            ).fetchall())
+
+        return [
+            IndexHit(json.loads(payloads[vid]), scores[vid], matched[vid] / total_idf)
+            for vid in top
+            if vid in payloads
+        ]
+
+
+video_index = VideoIndex()
@@ -0,0 +1,227 @@
+# backend/services/youtube_client.py
+
+import os
+import asyncio
+import logging
+import random
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from backend.utils.metrics import REGISTRY, Gauge, track
+from backend.utils.tracing import span
+from backend.utils.ttl_cache import LOCAL_CACHE_PATH
+
+logger = logging.getLogger("uvicorn.error")
+
+YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+
+# Quota units per call, as billed by the YouTube Data API v3
+SEARCH_COST = 100
+VIDEOS_COST = 1
+
+DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+# Searches stop once fewer than this many units would remain, keeping headroom
+# for videos.list calls of builds already in flight.
+QUOTA_RESERVE = int(os.getenv("YOUTUBE_QUOTA_RESERVE", "500"))
+
+MAX_RETRIES = int(os.getenv("YOUTUBE_MAX_RETRIES", "3"))
+RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt with full jitter
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TZ = ZoneInfo("America/Los_Angeles")  # Google resets quotas at midnight PT
+except Exception:  # pragma: no cover - missing tz database
+    QUOTA_TZ = None
+
+
+class YouTubeUnavailable(RuntimeError):
+    """The API could not be used for this call; callers should degrade, not fail."""
+
+
+class QuotaExceeded(YouTubeUnavailable):
+    pass
+
+
+class QuotaLedger:
+    """
+    Daily quota bucket shared by every worker on the host through the local
+    SQLite file. The bucket refills when the quota day (Pacific time) changes.
+    """
+
+    def __init__(self, daily_units: int = DAILY_QUOTA, path: str = LOCAL_CACHE_PATH):
+        self.daily_units = daily_units
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS youtube_quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def today() -> str:
+        return datetime.now(QUOTA_TZ).date().isoformat()
+
+    def used(self) -> int:
+        with self._lock:
+            row = self._connect().execute("SELECT used FROM youtube_quota WHERE day = ?", (self.today(),)).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self) -> int:
+        return max(0, self.daily_units - self.used())
+
+    def try_spend(self, units: int, reserve: int = 0) -> bool:
+        """Atomically take `units` if at least `reserve` would be left afterwards."""
+        day = self.today()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT used FROM youtube_quota WHERE day = ?", (day,)).fetchone()
+                used = row[0] if row else 0
+                if self.daily_units - used - units < reserve:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute(
+                    "INSERT INTO youtube_quota (day, used) VALUES (?, ?) "
+                    "ON CONFLICT(day) DO UPDATE SET used = used + excluded.used",
+                    (day, units),
+                )
+                conn.execute("COMMIT")
+                return True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def exhaust(self) -> None:
+        """Mark today's quota as spent (the API told us so)."""
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO youtube_quota (day, used) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET used = MAX(used, excluded.used)",
+                (self.today(), self.daily_units),
+            )
+
+
+class YouTubeClient:
+    """
+    Pooled HTTP client for the YouTube Data API with quota accounting and
+    jittered retries. One instance is shared by the app; `start`/`close` are
+    called from the FastAPI lifespan.
+    """
+
+    def __init__(self, ledger: Optional[QuotaLedger] = None):
+        self.ledger = ledger or QuotaLedger()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.counters: Dict[str, int] = {
+            "units_spent": 0,
+            "search_calls": 0,
+            "videos_calls": 0,
+            "retries": 0,
+            "quota_rejections": 0,
+            "errors": 0,
+        }
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Scripts and tests may call the service without the app lifespan
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    def can_search(self) -> bool:
+        return self.ledger.remaining() - SEARCH_COST >= QUOTA_RESERVE
+
+    async def get(self, url: str, params: Dict[str, Any], cost: int, kind: str, reserve: int = 0) -> Dict[str, Any]:
+        params = {**params, "key": YOUTUBE_API_KEY}
+        # Charged once per call, however many attempts it takes; the ledger is
+        # SQLite, so it is used from a worker thread, not the event loop
+        if not await asyncio.to_thread(self.ledger.try_spend, cost, reserve):
+            self.counters["quota_rejections"] += 1
+            raise QuotaExceeded(f"YouTube quota budget too low for {kind} ({cost} units)")
+        self.counters["units_spent"] += cost
+        for attempt in range(MAX_RETRIES + 1):
+            self.counters[f"{kind}_calls"] += 1
+
+            try:
+                with track("youtube", kind), span(f"youtube.{kind}", cost=cost, attempt=attempt + 1):
+                    response = await self.client.get(url, params=params)
+                if response.status_code == 403 and "quotaExceeded" in response.text:
+                    await asyncio.to_thread(self.ledger.exhaust)
+                    self.counters["quota_rejections"] += 1
+                    raise QuotaExceeded("YouTube reported quotaExceeded")
+                if response.status_code in RETRYABLE_STATUS and attempt < MAX_RETRIES:
+                    raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+                response.raise_for_status()
+                return response.json()
+            except QuotaExceeded:
+                raise
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.response.status_code in RETRYABLE_STATUS
+                if not retryable or attempt >= MAX_RETRIES:
+                    self.counters["errors"] += 1
+                    logger.error(f"[YouTube] {kind} failed after {attempt + 1} attempt(s): {e}")
+                    raise YouTubeUnavailable(f"YouTube {kind} failed") from e
+                self.counters["retries"] += 1
+                delay = random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt)
+                logger.warning(f"[YouTube] {kind} attempt {attempt + 1} failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        raise YouTubeUnavailable(f"YouTube {kind} failed")  # pragma: no cover - loop always returns/raises
+
+    def stats(self) -> Dict[str, Any]:
+        used = self.ledger.used()
+        return {
+            **self.counters,
+            "quota_day": self.ledger.today(),
+            "quota_daily_units": self.ledger.daily_units,
+            "quota_used_units": used,
+            "quota_remaining_units": max(0, self.ledger.daily_units - used),
+            "quota_reserve_units": QUOTA_RESERVE,
+        }
+
+
+youtube_client = YouTubeClient()
+
+quota_units = REGISTRY.register(Gauge(
+    "youtube_quota_units", "YouTube Data API quota units for the current Pacific day.", ("kind",)))
+youtube_calls = REGISTRY.register(Gauge(
+    "youtube_client_events", "YouTube client counters of this worker (calls, retries, rejections).", ("event",)))
+
+
+def _collect_youtube_stats() -> None:
+    stats = youtube_client.stats()
+    for kind in ("daily", "used", "remaining", "reserve"):
+        quota_units.set(stats[f"quota_{kind}_units"], kind=kind)
+    for event, value in youtube_client.counters.items():
+        youtube_calls.set(value, event=event)
+
+
+REGISTRY.add_collector(_collect_youtube_stats)
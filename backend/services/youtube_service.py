@@ -1,74 +1,68 @@
 # backend/services/youtube_service.py
 
 import os
+import re
+import asyncio
 import logging
-import httpx
+from datetime import datetime, timedelta, timezone
 from backend.models.schemas import VideoItem
-from typing import List
+from backend.services.supabase_service import get_catalog_videos, search_catalog
+from backend.services.video_index import video_index
+from backend.services.youtube_client import (
+    youtube_client,
+    YouTubeUnavailable,
+    QUOTA_RESERVE,
+    SEARCH_COST,
+    VIDEOS_COST,
+)
+from backend.utils.metrics import record_cache, timed
+from backend.utils.ttl_cache import SqliteTTLCache
+from backend.utils.text_filters import is_relevant, video_filters
+from typing import List, Dict, Any
 from hashlib import sha256
 from unidecode import unidecode
 
 logger = logging.getLogger("uvicorn.error")
 
-YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
-VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
-
-PREFERRED_CHANNELS = [
-    "khan academy",
-    "3blue1brown",
-    "crashcourse",
-    "nptel",
-    "cs50",
-    "veritasium",
-    "gate smashers",
-    "apna college",
-    "jenny lectures",            # aka Jenny's lectures CS/IT NET&JRF
-    "abdul bari",
-    "code with harry",
-    "mycodeschool",
-    "freecodecamp.org",
-    "the coding train",
-    "simplilearn",
-    "edureka",
-    "geeksforgeeks",
-    "telusko",
-    "academind",
-    "corey schafer",
-    "thenewboston",
-    "giraffe academy",
-    "wired",
-    "real engineering",
-    "minutephysics",
-    "minuteearth",
-    "asapscience",
-    "study iq education",
-    "unacademy",
-    "byju's",
-    "physics wallah",
-    "mathologer",
-    "numberphile",
-    "logical indian",
-    "iit lectures",
-    "learn engineering",
-    "gate academy",
-    "gate lectures by ravindrababu ravula",
-    "gate wallah",
-    "codebasics",
-    "tech with tim",
-    "microsoft developer",
-    "sentdex",
-    "deeplizard",
-    "statquest with josh starmer",
-    "ai coffee break with letitia",
-    "two minute papers",
-    "intellipaat",
-    "edspresso",
-]
+# Overridable so load tests can point at a local stand-in (backend/loadtest)
+YOUTUBE_API_URL = os.getenv("YOUTUBE_API_URL", "https://www.googleapis.com/youtube/v3").rstrip("/")
+SEARCH_URL = f"{YOUTUBE_API_URL}/search"
+VIDEOS_URL = f"{YOUTUBE_API_URL}/videos"
+
+# Preferred channels and spam keywords live in config/video_filters.json
+# (see backend.utils.text_filters); edits are picked up without a restart.
 
 MIN_VIEWS = 10_000
 MIN_DURATION_SECONDS = 300  # 5 minutes
 
+# contentDetails.duration as YouTube emits it: P[nW][nD][T[nH][nM][nS]]
+ISO_DURATION_RE = re.compile(
+    r"P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?"
+)
+
+# Catalog entries younger than this are trusted instead of calling videos.list
+CATALOG_STATS_TTL = timedelta(hours=float(os.getenv("YOUTUBE_CATALOG_TTL_HOURS", "168")))
+
+# Ranked search results: fresh for SEARCH_CACHE_TTL, then served stale while a
+# background refresh runs, until SEARCH_CACHE_STALE_TTL more has passed.
+SEARCH_CACHE_TTL = float(os.getenv("YOUTUBE_CACHE_TTL_HOURS", "24")) * 3600
+SEARCH_CACHE_STALE_TTL = float(os.getenv("YOUTUBE_CACHE_STALE_HOURS", "168")) * 3600
+
+search_cache = SqliteTTLCache("youtube_search", max_age=SEARCH_CACHE_TTL + SEARCH_CACHE_STALE_TTL)
+_refreshing: Dict[str, asyncio.Task] = {}
+
+# Per-video details (stats included) reused across searches and lessons
+DETAILS_CACHE_TTL = float(os.getenv("YOUTUBE_DETAILS_TTL_HOURS", "24")) * 3600
+details_cache = SqliteTTLCache("youtube_details", max_age=DETAILS_CACHE_TTL)
+
+# videos.list accepts at most 50 ids per call
+MAX_IDS_PER_DETAILS_CALL = 50
+
+# Local BM25 tier: serve a query without the API when at least max_results
+# indexed videos cover this share (idf-weighted) of the query's terms.
+VIDEO_INDEX_MIN_CONFIDENCE = float(os.getenv("VIDEO_INDEX_MIN_CONFIDENCE", "0.8"))
+VIDEO_INDEX_CANDIDATES = 50
+
 def enhance_query(query: str) -> str:
     return (
         f"{query} tutorial OR course OR lecture OR explained OR example OR walkthrough "
@@ -78,129 +72,359 @@ def enhance_query(query: str) -> str:
 def normalize_title(title: str) -> str:
     return sha256(unidecode(title.lower().strip()).encode()).hexdigest()
 
-def is_relevant(title: str, description: str, query: str) -> bool:
-    required_keywords = query.lower().split()
-    content = f"{title} {description}".lower()
-    matches = sum(1 for kw in required_keywords if kw in content)
-    return matches >= max(1, len(required_keywords) // 2)
+def normalize_query(query: str) -> str:
+    """Same folding as `normalize_title`, plus collapsed inner whitespace."""
+    return " ".join(unidecode(query.lower()).split())
+
+def search_cache_key(query: str, max_results: int) -> str:
+    return sha256(f"{normalize_query(query)}|{max_results}".encode()).hexdigest()
 
 def parse_iso_duration(duration: str) -> int:
-    import isodate
-    try:
-        return int(isodate.parse_duration(duration).total_seconds())
-    except:
+    """Seconds in a YouTube ISO 8601 duration such as "PT1H2M3S" or "P1DT5M"; 0 if unparseable."""
+    m = ISO_DURATION_RE.fullmatch(duration or "")
+    if not m or not any(m.groups()):
         return 0
+    weeks, days, hours, minutes, seconds = (float(g) if g else 0.0 for g in m.groups())
+    return int(weeks * 604800 + days * 86400 + hours * 3600 + minutes * 60 + seconds)
 
-async def fetch_videos(query: str, max_results: int = 10) -> List[VideoItem]:
-    enhanced_query = enhance_query(query)
+def video_detail_from_api(v: dict) -> Dict[str, Any]:
+    """Flatten a `videos.list` item into the fields the ranking stage needs."""
+    snippet = v["snippet"]
+    stats = v.get("statistics", {})
+    content = v.get("contentDetails", {})
+    return {
+        "video_id": v["id"],
+        "title": snippet["title"],
+        "description": snippet.get("description", ""),
+        "thumbnail": snippet["thumbnails"]["high"]["url"],
+        "channel": snippet["channelTitle"],
+        "views": int(stats.get("viewCount", 0)),
+        "duration": parse_iso_duration(content.get("duration", "PT0M")),
+        "publishedAt": snippet.get("publishedAt", ""),
+        "fetchedAt": datetime.now(timezone.utc).isoformat(),
+    }
+
+def video_detail_from_catalog(row: dict) -> Dict[str, Any]:
+    """Same shape as `video_detail_from_api`, built from a `video_catalog` row."""
+    return {
+        "video_id": row["video_id"],
+        "title": row["title"],
+        "description": row.get("description") or "",
+        "thumbnail": row.get("thumbnail") or "",
+        "channel": row.get("channel") or "",
+        "views": row.get("view_count") or 0,
+        "duration": row.get("duration_seconds") or 0,
+        "publishedAt": row.get("published_at") or "",
+        "fetchedAt": row.get("updated_at"),
+    }
+
+def is_catalog_fresh(row: dict) -> bool:
+    updated_at = row.get("updated_at")
+    if not updated_at or row.get("view_count") is None or row.get("duration_seconds") is None:
+        return False
+    try:
+        updated = datetime.fromisoformat(updated_at.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    return datetime.now(timezone.utc) - updated < CATALOG_STATS_TTL
+
+async def get_known_video_details(video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Details for ids already in the video catalog with recent stats, so they can
+    skip the `videos.list` lookup. Catalog trouble never fails a search.
+    """
+    try:
+        rows = await get_catalog_videos(video_ids)
+    except Exception as e:
+        logger.warning(f"[YouTube] Catalog lookup failed, using API for all ids: {e}")
+        return {}
+    return {vid: video_detail_from_catalog(row) for vid, row in rows.items() if is_catalog_fresh(row)}
+
+async def search_video_ids(query: str) -> List[str]:
     search_params = {
         "part": "snippet",
-        "q": enhanced_query,
+        "q": enhance_query(query),
         "type": "video",
         "videoEmbeddable": "true",
         "safeSearch": "strict",
         "maxResults": 25,
         "order": "relevance",
-        "key": YOUTUBE_API_KEY,
     }
+    data = await youtube_client.get(SEARCH_URL, search_params, cost=SEARCH_COST, kind="search", reserve=QUOTA_RESERVE)
+    items = data.get("items", [])
+    return [item["id"]["videoId"] for item in items if "videoId" in item["id"]]
+
+async def fetch_video_details(video_ids: List[str]) -> List[Dict[str, Any]]:
+    if not video_ids:
+        return []
+    details_params = {
+        "part": "snippet,contentDetails,statistics",
+        "id": ",".join(video_ids),
+    }
+    data = await youtube_client.get(VIDEOS_URL, details_params, cost=VIDEOS_COST, kind="videos")
+
+    details = []
+    for v in data.get("items", []):
+        try:
+            details.append(video_detail_from_api(v))
+        except Exception as e:
+            logger.warning(f"Error processing video: {e}")
+    return details
+
+def video_detail_from_item(video: VideoItem) -> Dict[str, Any]:
+    """Same shape as `video_detail_from_api`, built from a ranked VideoItem."""
+    return {
+        "video_id": video.video_id,
+        "title": video.title,
+        "description": video.description,
+        "thumbnail": video.thumbnail,
+        "channel": video.channel or "",
+        "views": video.views or 0,
+        "duration": video.duration or 0,
+        "publishedAt": video.published_at or "",
+        "fetchedAt": video.fetched_at,
+    }
+
+def local_videos(query: str, max_results: int, min_confidence: float = VIDEO_INDEX_MIN_CONFIDENCE) -> List[VideoItem]:
+    """Ranked videos for `query` from the local index, using only confident hits."""
+    try:
+        hits = video_index.query(query, limit=VIDEO_INDEX_CANDIDATES)
+    except Exception as e:
+        logger.warning(f"[YouTube] Local index query failed for '{query}': {e}")
+        return []
+    return rank_videos([h.detail for h in hits if h.confidence >= min_confidence], query, max_results)
+
+def index_accepted(videos: List[VideoItem]) -> None:
+    try:
+        video_index.add([video_detail_from_item(v) for v in videos])
+    except Exception as e:
+        logger.warning(f"[YouTube] Could not update local index: {e}")
+
+async def resolve_video_details(video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Details for every id in `video_ids`, keyed by id. Looks in the details
+    cache, then the catalog, and fetches only what is left from the API in as
+    few `videos.list` calls as possible.
+    """
+    unique_ids = list(dict.fromkeys(video_ids))
+    cached = await asyncio.to_thread(details_cache.get_many, unique_ids)
+    resolved = {vid: entry.value for vid, entry in cached.items()}
+
+    missing = [vid for vid in unique_ids if vid not in resolved]
+    if missing:
+        resolved.update(await get_known_video_details(missing))
+        missing = [vid for vid in missing if vid not in resolved]
+
+    if missing:
+        chunks = [
+            missing[i:i + MAX_IDS_PER_DETAILS_CALL]
+            for i in range(0, len(missing), MAX_IDS_PER_DETAILS_CALL)
+        ]
+        results = await asyncio.gather(*(fetch_video_details(chunk) for chunk in chunks))
+        fetched = {d["video_id"]: d for details in results for d in details}
+        await asyncio.to_thread(details_cache.set_many, fetched)
+        resolved.update(fetched)
 
+    logger.debug(
+        f"[YouTube] Details for {len(unique_ids)} ids: "
+        f"{len(unique_ids) - len(missing)} cached, {len(missing)} fetched "
+        f"in {-(-len(missing) // MAX_IDS_PER_DETAILS_CALL)} call(s)"
+    )
+    return resolved
+
+def rank_videos(details: List[Dict[str, Any]], query: str, max_results: int) -> List[VideoItem]:
+    """Apply the dedupe, views, duration and relevance filters, then sort."""
+    seen_titles = set()
+    filtered = []
+
+    for video in details:
+        title = video["title"]
+
+        norm_title = normalize_title(title)
+        if norm_title in seen_titles:
+            logger.debug(f"Duplicate title skipped: {title}")
+            continue
+        seen_titles.add(norm_title)
+
+        if video["views"] < MIN_VIEWS:
+            logger.debug(f"Skipped '{title}' - low views: {video['views']}")
+            continue
+
+        if video["duration"] < MIN_DURATION_SECONDS:
+            logger.debug(f"Skipped '{title}' - too short: {video['duration']}s")
+            continue
+
+        if not is_relevant(title, video["description"], query):
+            logger.debug(f"Skipped '{title}' - not relevant to topic")
+            continue
+
+        is_preferred = video_filters.is_preferred_channel(video["channel"])
+        filtered.append({**video, "priorityBoost": is_preferred})
+
+    # Sort by boost, views, and recentness
+    filtered.sort(
+        key=lambda x: (x["priorityBoost"], x["views"], x["publishedAt"]),
+        reverse=True
+    )
+
+    return [
+        VideoItem(
+            video_id=vid["video_id"],
+            title=vid["title"],
+            description=vid["description"],
+            thumbnail=vid["thumbnail"],
+            url=f"https://youtube.com/watch?v={vid['video_id']}",
+            channel=vid["channel"],
+            views=vid["views"],
+            duration=vid["duration"],
+            published_at=vid["publishedAt"],
+            fetched_at=vid.get("fetchedAt"),
+        )
+        for vid in filtered[:max_results]
+    ]
+
+async def fallback_videos(query: str, max_results: int) -> List[VideoItem]:
+    """
+    Best answer without spending quota: the last cached result for this query,
+    however old, else any local index hits, else matching catalog entries.
+    """
+    entry = await asyncio.to_thread(search_cache.get, search_cache_key(query, max_results), float("inf"))
+    if entry is not None:
+        return [VideoItem(**v) for v in entry.value]
+    videos = await asyncio.to_thread(local_videos, query, max_results, 0.0)
+    if videos:
+        return videos
+    try:
+        rows = await search_catalog(normalize_query(query).split(), limit=50)
+    except Exception as e:
+        logger.warning(f"[YouTube] Catalog fallback failed for '{query}': {e}")
+        return []
+    return rank_videos([video_detail_from_catalog(r) for r in rows], query, max_results)
+
+@timed("youtube")
+async def fetch_videos(query: str, max_results: int = 10) -> List[VideoItem]:
+    """
+    Ranked videos for `query`, served from the search cache or, failing that,
+    the local video index when possible. Stale cache entries are returned
+    immediately and refreshed in the background. When the API is unavailable
+    or the quota budget is low, degrades to `fallback_videos` instead of
+    failing.
+    """
+    key = search_cache_key(query, max_results)
+    entry = await asyncio.to_thread(search_cache.get, key)
+    if entry is not None:
+        videos = [VideoItem(**v) for v in entry.value]
+        stale = entry.age > SEARCH_CACHE_TTL and key not in _refreshing
+        if stale and await asyncio.to_thread(youtube_client.can_search):
+            logger.debug(f"[YouTube] Serving stale results for '{query}', refreshing")
+            task = asyncio.create_task(_refresh_search(key, query, max_results))
+            _refreshing[key] = task
+            task.add_done_callback(lambda _: _refreshing.pop(key, None))
+        return videos
+
+    videos = await asyncio.to_thread(local_videos, query, max_results)
+    record_cache("video_index", hits=int(len(videos) >= max_results), misses=int(len(videos) < max_results))
+    if len(videos) >= max_results:
+        logger.debug(f"[YouTube] Served '{query}' from the local index")
+        await asyncio.to_thread(search_cache.set, key, [v.model_dump() for v in videos])
+        return videos
+
+    try:
+        videos = await search_youtube(query, max_results)
+    except YouTubeUnavailable as e:
+        logger.warning(f"[YouTube] Degrading to cached/catalog results for '{query}': {e}")
+        return await fallback_videos(query, max_results)
+    await asyncio.to_thread(search_cache.set, key, [v.model_dump() for v in videos])
+    return videos
+
+async def _refresh_search(key: str, query: str, max_results: int) -> None:
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Step 1: Search
-            search_response = await client.get(SEARCH_URL, params=search_params)
-            search_response.raise_for_status()
-            items = search_response.json().get("items", [])
-            video_ids = [item["id"]["videoId"] for item in items if "videoId" in item["id"]]
-            if not video_ids:
-                logger.warning("No video results found.")
-                return []
-
-            # Step 2: Get video details
-            details_params = {
-                "part": "snippet,contentDetails,statistics",
-                "id": ",".join(video_ids),
-                "key": YOUTUBE_API_KEY,
-            }
-            details_response = await client.get(VIDEOS_URL, params=details_params)
-            details_response.raise_for_status()
-            videos = details_response.json().get("items", [])
-
-            seen_titles = set()
-            filtered = []
-
-            for v in videos:
-                try:
-                    vid_id = v["id"]
-                    snippet = v["snippet"]
-                    stats = v.get("statistics", {})
-                    content = v.get("contentDetails", {})
-
-                    title = snippet["title"]
-                    description = snippet.get("description", "")
-                    channel = snippet["channelTitle"]
-                    duration = parse_iso_duration(content.get("duration", "PT0M"))
-                    views = int(stats.get("viewCount", 0))
-                    publish_date = snippet.get("publishedAt", "")
-
-                    norm_title = normalize_title(title)
-                    if norm_title in seen_titles:
-                        logger.debug(f"Duplicate title skipped: {title}")
-                        continue
-                    seen_titles.add(norm_title)
-
-                    if views < MIN_VIEWS:
-                        logger.debug(f"Skipped '{title}' - low views: {views}")
-                        continue
-
-                    if duration < MIN_DURATION_SECONDS:
-                        logger.debug(f"Skipped '{title}' - too short: {duration}s")
-                        continue
-
-                    if not is_relevant(title, description, query):
-                        logger.debug(f"Skipped '{title}' - not relevant to topic")
-                        continue
-
-                    is_preferred = any(pc in channel.lower() for pc in PREFERRED_CHANNELS)
-
-                    filtered.append({
-                        "video_id": vid_id,
-                        "title": title,
-                        "description": description,
-                        "thumbnail": snippet["thumbnails"]["high"]["url"],
-                        "channel": channel,
-                        "views": views,
-                        "duration": duration,
-                        "publishedAt": publish_date,
-                        "priorityBoost": is_preferred,
-                    })
-
-                except Exception as e:
-                    logger.warning(f"Error processing video: {e}")
-                    continue
-
-            # Sort by boost, views, and recentness
-            filtered.sort(
-                key=lambda x: (x["priorityBoost"], x["views"], x["publishedAt"]),
-                reverse=True
-            )
-
-            return [
-                VideoItem(
-                    video_id=vid["video_id"],
-                    title=vid["title"],
-                    description=vid["description"],
-                    thumbnail=vid["thumbnail"],
-                    url=f"https://youtube.com/watch?v={vid['video_id']}"
-                )
-                for vid in filtered[:max_results]
-            ]
-
-    except httpx.RequestError as e:
-        logger.error(f"[YouTube] Network error: {e}")
-        raise RuntimeError("YouTube API network error")
-    except httpx.HTTPStatusError as e:
-        logger.error(f"[YouTube] Bad response: {e.response.status_code} - {e.response.text}")
-        raise RuntimeError("YouTube API error")
+        videos = await search_youtube(query, max_results)
+        await asyncio.to_thread(search_cache.set, key, [v.model_dump() for v in videos])
+    except Exception as e:
+        logger.warning(f"[YouTube] Background refresh failed for '{query}': {e}")
+
+async def search_youtube(query: str, max_results: int = 10) -> List[VideoItem]:
+    """Uncached search + details + ranking against the YouTube Data API."""
+    try:
+        # Step 1: Search
+        video_ids = await search_video_ids(query)
+        if not video_ids:
+            logger.warning("No video results found.")
+            return []
+
+        # Step 2: Get video details, skipping ids we already know
+        by_id = await resolve_video_details(video_ids)
+        details = [by_id[vid] for vid in video_ids if vid in by_id]
+        videos = rank_videos(details, query, max_results)
+        await asyncio.to_thread(index_accepted, videos)
+        return videos
+
+    except YouTubeUnavailable:
+        raise
     except Exception as e:
         logger.exception("[YouTube] Unexpected error while fetching videos")
-        raise RuntimeError("Internal error fetching YouTube videos")
\ No newline at end of file
+        raise RuntimeError("Internal error fetching YouTube videos")
+
+async def fetch_videos_batch(queries: List[str], max_results: int = 10) -> Dict[str, List[VideoItem]]:
+    """
+    `fetch_videos` for many queries at once (e.g. every lesson of a course).
+    Queries answered by the search cache or the local index skip the API; the
+    rest are searched concurrently and their candidate ids pooled, so the whole
+    batch needs ceil(unique uncached ids / 50) `videos.list` calls instead of
+    one per query.
+    Filters and ranking are still applied per query. Queries the API cannot
+    serve (quota, outages) degrade to `fallback_videos`.
+    """
+    results: Dict[str, List[VideoItem]] = {}
+    pending = []
+    for query in dict.fromkeys(queries):
+        key = search_cache_key(query, max_results)
+        if await asyncio.to_thread(search_cache.get, key) is not None:
+            results[query] = await fetch_videos(query, max_results)
+            continue
+        videos = await asyncio.to_thread(local_videos, query, max_results)
+        if len(videos) >= max_results:
+            await asyncio.to_thread(search_cache.set, key, [v.model_dump() for v in videos])
+            results[query] = videos
+            continue
+        pending.append(query)
+
+    if not pending:
+        return results
+
+    try:
+        searches = await asyncio.gather(*(search_video_ids(q) for q in pending), return_exceptions=True)
+        searched = {}
+        for query, outcome in zip(pending, searches):
+            if isinstance(outcome, YouTubeUnavailable):
+                logger.warning(f"[YouTube] Degrading to cached/catalog results for '{query}': {outcome}")
+                results[query] = await fallback_videos(query, max_results)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                if not outcome:
+                    logger.warning(f"No video results found for '{query}'.")
+                searched[query] = outcome
+
+        try:
+            by_id = await resolve_video_details([vid for ids in searched.values() for vid in ids])
+        except YouTubeUnavailable as e:
+            logger.warning(f"[YouTube] Details unavailable, degrading {len(searched)} queries: {e}")
+            for query in searched:
+                results[query] = await fallback_videos(query, max_results)
+            return results
+
+        for query, ids in searched.items():
+            details = [by_id[vid] for vid in ids if vid in by_id]
+            videos = rank_videos(details, query, max_results)
+            key = search_cache_key(query, max_results)
+            await asyncio.to_thread(search_cache.set, key, [v.model_dump() for v in videos])
+            await asyncio.to_thread(index_accepted, videos)
+            results[query] = videos
+
+        return results
+
+    except Exception as e:
+        logger.exception("[YouTube] Unexpected error while batch fetching videos")
+        raise RuntimeError("Internal error fetching YouTube videos")
@@ -0,0 +1,44 @@
+-- backend/sql/001_progress_summary.sql
+--
+-- Per-course lesson/progress counts for one user, computed server-side so the
+-- Saved Courses dashboard needs a single round trip regardless of library size.
+-- Called from supabase_service.get_progress_summary via supabase.rpc(...).
+
+create index if not exists lessons_course_id_idx on lessons (course_id);
+create index if not exists progress_user_course_idx on progress (user_id, course_id);
+
+create or replace function course_progress_summary(p_user_id text)
+returns table (
+    course_id text,
+    total_lessons bigint,
+    completed_lessons bigint
+)
+language sql
+stable
+as $$
+    with user_courses as (
+        select id
+        from courses
+        where user_id::text = p_user_id
+    ),
+    lesson_counts as (
+        select l.course_id::text as course_id, count(*) as total
+        from lessons l
+        where l.course_id in (select id from user_courses)
+        group by l.course_id
+    ),
+    progress_counts as (
+        select p.course_id::text as course_id, count(distinct p.lesson_id) as completed
+        from progress p
+        where p.user_id::text = p_user_id
+          and p.lesson_id is not null
+        group by p.course_id
+    )
+    select
+        uc.id::text,
+        coalesce(lc.total, 0),
+        coalesce(pc.completed, 0)
+    from user_courses uc
+    left join lesson_counts lc on lc.course_id = uc.id::text
+    left join progress_counts pc on pc.course_id = uc.id::text;
+$$;
@@ -0,0 +1,27 @@
+-- backend/sql/002_lesson_contents.sql
+--
+-- Lesson markdown lives out of row, compressed and content-addressed.
+-- lessons.content stays for rows written before this migration; new rows only
+-- set lessons.content_hash. Identical lesson bodies share one lesson_contents row.
+
+create table if not exists lesson_contents (
+    hash text primary key,               -- sha256 of the raw markdown
+    codec text not null,                 -- 'zstd' or 'gzip'
+    body text not null,                  -- base64 of the compressed bytes
+    raw_size integer not null,           -- bytes of the uncompressed markdown
+    stored_size integer not null,        -- bytes of `body`
+    created_at timestamptz not null default now()
+);
+
+alter table lessons add column if not exists content_hash text references lesson_contents (hash);
+create index if not exists lessons_content_hash_idx on lessons (content_hash);
+
+-- Storage savings: what the lessons would weigh inline vs. what is stored.
+create or replace view lesson_content_savings as
+select
+    (select count(*) from lessons where content_hash is not null) as lessons,
+    (select count(*) from lesson_contents) as blobs,
+    (select coalesce(sum(c.raw_size), 0)
+       from lessons l join lesson_contents c on c.hash = l.content_hash) as logical_bytes,
+    (select coalesce(sum(raw_size), 0) from lesson_contents) as unique_raw_bytes,
+    (select coalesce(sum(stored_size), 0) from lesson_contents) as stored_bytes;
@@ -0,0 +1,29 @@
+-- backend/sql/003_video_catalog.sql
+--
+-- One row per YouTube video, shared by every course that uses it, plus a thin
+-- link table from lessons to catalog entries. The legacy `videos` table is only
+-- read for courses created before this migration.
+
+create table if not exists video_catalog (
+    video_id text primary key,
+    title text not null,
+    description text,
+    thumbnail text,
+    url text not null,
+    channel text,
+    view_count bigint,
+    duration_seconds integer,
+    published_at text,
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists lesson_videos (
+    id uuid primary key default gen_random_uuid(),
+    course_id uuid not null references courses (id) on delete cascade,
+    lesson_id uuid not null references lessons (id) on delete cascade,
+    video_id text not null references video_catalog (video_id),
+    position integer not null default 0
+);
+
+create index if not exists lesson_videos_course_id_idx on lesson_videos (course_id);
+create index if not exists lesson_videos_lesson_id_idx on lesson_videos (lesson_id);
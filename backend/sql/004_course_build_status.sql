@@ -0,0 +1,8 @@
+-- backend/sql/004_course_build_status.sql
+--
+-- Generated courses are saved lesson by lesson while they are built, so
+-- learners can open the finished lessons early. build_status says whether
+-- more are coming: 'building', 'incomplete' (the build stopped and can be
+-- resumed) or 'ready'. Courses saved in one go are 'ready'.
+
+alter table courses add column if not exists build_status text not null default 'ready';
@@ -0,0 +1,69 @@
+-- backend/sql/005_course_templates.sql
+--
+-- Pre-generated courses for popular topics (python -m backend.prewarm).
+-- A template keeps its lessons as one jsonb array that points at the shared
+-- lesson_contents and video_catalog rows, so templates cost little storage
+-- and a user's copy is cloned server-side by clone_course_template in a
+-- single round trip, instead of being generated again.
+
+create table if not exists course_templates (
+    key text primary key,                -- the normalized topic (outline_cache.normalize_topic)
+    topic text not null,                 -- the topic as given to the prewarm CLI
+    title text not null,
+    description text,
+    lessons jsonb not null,              -- [{title, summary, content_hash, video_ids, quiz}]
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+-- Copies template `p_key` into a ready course owned by `p_user_id` and
+-- returns its id (null when there is no such template).
+create or replace function clone_course_template(p_key text, p_user_id uuid)
+returns text
+language plpgsql
+as $$
+declare
+    v_template course_templates;
+    v_course_id uuid;
+begin
+    select * into v_template from course_templates where key = p_key;
+    if not found then
+        return null;
+    end if;
+
+    insert into courses (user_id, title, description, build_status)
+    values (p_user_id, v_template.title, v_template.description, 'ready')
+    returning id into v_course_id;
+
+    -- Lessons are listed by created_at, so each gets its position as an offset
+    with items as (
+        select item, ord
+        from jsonb_array_elements(v_template.lessons) with ordinality as t (item, ord)
+    ),
+    new_lessons as (
+        insert into lessons (course_id, title, summary, content_hash, created_at)
+        select v_course_id, item ->> 'title', item ->> 'summary', item ->> 'content_hash',
+               now() + ord * interval '1 microsecond'
+        from items
+        returning id, created_at
+    ),
+    lesson_items as (
+        select l.id as lesson_id, i.item
+        from new_lessons l
+        join items i on l.created_at = now() + i.ord * interval '1 microsecond'
+    ),
+    new_videos as (
+        insert into lesson_videos (course_id, lesson_id, video_id, position)
+        select v_course_id, li.lesson_id, v.video_id, v.position - 1
+        from lesson_items li,
+             jsonb_array_elements_text(coalesce(li.item -> 'video_ids', '[]'::jsonb))
+                 with ordinality as v (video_id, position)
+    )
+    insert into quizzes (course_id, lesson_id, title, questions)
+    select v_course_id, li.lesson_id, 'Quiz for ' || (li.item ->> 'title'), li.item -> 'quiz'
+    from lesson_items li
+    where jsonb_array_length(coalesce(li.item -> 'quiz', '[]'::jsonb)) > 0;
+
+    return v_course_id::text;
+end;
+$$;
@@ -0,0 +1,8 @@
+-- backend/sql/006_lazy_lessons.sql
+--
+-- Lazily built courses (LAZY_LESSONS) save each lesson as its outline entry
+-- and videos; the markdown and quiz are generated when the lesson is first
+-- opened. content_status is 'pending' until then, 'ready' afterwards and for
+-- every lesson saved with its content.
+
+alter table lessons add column if not exists content_status text not null default 'ready';
@@ -0,0 +1,42 @@
+-- backend/sql/007_course_outline.sql
+--
+-- A course's lessons without their bodies: id, title, summary and how many
+-- videos and quiz questions each has, counted server-side. Backs the
+-- lightweight GET /courses/{id}/outline view; lesson bodies are fetched one
+-- at a time from /courses/{id}/lessons/{lesson_id}.
+-- Called from supabase_service.get_course_outline via supabase.rpc(...).
+
+create index if not exists lesson_videos_lesson_id_idx on lesson_videos (lesson_id);
+create index if not exists quizzes_course_lesson_idx on quizzes (course_id, lesson_id);
+
+create or replace function course_lesson_outline(p_course_id uuid)
+returns table (
+    id text,
+    title text,
+    summary text,
+    content_status text,
+    video_count bigint,
+    quiz_questions bigint
+)
+language sql
+stable
+as $$
+    select
+        l.id::text,
+        l.title,
+        l.summary,
+        l.content_status,
+        -- Courses created before the catalog keep their videos in `videos`
+        coalesce(
+            (select nullif(count(*), 0) from lesson_videos lv where lv.lesson_id = l.id),
+            (select count(*) from videos v where v.lesson_id = l.id)
+        ),
+        coalesce(
+            (select sum(jsonb_array_length(q.questions)) from quizzes q
+             where q.course_id = l.course_id and q.lesson_id = l.id),
+            0
+        )
+    from lessons l
+    where l.course_id = p_course_id
+    order by l.created_at;
+$$;
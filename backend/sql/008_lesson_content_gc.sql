@@ -0,0 +1,27 @@
+-- backend/sql/008_lesson_content_gc.sql
+--
+-- lesson_contents rows are shared by every lesson and template with the same
+-- body, so they cannot cascade from lessons. When a course is deleted,
+-- supabase_service.delete_course passes the hashes its lessons used and the
+-- rows no other lesson or template still points at are deleted.
+
+create index if not exists course_templates_lessons_idx on course_templates using gin (lessons jsonb_path_ops);
+
+-- Deletes the lesson_contents rows among `p_hashes` that nothing references
+-- any more; returns how many were deleted.
+create or replace function delete_unused_lesson_contents(p_hashes text[])
+returns integer
+language sql
+as $$
+    with deleted as (
+        delete from lesson_contents c
+        where c.hash = any (p_hashes)
+          and not exists (select 1 from lessons l where l.content_hash = c.hash)
+          and not exists (
+              select 1 from course_templates t
+              where t.lessons @> jsonb_build_array(jsonb_build_object('content_hash', c.hash))
+          )
+        returning 1
+    )
+    select count(*)::integer from deleted;
+$$;
@@ -0,0 +1,59 @@
+# backend/tests/test_quiz_json.py
+#
+# robust_parse_mcqs on LLM-style JSON quizzes: it must never raise, and must
+# return exactly the objects that were generated intact, in order. Broken
+# objects ("{,}", missing commas) are dropped, not returned empty.
+
+import random
+
+import pytest
+
+from backend.benchmarks.bench_quiz_json import BROKEN, _strip, make_output
+from backend.utils.quiz_parser import robust_parse_mcqs
+
+MCQ = {"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}
+CASES = [
+    ('[{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}]', [MCQ]),
+    ('```json\n[{"question": "Keys?", "options": ["dict", "list",], "answer": "dict",},]\n```', [MCQ]),
+    ("Sure: [{'question': 'Keys?', 'options': ['dict', 'list'], 'answer': 'dict', 'checked': True}]", [MCQ]),
+    ('[{question: "Keys?", options: ["dict", "list"], answer: "dict", hint: None}]', [MCQ]),
+    ('<think>[{"no": 1}]</think>{"questions": [{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}]}',
+     [MCQ]),
+    ('[{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}, {"question": "Trunc', [MCQ]),
+    ("No quiz here, sorry.", []),
+    # Apostrophes in bracketed prose are not string delimiters
+    ('Here is the quiz [don\'t worry, it is easy]:\n[{"question": "Keys?", "options": ["dict", "list"], '
+     '"answer": "dict"}]', [MCQ]),
+    ('[Note: I\'ve kept it to 5]\n[{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}]', [MCQ]),
+    ('[Note: I\'ve kept it to 5]\n```json\n[{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}]\n```',
+     [MCQ]),
+    # A fenced block wins over arrays in the surrounding prose
+    ('Pick one of [{"a": 1}]:\n```json\n[{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}]\n```',
+     [MCQ]),
+    # A broken single-quoted object does not swallow the objects after it
+    ("[{question: 'What's up?', options: ['a', 'b'], answer: 'a'}, "
+     '{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}]', [MCQ]),
+    ("[{question: 'a', hint: 'x}, "
+     '{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}]', [MCQ]),
+]
+CORPUS_SIZE = 1000
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_cases(text, expected):
+    assert [_strip(obj) for obj in robust_parse_mcqs(text)] == expected
+
+
+@pytest.mark.parametrize("broken", BROKEN)
+def test_broken_objects_are_dropped(broken):
+    text = f'[{broken}, {{"question": "Keys?", "options": ["dict", "list"], "answer": "dict"}}]'
+    assert [_strip(obj) for obj in robust_parse_mcqs(text)] == [MCQ]
+
+
+def test_fuzz_recovers_exactly_the_intact_objects():
+    rng = random.Random(7)
+    for _ in range(CORPUS_SIZE):
+        text, expected = make_output(rng)
+        result = robust_parse_mcqs(text)
+        assert all(isinstance(obj, dict) for obj in result), text
+        assert [_strip(obj) for obj in result] == expected, text
@@ -0,0 +1,41 @@
+# backend/tests/test_quiz_parser.py
+#
+# parse_mcqs and MCQStreamParser must parse Q/A-format quizzes exactly like
+# the original regex parser (kept in benchmarks/bench_quiz_parser), whole or
+# streamed in arbitrary chunks.
+
+import random
+
+import pytest
+
+from backend.benchmarks.bench_quiz_parser import legacy_parse_mcqs, make_output, stream_parse
+from backend.utils.quiz_parser import parse_mcqs
+
+CASES = [
+    "Q1) What is a list?\nA) Mutable\nB) Immutable\nAnswer: A",
+    "Q1:\nWhat is a tuple?\nA. Mutable\nB. Immutable\nAnswer - B)",
+    "<think>Q9) not a question\nA) x\nB) y\nAnswer: A</think>\nQ1) Keys?\nA) dict\nB) list (correct)\nAnswer:",
+    "Q1) By text?\nA) first option\nB) second option\nAnswer: second option",
+    "Q1) Too few options?\nA) only\nAnswer: A\n\nQ2) Fine?\na) yes\nb) no\nAnswer: a",
+    "Here are your questions:\r\nQ1) CRLF?\r\nA) yes\r\nB) no\r\nAnswer: A\r\n",
+    "Q1) Unfinished think?\nA) a\nB) b\nAnswer: B\n<think>never closed",
+    "",
+]
+CORPUS_SIZE = 500
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_cases_match_legacy_parser(text):
+    expected = legacy_parse_mcqs(text)
+    assert parse_mcqs(text) == expected
+    for seed in range(5):
+        assert stream_parse(text, random.Random(seed)) == expected
+
+
+def test_generated_corpus_matches_legacy_parser():
+    rng = random.Random(11)
+    for i in range(CORPUS_SIZE):
+        text = make_output(rng)
+        expected = legacy_parse_mcqs(text)
+        assert parse_mcqs(text) == expected, text
+        assert stream_parse(text, random.Random(i)) == expected, text
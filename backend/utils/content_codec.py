@@ -0,0 +1,63 @@
+# backend/utils/content_codec.py
+
+import base64
+import gzip
+from hashlib import sha256
+from typing import Dict, Any
+
+# zstandard is optional: it compresses markdown a little better and much faster
+# than gzip, but gzip (stdlib) is always available as the fallback codec.
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 9
+
+DEFAULT_CODEC = "zstd" if zstandard is not None else "gzip"
+
+
+def content_hash(content: str) -> str:
+    """Content address used as the primary key of `lesson_contents`."""
+    return sha256(content.encode("utf-8")).hexdigest()
+
+
+def _compress(raw: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    if codec == "gzip":
+        return gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unknown content codec: {codec}")
+
+
+def _decompress(blob: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed lesson content")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    if codec == "gzip":
+        return gzip.decompress(blob)
+    raise ValueError(f"Unknown content codec: {codec}")
+
+
+def encode_content(content: str, codec: str = DEFAULT_CODEC) -> Dict[str, Any]:
+    """
+    Build a `lesson_contents` row for `content`.
+    The compressed bytes are base64'd so they travel through PostgREST as text.
+    """
+    raw = content.encode("utf-8")
+    body = base64.b64encode(_compress(raw, codec)).decode("ascii")
+    return {
+        "hash": content_hash(content),
+        "codec": codec,
+        "body": body,
+        "raw_size": len(raw),
+        "stored_size": len(body),
+    }
+
+
+def decode_content(row: Dict[str, Any]) -> str:
+    """Inverse of `encode_content`."""
+    blob = base64.b64decode(row["body"])
+    return _decompress(blob, row["codec"]).decode("utf-8")
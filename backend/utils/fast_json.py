@@ -0,0 +1,31 @@
+# backend/utils/fast_json.py
+
+import json
+from typing import Any
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON; orjson when installed, else the stdlib with FastAPI's settings."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered straight from dicts and lists. Returning it from a
+    route skips the response_model validation and jsonable_encoder passes,
+    so use it for rows already shaped by `backend.models.projection`.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
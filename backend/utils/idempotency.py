@@ -0,0 +1,247 @@
+# backend/utils/idempotency.py
+
+import os
+import json
+import asyncio
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+
+from backend.utils.metrics import REGISTRY, Counter
+from backend.utils.rate_limit import client_identity
+from backend.utils.ttl_cache import LOCAL_CACHE_PATH
+
+logger = logging.getLogger("uvicorn.error")
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+# How long a finished request's response is replayed for repeats of its key
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+# How long a key stays claimed by a request that never finished (process died)
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "1800"))
+MAX_KEY_LENGTH = 255
+
+# Response headers stored with a result and sent again on replays
+REPLAYED_HEADERS = ("location", "retry-after", "x-build-id")
+
+NEW, REPLAY, IN_PROGRESS, MISMATCH = "new", "replay", "in_progress", "mismatch"
+
+idempotent_requests = REGISTRY.register(Counter(
+    "idempotent_requests_total", "Requests carrying an Idempotency-Key, by outcome.", ("route", "result")))
+
+
+class Claim(NamedTuple):
+    state: str
+    context: Dict[str, Any]
+    status_code: Optional[int] = None
+    body: Optional[bytes] = None
+    headers: Optional[Dict[str, str]] = None
+
+
+class IdempotencyStore:
+    """
+    Results of requests sent with an Idempotency-Key, in the local SQLite
+    file so every API worker on the host sees them. `begin` claims a key
+    atomically: the first request runs, repeats get its stored response (or,
+    while it runs, its in-progress status). A request that failed on the
+    server side leaves its `context` behind for the retry to pick up, e.g.
+    the id of a build to resume rather than start over.
+    """
+
+    def __init__(self, path: str = LOCAL_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                " key TEXT PRIMARY KEY,"
+                " fingerprint TEXT NOT NULL,"
+                " state TEXT NOT NULL,"           # running, done or failed
+                " status_code INTEGER,"
+                " body BLOB,"
+                " headers TEXT,"
+                " context TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idempotency_keys_expires_idx ON idempotency_keys (expires_at)")
+            self._conn = conn
+        return self._conn
+
+    def begin(self, key: str, fingerprint: str, context: Dict[str, Any]) -> Claim:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT fingerprint, state, status_code, body, headers, context FROM idempotency_keys "
+                    "WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    stored_fingerprint, state, status_code, body, headers, stored_context = row
+                    if stored_fingerprint != fingerprint:
+                        conn.execute("ROLLBACK")
+                        return Claim(MISMATCH, {})
+                    if state == "done":
+                        conn.execute("ROLLBACK")
+                        return Claim(REPLAY, json.loads(stored_context), status_code, body, json.loads(headers))
+                    if state == "running":
+                        conn.execute("ROLLBACK")
+                        return Claim(IN_PROGRESS, json.loads(stored_context))
+                    # failed: this retry takes over, with what the last attempt left behind
+                    context = json.loads(stored_context)
+                # Expired keys go as new ones come in, so the table stays the size of one TTL's traffic
+                conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, state, context, expires_at) "
+                    "VALUES (?, ?, 'running', ?, ?)",
+                    (key, fingerprint, json.dumps(context), now + IDEMPOTENCY_LOCK_SECONDS),
+                )
+                conn.execute("COMMIT")
+                return Claim(NEW, context)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def known(self, key: str, fingerprint: str) -> bool:
+        """Whether a request with this key and fingerprint finished or is running (so a repeat does no work)."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT 1 FROM idempotency_keys WHERE key = ? AND fingerprint = ? AND state IN ('done', 'running') "
+                "AND expires_at > ?",
+                (key, fingerprint, time.time()),
+            ).fetchone()
+        return row is not None
+
+    def complete(self, key: str, status_code: int, body: bytes, headers: Dict[str, str]) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE idempotency_keys SET state = 'done', status_code = ?, body = ?, headers = ?, expires_at = ? "
+                "WHERE key = ?",
+                (status_code, body, json.dumps(headers), time.time() + IDEMPOTENCY_TTL_SECONDS, key),
+            )
+
+    def fail(self, key: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE idempotency_keys SET state = 'failed', expires_at = ? WHERE key = ?",
+                (time.time() + IDEMPOTENCY_TTL_SECONDS, key),
+            )
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._connect().execute("DELETE FROM idempotency_keys WHERE expires_at < ?", (time.time(),))
+        return cur.rowcount
+
+
+idempotency_store = IdempotencyStore()
+
+
+async def _key_and_fingerprint(request: Request) -> Optional[tuple]:
+    key = request.headers.get("idempotency-key", "").strip()
+    if not IDEMPOTENCY_ENABLED or not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+    # Keys are per user; the fingerprint ties a key to one method, path and body
+    identity = await client_identity(request)
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return f"{identity}:{key}", digest.hexdigest()
+
+
+async def skip_limits_for_replays(request: Request) -> None:
+    """
+    Route dependency, listed before `rate_limit(...)`: a repeat of a known
+    key is answered from the store, so it is not charged against the limit.
+    """
+    scoped = await _key_and_fingerprint(request)
+    try:
+        request.state.idempotent_replay = bool(scoped) and await asyncio.to_thread(idempotency_store.known, *scoped)
+    except sqlite3.Error as e:
+        logger.warning(f"[idempotency] Store unavailable: {e}")
+
+
+async def run_idempotent(
+    request: Request,
+    route: str,
+    handler: Callable[[Dict[str, Any]], Awaitable[Response]],
+    context: Optional[Dict[str, Any]] = None,
+    in_progress: Optional[Callable[[Dict[str, Any]], Response]] = None,
+) -> Response:
+    """
+    Run `handler(context)` once per Idempotency-Key (requests without one
+    just run). Repeats within the TTL get the stored response with an
+    Idempotent-Replayed header; repeats while the first is still running get
+    `in_progress(context)` (409 by default); reusing a key for a different
+    request is a 422. 5xx results are not stored, so a retry runs again,
+    with the context the failed attempt was given.
+    """
+    context = context or {}
+    scoped = await _key_and_fingerprint(request)
+    if scoped is None:
+        return await handler(context)
+    key, fingerprint = scoped
+
+    try:
+        claim = await asyncio.to_thread(idempotency_store.begin, key, fingerprint, context)
+    except sqlite3.Error as e:
+        # Fail open, like the rate limits: run the request without the guarantee
+        logger.warning(f"[idempotency] Store unavailable, running request without it: {e}")
+        return await handler(context)
+    idempotent_requests.inc(route=route, result=claim.state)
+
+    if claim.state == MISMATCH:
+        raise HTTPException(422, "Idempotency-Key was already used for a different request.")
+    if claim.state == REPLAY:
+        logger.info(f"[idempotency] Replaying {route} response for key {key}")
+        headers = {**claim.headers, "Idempotent-Replayed": "true"}
+        return Response(claim.body, claim.status_code, headers=headers, media_type="application/json")
+    if claim.state == IN_PROGRESS:
+        if in_progress is not None:
+            # Typically reads local build state, so it runs off the event loop too
+            return await asyncio.to_thread(in_progress, claim.context)
+        raise HTTPException(
+            409, "A request with this Idempotency-Key is still in progress.", headers={"Retry-After": "1"}
+        )
+
+    try:
+        response = await handler(claim.context)
+    except HTTPException as e:
+        await _finish(key, e.status_code, json.dumps({"detail": e.detail}).encode(), e.headers or {})
+        raise
+    except BaseException:
+        await asyncio.to_thread(idempotency_store.fail, key)
+        raise
+    await _finish(key, response.status_code, response.body, response.headers)
+    return response
+
+
+async def _finish(key: str, status_code: int, body: bytes, headers) -> None:
+    if status_code == 429:
+        # Refused before any work: the retry is a new request
+        await asyncio.to_thread(idempotency_store.release, key)
+    elif status_code >= 500:
+        await asyncio.to_thread(idempotency_store.fail, key)
+    else:
+        headers = {name.lower(): value for name, value in headers.items()}
+        kept = {name: headers[name] for name in REPLAYED_HEADERS if name in headers}
+        await asyncio.to_thread(idempotency_store.complete, key, status_code, body, kept)
@@ -0,0 +1,352 @@
+# backend/utils/metrics.py
+
+import re
+import time
+import inspect
+import logging
+import threading
+import contextvars
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "skillmint_"
+
+# Seconds; wide enough for local PostgREST calls and multi-minute LLM generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c), t[0]) for k, (c, t) in self._values.items()]
+        lines = self.header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Metrics of this process, rendered in the Prometheus text exposition format.
+    Collectors are callbacks run on every scrape to refresh gauges whose value
+    lives elsewhere (quota ledger, ratios).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"[metrics] Collector {getattr(collector, '__name__', collector)} failed: {e}")
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")))
+http_duration = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request duration until the last body chunk.", ("method", "route")))
+http_in_flight = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."))
+dependency_duration = REGISTRY.register(Histogram(
+    "dependency_call_duration_seconds", "Outbound call duration (LLM, YouTube, database).", ("dependency", "operation")))
+dependency_in_flight = REGISTRY.register(Gauge(
+    "dependency_calls_in_flight", "Outbound calls currently running.", ("dependency",)))
+dependency_errors = REGISTRY.register(Counter(
+    "dependency_errors_total", "Outbound calls that raised.", ("dependency", "operation", "error")))
+cache_requests = REGISTRY.register(Counter(
+    "cache_requests_total", "Cache lookups by result (hit/miss).", ("cache", "result")))
+cache_hit_ratio = REGISTRY.register(Gauge(
+    "cache_hit_ratio", "Hits over lookups since process start.", ("cache",)))
+
+
+def record_cache(cache: str, hits: int, misses: int = 0) -> None:
+    if hits:
+        cache_requests.inc(hits, cache=cache, result="hit")
+    if misses:
+        cache_requests.inc(misses, cache=cache, result="miss")
+
+
+def _collect_cache_ratios() -> None:
+    caches = {key[0] for key in list(cache_requests._values)}
+    for cache in caches:
+        hits = cache_requests.value(cache=cache, result="hit")
+        total = hits + cache_requests.value(cache=cache, result="miss")
+        if total:
+            cache_hit_ratio.set(hits / total, cache=cache)
+
+
+REGISTRY.add_collector(_collect_cache_ratios)
+
+
+# --- Server-Timing ---
+
+# Per-request {dependency: [busy seconds, calls, open calls, busy since]}, set by
+# MetricsMiddleware. Busy time is wall time with at least one call open, so
+# nested (create_course -> store_lesson_contents) and concurrent calls are not
+# counted twice.
+_request_timings: contextvars.ContextVar[Optional[Dict[str, List[float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+_timings_lock = threading.Lock()
+
+
+def _timing_enter(dependency: str, now: float) -> None:
+    timings = _request_timings.get()
+    if timings is None:
+        return
+    with _timings_lock:
+        entry = timings.setdefault(dependency, [0.0, 0, 0, 0.0])
+        if entry[2] == 0:
+            entry[3] = now
+        entry[1] += 1
+        entry[2] += 1
+
+
+def _timing_exit(dependency: str, now: float) -> None:
+    timings = _request_timings.get()
+    if timings is None or dependency not in timings:
+        return
+    with _timings_lock:
+        entry = timings[dependency]
+        entry[2] -= 1
+        if entry[2] == 0:
+            entry[0] += now - entry[3]
+
+
+def server_timing_header(timings: Dict[str, List[float]], total: float) -> str:
+    parts = [
+        f'{dep};dur={busy * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"'
+        for dep, (busy, calls, _, _) in sorted(timings.items())
+    ]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+# --- Instrumentation ---
+
+class _Timer:
+    def __init__(self, dependency: str, operation: str):
+        self.dependency = dependency
+        self.operation = operation
+
+    def __enter__(self):
+        dependency_in_flight.inc(dependency=self.dependency)
+        self.start = time.perf_counter()
+        _timing_enter(self.dependency, self.start)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _timing_exit(self.dependency, end)
+        dependency_in_flight.dec(dependency=self.dependency)
+        dependency_duration.observe(end - self.start, dependency=self.dependency, operation=self.operation)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            dependency_errors.inc(dependency=self.dependency, operation=self.operation, error=exc_type.__name__)
+        return False
+
+
+def track(dependency: str, operation: str) -> _Timer:
+    """Context manager timing one outbound call: `with track("youtube", "search"): ...`."""
+    return _Timer(dependency, operation)
+
+
+def timed(dependency: str, operation: Optional[str] = None):
+    """
+    Decorator recording duration, in-flight count, errors and Server-Timing
+    for every call of a sync function, coroutine function or async generator
+    (timed from first to last item).
+    """
+
+    def decorator(fn):
+        op = operation or fn.__name__
+
+        if inspect.isasyncgenfunction(fn):
+            @wraps(fn)
+            async def agen_wrapper(*args, **kwargs):
+                with _Timer(dependency, op):
+                    async for item in fn(*args, **kwargs):
+                        yield item
+            return agen_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _Timer(dependency, op):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def sync_wrapper(*args, **kwargs):
+            with _Timer(dependency, op):
+                return fn(*args, **kwargs)
+        return sync_wrapper
+
+    return decorator
+
+
+_PATH_PARAM_RE = re.compile(r"\{(\w+)(?::\w+)?\}")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: per-route request counts and durations, the
+    in-flight gauge, and a Server-Timing response header summing the
+    dependency time (llm, youtube, db, ...) spent before the response started.
+    Routes are labelled by path template, so ids do not explode cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_label(scope) -> str:
+        # FastAPI records the matched route in the (shared) scope, with its
+        # path relative to the router; recover the include_router prefix from
+        # the concrete path.
+        route = scope.get("route")
+        template = getattr(route, "path", None)
+        if not template:
+            return "unmatched"
+        params = scope.get("path_params", {})
+        concrete = _PATH_PARAM_RE.sub(lambda m: str(params.get(m.group(1), m.group(0))), template)
+        path = scope.get("path", "")
+        if path.endswith(concrete):
+            return path[:len(path) - len(concrete)] + template
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, List[float]] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+        http_in_flight.inc()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing_header(timings, time.perf_counter() - start)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            route = self._route_label(scope)
+            http_requests.inc(method=scope["method"], route=route, status=str(status))
+            http_duration.observe(elapsed, method=scope["method"], route=route)
+            _request_timings.reset(token)
@@ -1,7 +1,172 @@
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
 
+THINK_BLOCK_RE = re.compile(r"<think>.*?</think>", re.DOTALL | re.IGNORECASE)
+THINK_OPEN_RE = re.compile(r"<think>", re.IGNORECASE)
+THINK_CLOSE_RE = re.compile(r"</think>", re.IGNORECASE)
+QUESTION_HEADER_RE = re.compile(r"^Q\d+[\):]")
+QUESTION_PREFIX_RE = re.compile(r"^Q\d+[\):]\s*")
+OPTION_START_RE = re.compile(r"^[A-Za-z][\)\.:\-]")
+OPTION_RE = re.compile(r"^([A-Za-z])[\)\.:\-]?\s*(.*)$")
+ANSWER_RE = re.compile(r"^Answer\s*[:\-]?\s*(.*)$", re.IGNORECASE)
+ANSWER_LETTER_RE = re.compile(r"[A-Za-z]")
+ANSWER_LETTER_PREFIX_RE = re.compile(r"^[A-Za-z][\)\.:\-]?")
+
+THINK_OPEN = "<think>"
+
+
+def _parse_question_block(block: str) -> Optional[Dict]:
+    """Parse one `Qn)` block; returns the MCQ dict or None if it is not usable."""
+    lines = [l.strip() for l in block.splitlines() if l.strip()]
+    if not lines or not QUESTION_HEADER_RE.match(lines[0]):
+        return None
+    # Extract question text (may be empty)
+    q_line = lines[0]
+    question = QUESTION_PREFIX_RE.sub("", q_line, count=1)
+    if not question:
+        # Try to use the next line as question if first is empty
+        if len(lines) > 1 and not OPTION_START_RE.match(lines[1]):
+            question = lines[1]
+            lines = [lines[0]] + lines[2:]
+    options = {}
+    answer = None
+    # Parse options and answer
+    for line in lines[1:]:
+        opt_match = OPTION_RE.match(line)
+        if opt_match:
+            key = opt_match.group(1).upper()
+            val = opt_match.group(2).strip()
+            options[key] = val
+            continue
+        ans_match = ANSWER_RE.match(line)
+        if ans_match:
+            raw_ans = ans_match.group(1).strip()
+            # Accept A, B, C, D, or full text
+            if ANSWER_LETTER_RE.fullmatch(raw_ans):
+                answer = raw_ans.upper()
+            elif ANSWER_LETTER_PREFIX_RE.match(raw_ans):
+                answer = raw_ans[0].upper()
+            else:
+                # Try to match answer text to option (case-insensitive, partial match allowed)
+                for k, v in options.items():
+                    if raw_ans.lower() in v.lower() or v.lower() in raw_ans.lower():
+                        answer = k
+                        break
+    # If answer is still not found, try to guess (e.g., if only one option contains 'correct' or 'right')
+    if not answer and options:
+        for k, v in options.items():
+            if 'correct' in v.lower() or 'right' in v.lower():
+                answer = k
+                break
+    # Accept any number of options >= 2
+    if question and len(options) >= 2 and answer in options:
+        # Preserve the order of options as they appear (A, B, C, ...)
+        return {
+            "question": question,
+            "options": [options[k] for k in sorted(options)],
+            "answer": options[answer],
+        }
+    return None
+
+
+class MCQStreamParser:
+    """
+    Incremental `parse_mcqs`: feed LLM output as it streams in and get each MCQ
+    back as soon as its question block is complete.
+
+    A block is complete when the next `Qn)` header line arrives or the stream is
+    closed. Lines after the Answer line (explanations, late options, a second
+    Answer) still belong to the question in the batch grammar, so emitting any
+    earlier could disagree with `parse_mcqs`; with this rule the concatenated
+    output of `feed` + `close` is identical to `parse_mcqs` on the whole text.
+
+    `<think>...</think>` blocks are dropped as they stream past; an unclosed
+    `<think>` is released as ordinary text on `close`, like the batch regex.
+    """
+
+    def __init__(self):
+        self._pending = ""      # raw text not yet cleared of think blocks
+        self._in_think = False  # `_pending` starts with an unclosed <think>
+        self._close_from = 0    # where to resume looking for </think>
+        self._line = ""         # partial physical line of cleaned text
+        self._block: List[str] = []
+
+    def feed(self, chunk: str) -> List[Dict]:
+        self._pending += chunk
+        return self._consume_lines(self._strip_think())
+
+    def close(self) -> List[Dict]:
+        text = self._strip_think() + self._pending
+        self._pending = ""
+        self._in_think = False
+        mcqs = self._consume_lines(text)
+        mcqs.extend(self._on_line(self._line))
+        self._line = ""
+        mcq = self._finish_block()
+        if mcq:
+            mcqs.append(mcq)
+        return mcqs
+
+    def _strip_think(self) -> str:
+        """Return the cleaned text that is safe to release from `_pending`."""
+        out = []
+        while True:
+            if self._in_think:
+                close = THINK_CLOSE_RE.search(self._pending, self._close_from)
+                if not close:
+                    # Keep waiting; don't rescan what we've already searched
+                    self._close_from = max(len(THINK_OPEN), len(self._pending) - len("</think>") + 1)
+                    break
+                self._pending = self._pending[close.end():]
+                self._in_think = False
+                continue
+
+            opened = THINK_OPEN_RE.search(self._pending)
+            if opened:
+                out.append(self._pending[:opened.start()])
+                self._pending = self._pending[opened.start():]
+                self._in_think = True
+                self._close_from = len(THINK_OPEN)
+                continue
+
+            # Hold back a tail that could still grow into "<think>"
+            keep = 0
+            lowered = self._pending[-(len(THINK_OPEN) - 1):].lower()
+            for size in range(min(len(lowered), len(THINK_OPEN) - 1), 0, -1):
+                if THINK_OPEN.startswith(lowered[-size:]):
+                    keep = size
+                    break
+            cut = len(self._pending) - keep
+            out.append(self._pending[:cut])
+            self._pending = self._pending[cut:]
+            break
+        return "".join(out)
+
+    def _consume_lines(self, text: str) -> List[Dict]:
+        if not text:
+            return []
+        parts = (self._line + text).split("\n")
+        self._line = parts.pop()
+        mcqs = []
+        for line in parts:
+            mcqs.extend(self._on_line(line))
+        return mcqs
+
+    def _on_line(self, line: str) -> List[Dict]:
+        # Mirrors re.split(r"\n\s*(?=Q\d+[\):])"): a header line starts a new block
+        if QUESTION_HEADER_RE.match(line.lstrip()):
+            mcq = self._finish_block()
+            self._block = [line]
+            return [mcq] if mcq else []
+        self._block.append(line)
+        return []
+
+    def _finish_block(self) -> Optional[Dict]:
+        block, self._block = self._block, []
+        return _parse_question_block("\n".join(block)) if block else None
+
+
 def parse_mcqs(text: str) -> List[Dict]:
     """
     Extremely forgiving MCQ parser for LLM output.
@@ -12,90 +177,212 @@ def parse_mcqs(text: str) -> List[Dict]:
     - Ignores <think> blocks and explanations
     - Recovers from missing or extra whitespace, dashes, etc.
     - Accepts any number of options (minimum 2)
+    For streamed output use MCQStreamParser, which yields the same MCQs.
     """
-    mcqs = []
-    # Remove <think> blocks and explanations
-    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
-    # Split into question blocks
-    q_blocks = re.split(r"\n\s*(?=Q\d+[\):])", text)
-    for block in q_blocks:
-        lines = [l.strip() for l in block.splitlines() if l.strip()]
-        if not lines or not re.match(r"^Q\d+[\):]", lines[0]):
-            continue
-        # Extract question text (may be empty)
-        q_line = lines[0]
-        question = re.sub(r"^Q\d+[\):]\s*", "", q_line)
-        if not question:
-            # Try to use the next line as question if first is empty
-            if len(lines) > 1 and not re.match(r"^[A-Za-z][\)\.:\-]", lines[1]):
-                question = lines[1]
-                lines = [lines[0]] + lines[2:]
-        options = {}
-        answer = None
-        # Parse options and answer
-        for line in lines[1:]:
-            opt_match = re.match(r"^([A-Za-z])[\)\.:\-]?\s*(.*)$", line)
-            if opt_match:
-                key = opt_match.group(1).upper()
-                val = opt_match.group(2).strip()
-                options[key] = val
-                continue
-            ans_match = re.match(r"^Answer\s*[:\-]?\s*(.*)$", line, re.IGNORECASE)
-            if ans_match:
-                raw_ans = ans_match.group(1).strip()
-                # Accept A, B, C, D, or full text
-                if re.fullmatch(r"[A-Za-z]", raw_ans):
-                    answer = raw_ans.upper()
-                elif re.match(r"^[A-Za-z][\)\.:\-]?", raw_ans):
-                    answer = raw_ans[0].upper()
-                else:
-                    # Try to match answer text to option (case-insensitive, partial match allowed)
-                    for k, v in options.items():
-                        if raw_ans.lower() in v.lower() or v.lower() in raw_ans.lower():
-                            answer = k
-                            break
-        # If answer is still not found, try to guess (e.g., if only one option contains 'correct' or 'right')
-        if not answer and options:
-            for k, v in options.items():
-                if 'correct' in v.lower() or 'right' in v.lower():
-                    answer = k
-                    break
-        # Accept any number of options >= 2
-        if question and len(options) >= 2 and answer in options:
-            # Preserve the order of options as they appear (A, B, C, ...)
-            sorted_keys = sorted(options.keys(), key=lambda x: ord(x))
-            opts = [options[k] for k in sorted_keys]
-            # Find the index of the answer
-            answer_text = options[answer]
-            mcqs.append({
-                "question": question,
-                "options": opts,
-                "answer": answer_text
-            })
+    parser = MCQStreamParser()
+    mcqs = parser.feed(text)
+    mcqs.extend(parser.close())
     return mcqs
 
-def robust_parse_mcqs(text: str):
+# --- Tolerant JSON extraction ---
+
+# Characters the scanner has to look at; everything else is skipped in bulk
+_STRUCTURAL_RE = re.compile("[\\[\\]{}\"'\u201c]")
+_STRING_START_RE = re.compile("[\"'\u201c]")
+_STRING_END_RE = {
+    '"': re.compile(r'["\\]'),
+    "'": re.compile(r"['\\]"),
+    "\u201c": re.compile("[\u201d\\\\]"),
+}
+_UNESCAPED_DOUBLE_QUOTE_RE = re.compile(r'(?<!\\)"')
+_TRAILING_COMMA_RE = re.compile(r",(\s*[\]}])")
+_PY_LITERAL_RE = re.compile(r"\b(True|False|None)\b")
+_BARE_KEY_RE = re.compile(r"([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)(\s*:)")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"]": "[", "}": "{"}
+# Only after one of these can a single quote open a key or value; elsewhere
+# it is an apostrophe ("don't", "I've")
+_VALUE_STARTS = "[{,:"
+# Text re-read after malformed objects, in passes over the whole input
+_RESCAN_PASSES = 2
+JSON_FENCE_RE = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+
+
+def _opens_string(text: str, i: int) -> bool:
+    """Whether the quote at `i` starts a string literal (see _VALUE_STARTS)."""
+    if text[i] != "'":
+        return True
+    j = i - 1
+    while j >= 0 and text[j].isspace():
+        j -= 1
+    return j < 0 or text[j] in _VALUE_STARTS
+
+
+def _string_end(text: str, start: int) -> int:
     """
-    Extracts and parses the first JSON array from text, even if wrapped in markdown or with trailing commas.
-    Returns a list of dicts or [] if parsing fails.
+    Index just past the string literal whose opening quote is at `start`,
+    or len(text) + 1 if the string is never closed.
     """
-    # Remove <think> blocks
-    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
-    # Extract JSON block if wrapped in markdown
-    json_match = re.search(r"```json\s*(.*?)\s*```", text, re.DOTALL)
-    if json_match:
-        text = json_match.group(1)
-    # Extract first JSON array
-    array_match = re.search(r"\[\s*{.*?}\s*\]", text, re.DOTALL)
-    if array_match:
-        text = array_match.group(0)
-    # Remove trailing commas before closing brackets
-    text = re.sub(r",\s*([\]}])", r"\1", text)
-    # Remove any trailing commas in arrays
-    text = re.sub(r",\s*\]", "]", text)
+    end_re = _STRING_END_RE[text[start]]
+    pos = start + 1
+    while True:
+        m = end_re.search(text, pos)
+        if not m:
+            return len(text) + 1
+        if m.group() == "\\":
+            pos = m.end() + 1  # skip the escaped character
+            continue
+        return m.end()
+
+
+def _repair_json(fragment: str) -> str:
+    """
+    Fix common LLM defects in one JSON value without touching string contents:
+    trailing commas, single/smart-quoted strings, Python literals, bare keys,
+    and unterminated trailing strings.
+    """
+    out = []
+    pos = 0
+    n = len(fragment)
+    while True:
+        m = _STRING_START_RE.search(fragment, pos)
+        while m and not _opens_string(fragment, m.start()):
+            m = _STRING_START_RE.search(fragment, m.end())
+        stop = m.start() if m else n
+        code = fragment[pos:stop]
+        code = _TRAILING_COMMA_RE.sub(r"\1", code)
+        code = _PY_LITERAL_RE.sub(lambda lit: _PY_LITERALS[lit.group()], code)
+        code = _BARE_KEY_RE.sub(r'\1"\2"\3', code)
+        out.append(code)
+        if not m:
+            break
+        end = _string_end(fragment, stop)
+        body = fragment[stop + 1:end - 1] if end <= n else fragment[stop + 1:]
+        if fragment[stop] == "'":
+            body = body.replace("\\'", "'")
+        if fragment[stop] != '"':
+            body = _UNESCAPED_DOUBLE_QUOTE_RE.sub('\\\\"', body)
+        out.append(f'"{body}"')
+        pos = end
+    return "".join(out)
+
+
+def _load_object(fragment: str) -> Optional[Dict]:
+    """Parse one `{...}` fragment as-is, then repaired; None if neither works."""
     try:
-        return json.loads(text)
-    except Exception as e:
-        # Optionally log the error
-        # print(f"robust_parse_mcqs failed: {e}\nRaw text:\n{text}")
-        return []
+        value = json.loads(fragment, strict=False)
+    except ValueError:
+        try:
+            value = json.loads(_repair_json(fragment), strict=False)
+        except ValueError:
+            return None
+    return value if isinstance(value, dict) else None
+
+
+def extract_json_objects(text: str) -> List[Dict]:
+    """
+    Single left-to-right pass over `text` that tracks brackets and strings,
+    finds arrays of objects, and returns every object that parses (after
+    repairs) from the first array that yields any. A broken object is skipped
+    by rescanning from the next "{" after its start, so an apostrophe that
+    threw off string tracking cannot swallow the objects behind it; a
+    truncated array keeps the objects completed before the cut. Objects
+    outside any array are used only when no array yields anything.
+    """
+    stack: List[str] = []           # open brackets
+    open_count = {"[": 0, "{": 0}   # per-kind counts of `stack`, to avoid scanning it
+    array_objects: List[Dict] = []  # valid objects seen inside arrays
+    loose_objects: List[Dict] = []  # valid objects seen outside any array
+    object_start = None             # index of the outermost open "{"
+    object_depth = 0                # len(stack) just before that "{"
+    rescan_budget = _RESCAN_PASSES * len(text)
+    pos = 0
+
+    while True:
+        m = _STRUCTURAL_RE.search(text, pos)
+        if not m and object_start is None:
+            break
+        if not m:
+            # Unclosed object: rescan from the next "{" unless out of budget
+            pos = text.find("{", object_start + 1)
+            rescan_budget -= len(text) - pos
+            if pos < 0 or rescan_budget < 0:
+                break
+            for popped in stack[object_depth:]:
+                open_count[popped] -= 1
+            del stack[object_depth:]
+            object_start = None
+            continue
+        ch = m.group()
+        i = m.start()
+        pos = m.end()
+
+        if ch in "\"'\u201c":
+            # Prose outside any bracket is full of apostrophes and quotes; only
+            # treat them as string delimiters inside a structure.
+            if stack and _opens_string(text, i):
+                pos = _string_end(text, i)
+            continue
+
+        if ch == "[" or ch == "{":
+            if ch == "{" and object_start is None:
+                object_start = i
+                object_depth = len(stack)
+            stack.append(ch)
+            open_count[ch] += 1
+            continue
+
+        # Closing bracket: tolerate mismatches by unwinding to its opener
+        opener = _CLOSERS[ch]
+        if not open_count[opener]:
+            continue
+        while True:
+            popped = stack.pop()
+            open_count[popped] -= 1
+            if popped == opener:
+                break
+
+        if object_start is not None and len(stack) <= object_depth:
+            obj = None
+            if ch == "}" and len(stack) == object_depth:
+                obj = _load_object(text[object_start:i + 1])
+            if obj:
+                (array_objects if object_depth else loose_objects).append(obj)
+            else:
+                # Malformed ("{,}" and the like repair to {}): its closing
+                # brace may belong to a later object, so rescan from the next
+                # "{" after its start
+                nxt = text.find("{", object_start + 1)
+                if 0 <= nxt < i and rescan_budget >= pos - nxt:
+                    rescan_budget -= pos - nxt
+                    pos = nxt
+            object_start = None
+        elif ch == "]" and array_objects and object_start is None:
+            return array_objects
+
+    if array_objects:
+        return array_objects
+    # A single wrapper object such as {"questions": [...]}
+    for obj in loose_objects:
+        for value in obj.values():
+            if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+                return value
+    return loose_objects
+
+
+def robust_parse_mcqs(text: str) -> List[Dict]:
+    """
+    Extracts the MCQ objects of the first JSON array in `text`, even if wrapped
+    in markdown, surrounded by prose, truncated, or containing LLM defects
+    (trailing commas, single quotes, Python literals, bare keys).
+    Returns a list of dicts; objects that cannot be recovered are dropped.
+    """
+    # Remove <think> blocks
+    text = THINK_BLOCK_RE.sub("", text)
+    # A ```json block wins over whatever prose surrounds it
+    fence = JSON_FENCE_RE.search(text)
+    if fence:
+        objects = extract_json_objects(fence.group(1))
+        if objects:
+            return objects
+    return extract_json_objects(text)
@@ -0,0 +1,245 @@
+# backend/utils/rate_limit.py
+
+import os
+import math
+import asyncio
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request
+
+from backend.utils.metrics import REGISTRY, Counter, Gauge
+from backend.utils.ttl_cache import LOCAL_CACHE_PATH
+
+logger = logging.getLogger("uvicorn.error")
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+# Per-user limits as "<requests>/<seconds>": the bucket holds <requests>
+# tokens and refills at that rate. Override with RATE_LIMIT_<NAME>, e.g.
+# RATE_LIMIT_COURSE_BUILD=5/3600; "off" disables one limit.
+DEFAULT_LIMITS = {
+    "course_build": "3/600",
+    "outline": "20/600",
+    "quiz_evaluate": "30/60",
+    "youtube_search": "30/60",
+}
+
+# The user a request names (X-User-Id, user_id) is not authenticated, so each
+# client address also gets a bucket this many times the per-user limit: one
+# address may carry several users (NAT, campus networks), but rotating user
+# ids from one address no longer resets the limit.
+ADDRESS_LIMIT_FACTOR = float(os.getenv("RATE_LIMIT_ADDRESS_FACTOR", "5"))
+
+# Builds running at once in this API process (inline mode)
+MAX_CONCURRENT_BUILDS = int(os.getenv("MAX_CONCURRENT_BUILDS", "2"))
+# Builds waiting in the shared job queue (queue mode) before new ones are refused
+MAX_QUEUED_BUILDS = int(os.getenv("MAX_QUEUED_BUILDS", "20"))
+# Retry-After sent when builds are shed for load rather than per-user limits
+BUILD_RETRY_AFTER_SECONDS = int(os.getenv("BUILD_RETRY_AFTER_SECONDS", "60"))
+
+
+def _parse_limit(spec: str) -> Optional[Tuple[float, float]]:
+    spec = spec.strip().lower()
+    if spec in ("", "off", "none", "0"):
+        return None
+    count, _, seconds = spec.partition("/")
+    return float(count), float(seconds or 1)
+
+
+def configured_limits() -> Dict[str, Optional[Tuple[float, float]]]:
+    return {
+        name: _parse_limit(os.getenv(f"RATE_LIMIT_{name.upper()}", default))
+        for name, default in DEFAULT_LIMITS.items()
+    }
+
+
+LIMITS = configured_limits()
+
+# Every this many takes, buckets untouched for BUCKET_IDLE_SECONDS are deleted;
+# by then they have refilled, so dropping one is the same as keeping it full
+PURGE_EVERY_TAKES = 1000
+BUCKET_IDLE_SECONDS = max([86400.0] + [limit[1] for limit in LIMITS.values() if limit])
+
+rate_limit_decisions = REGISTRY.register(Counter(
+    "rate_limit_decisions_total", "Admission decisions for rate-limited routes.", ("limit", "result")))
+admission_in_use = REGISTRY.register(Gauge(
+    "admission_slots_in_use", "Slots held under each concurrency limit in this process.", ("limit",)))
+
+
+class TokenBuckets:
+    """
+    Per-key token buckets kept in the local SQLite file, so every API worker
+    on the host draws from the same bucket (same approach as the YouTube
+    quota ledger). `take_all` is one short BEGIN IMMEDIATE transaction.
+    """
+
+    def __init__(self, path: str = LOCAL_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._takes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def take_all(self, limits: Sequence[Tuple[str, float, float]]) -> float:
+        """
+        Take one token from each (key, capacity, per_seconds) bucket, or from
+        none of them: returns 0 on success, else seconds until all have one.
+        """
+        now = time.time()
+        with self._lock:
+            self._takes += 1
+            if self._takes % PURGE_EVERY_TAKES == 0:
+                self._purge_idle(BUCKET_IDLE_SECONDS)
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                wait, updates = 0.0, []
+                for key, capacity, per_seconds in limits:
+                    rate = capacity / per_seconds
+                    row = conn.execute("SELECT tokens, updated_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+                    tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+                    if tokens < 1:
+                        wait = max(wait, (1 - tokens) / rate)
+                    updates.append((key, tokens - 1, now))
+                if wait > 0:
+                    conn.execute("ROLLBACK")
+                    return wait
+                conn.executemany("INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?)", updates)
+                conn.execute("COMMIT")
+                return 0.0
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _purge_idle(self, older_than: float) -> int:
+        return self._connect().execute("DELETE FROM rate_limits WHERE updated_at < ?", (time.time() - older_than,)).rowcount
+
+    def purge_idle(self, older_than: float = BUCKET_IDLE_SECONDS) -> int:
+        with self._lock:
+            return self._purge_idle(older_than)
+
+
+buckets = TokenBuckets()
+
+
+def too_many_requests(limit: str, retry_after: float, detail: str, result: str = "rejected") -> HTTPException:
+    """429 with Retry-After; `result` is "rejected" for per-user limits and "shed" for load shedding."""
+    rate_limit_decisions.inc(limit=limit, result=result)
+    return HTTPException(429, detail=detail, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
+def client_address(request: Request) -> str:
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def claimed_user(request: Request) -> Optional[str]:
+    """
+    The user the request says it is for: X-User-Id, or a user_id in the
+    query or JSON body. Nothing vouches for it, so it is never the only key
+    a limit is charged to.
+    """
+    user_id = request.headers.get("x-user-id") or request.query_params.get("user_id")
+    if not user_id and request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and isinstance(body.get("user_id"), str):
+            user_id = body["user_id"]
+    return user_id or None
+
+
+async def client_identity(request: Request) -> str:
+    """The claimed user of the request, else its client address; namespaces per-user state such as idempotency keys."""
+    user_id = await claimed_user(request)
+    return f"user:{user_id}" if user_id else client_address(request)
+
+
+async def limit_keys(request: Request, name: str, limit: Tuple[float, float]) -> List[Tuple[str, float, float]]:
+    """The buckets a request to limit `name` draws from: its client address, and its claimed user if any."""
+    capacity, per_seconds = limit
+    keys = [(f"{name}:{client_address(request)}", capacity * ADDRESS_LIMIT_FACTOR, per_seconds)]
+    user_id = await claimed_user(request)
+    if user_id:
+        keys.append((f"{name}:user:{user_id}", capacity, per_seconds))
+    return keys
+
+
+def rate_limit(name: str):
+    """
+    Route dependency enforcing the limit `name`, per client address and per
+    claimed user, before the handler (and any LLM or YouTube call) runs:
+    `dependencies=[Depends(rate_limit("outline"))]`.
+    """
+    if name not in DEFAULT_LIMITS:
+        raise ValueError(f"Unknown rate limit {name!r}")
+
+    async def dependency(request: Request) -> None:
+        limit = LIMITS.get(name)
+        if not RATE_LIMIT_ENABLED or limit is None:
+            return
+        if getattr(request.state, "idempotent_replay", False):
+            # Answered from the idempotency store (backend.utils.idempotency) without doing the work again
+            rate_limit_decisions.inc(limit=name, result="replayed")
+            return
+        keys = await limit_keys(request, name, limit)
+        try:
+            wait = await asyncio.to_thread(buckets.take_all, keys)
+        except sqlite3.Error as e:
+            # Fail open: a broken local file must not take the API down
+            logger.warning(f"[rate-limit] Bucket store unavailable, allowing request: {e}")
+            return
+        if wait > 0:
+            identity = " / ".join(key.partition(":")[2] for key, _, _ in keys)
+            logger.info(f"[rate-limit] {name} limit hit for {identity}, retry in {wait:.0f}s")
+            raise too_many_requests(name, wait, "Too many requests, please retry later.")
+        rate_limit_decisions.inc(limit=name, result="allowed")
+
+    return dependency
+
+
+class ConcurrencyLimit:
+    """Non-blocking admission: at most `limit` holders at once, others are refused with 429."""
+
+    def __init__(self, name: str, limit: int, detail: str, retry_after: float = BUILD_RETRY_AFTER_SECONDS):
+        self.name = name
+        self.limit = limit
+        self.detail = detail
+        self.retry_after = retry_after
+        self.active = 0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        if self.limit > 0 and self.active >= self.limit:
+            logger.warning(f"[rate-limit] {self.name}: {self.active} running, shedding request")
+            raise too_many_requests(self.name, self.retry_after, self.detail, "shed")
+        rate_limit_decisions.inc(limit=self.name, result="allowed")
+        self.active += 1
+        admission_in_use.inc(limit=self.name)
+        try:
+            yield
+        finally:
+            self.active -= 1
+            admission_in_use.dec(limit=self.name)
+
+
+build_slots = ConcurrencyLimit(
+    "concurrent_builds", MAX_CONCURRENT_BUILDS, "Server is busy building other courses, please retry later."
+)
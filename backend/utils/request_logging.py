@@ -0,0 +1,290 @@
+# backend/utils/request_logging.py
+
+import os
+import json
+import time
+import queue
+import random
+import logging
+import threading
+import contextvars
+import logging.handlers
+from typing import Any, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger("uvicorn.error")
+access_logger = logging.getLogger("skillmint.access")
+payload_logger = logging.getLogger("skillmint.payload")
+
+# Share of successful, fast requests that get an access-log line; errors and
+# slow requests are always logged.
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+ACCESS_LOG_SKIP_PATHS = frozenset(
+    p.strip() for p in os.getenv("ACCESS_LOG_SKIP_PATHS", "/health").split(",") if p.strip()
+)
+
+# Large payloads (LLM outputs, video lists) go to the skillmint.payload
+# logger at DEBUG, at most PAYLOAD_LOG_RATE records per second with bursts of
+# PAYLOAD_LOG_BURST, each cut to PAYLOAD_LOG_MAX_CHARS.
+PAYLOAD_LOG_RATE = float(os.getenv("PAYLOAD_LOG_RATE", "2"))
+PAYLOAD_LOG_BURST = int(os.getenv("PAYLOAD_LOG_BURST", "10"))
+PAYLOAD_LOG_MAX_CHARS = int(os.getenv("PAYLOAD_LOG_MAX_CHARS", "2000"))
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 64
+
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+
+def current_request_id() -> str:
+    return request_id_var.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps every record with the id of the request it was logged under."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request id, message and any `fields`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+# --- Non-blocking log delivery ---
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records together with the handlers they were meant for."""
+
+    def __init__(self, log_queue, targets: List[logging.Handler]):
+        super().__init__(log_queue)
+        self.targets = targets
+        self.addFilter(RequestIdFilter())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep msg/args intact: uvicorn's access formatter reads record.args
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait((self.targets, record))
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def handle(self, item) -> None:
+        targets, record = item
+        for handler in targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class _LogQueue:
+    """
+    Moves the handlers of the given loggers behind a queue, so callers on the
+    event loop only pay for a `put_nowait`; one listener thread does the
+    formatting and the writes. `stop` drains the queue and restores the
+    original handlers.
+    """
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener: Optional[_QueueListener] = None
+        self._moved: List[tuple] = []
+
+    def start(self, logger_names: List[str]) -> None:
+        if self._listener is not None:
+            return
+        for name in logger_names:
+            target = logging.getLogger(name)
+            original = list(target.handlers)
+            if not original:
+                continue
+            queue_handler = _QueueHandler(self._queue, original)
+            for handler in original:
+                target.removeHandler(handler)
+            target.addHandler(queue_handler)
+            self._moved.append((target, original, queue_handler))
+        self._listener = _QueueListener(self._queue)
+        self._listener.start()
+
+    def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        for target, original, queue_handler in self._moved:
+            target.removeHandler(queue_handler)
+            for handler in original:
+                target.addHandler(handler)
+        self._moved = []
+
+
+log_queue = _LogQueue()
+
+# Loggers whose output goes through the queue once the app has started.
+# uvicorn.error has no handlers of its own and propagates to "uvicorn".
+QUEUED_LOGGERS = ["uvicorn", "uvicorn.access", access_logger.name, payload_logger.name]
+
+DEBUG_PAYLOADS = os.getenv("DEBUG_PAYLOADS", "false").lower() == "true"
+
+
+def _own_handler(target: logging.Logger, formatter: logging.Formatter) -> None:
+    if not target.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(formatter)
+        target.addHandler(handler)
+        target.propagate = False
+
+
+def start_log_queue() -> None:
+    access_logger.setLevel(logging.INFO)
+    _own_handler(access_logger, JsonFormatter())
+    if DEBUG_PAYLOADS:
+        payload_logger.setLevel(logging.DEBUG)
+        _own_handler(payload_logger, logging.Formatter("%(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    log_queue.start(QUEUED_LOGGERS)
+
+
+def stop_log_queue() -> None:
+    log_queue.stop()
+
+
+# --- Rate-limited debug payloads ---
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.dropped += 1
+            return False
+
+
+_payload_bucket = _TokenBucket(PAYLOAD_LOG_RATE, PAYLOAD_LOG_BURST)
+
+
+def log_payload(tag: str, label: str, payload: Any) -> None:
+    """
+    Log a large value (LLM output, video list, ...) on the debug channel.
+    Nothing is formatted unless skillmint.payload is enabled for DEBUG and the
+    rate limit allows it; skipped records are counted in the next one.
+    """
+    if not payload_logger.isEnabledFor(logging.DEBUG) or not _payload_bucket.take():
+        return
+    text = payload if isinstance(payload, str) else repr(payload)
+    size = len(text)
+    if size > PAYLOAD_LOG_MAX_CHARS:
+        text = text[:PAYLOAD_LOG_MAX_CHARS] + f"... [{size - PAYLOAD_LOG_MAX_CHARS} more chars]"
+    dropped, _payload_bucket.dropped = _payload_bucket.dropped, 0
+    suffix = f" ({dropped} payloads skipped by rate limit)" if dropped else ""
+    payload_logger.debug(f"[{tag}] {label} ({size} chars){suffix}:\n{text}")
+
+
+# --- Access log middleware ---
+
+def _incoming_request_id(scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == REQUEST_ID_HEADER:
+            rid = value.decode("latin-1").strip()
+            if 0 < len(rid) <= MAX_REQUEST_ID_LENGTH and rid.isprintable():
+                return rid
+            return None
+    return None
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI access log. Gives each HTTP request an id (taken from an
+    incoming X-Request-ID header or generated), exposes it through
+    `request_id_var` and the X-Request-ID response header, and logs method,
+    path, status, time to first byte, total duration and response size once
+    the last body chunk is sent, so streamed responses are timed end to end.
+    Fast successful requests are sampled at ACCESS_LOG_SAMPLE_RATE.
+    """
+
+    def __init__(self, app, sample_rate: float = ACCESS_LOG_SAMPLE_RATE, slow_ms: float = ACCESS_LOG_SLOW_MS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        status = 500
+        first_byte = None
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, first_byte, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                if first_byte is None:
+                    first_byte = time.perf_counter()
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end = time.perf_counter()
+            self._log(scope, status, start, first_byte, end, size)
+            request_id_var.reset(token)
+
+    def _log(self, scope, status: int, start: float, first_byte: Optional[float], end: float, size: int) -> None:
+        path = scope.get("path", "")
+        duration_ms = (end - start) * 1000
+        if status < 400 and duration_ms < self.slow_ms:
+            if path in ACCESS_LOG_SKIP_PATHS or random.random() >= self.sample_rate:
+                return
+        if not access_logger.isEnabledFor(logging.INFO):
+            return
+        client = scope.get("client")
+        access_logger.info(
+            f"{scope['method']} {path} {status} {duration_ms:.1f}ms",
+            extra={"fields": {
+                "method": scope["method"],
+                "path": path,
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "ttfb_ms": round((first_byte - start) * 1000, 2) if first_byte else None,
+                "bytes": size,
+                "client": client[0] if client else None,
+            }},
+        )
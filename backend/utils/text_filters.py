@@ -0,0 +1,151 @@
+# backend/utils/text_filters.py
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger("uvicorn.error")
+
+VIDEO_FILTERS_PATH = os.getenv(
+    "VIDEO_FILTERS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "video_filters.json"),
+)
+RELOAD_CHECK_INTERVAL = 5.0  # seconds between mtime checks of the rules file
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive substring matcher for a fixed keyword list, compiled once
+    into a single regex alternation so a text is matched in one pass however
+    long the list is.
+
+    The keywords are tried longest first, so a match reports the longest
+    keyword starting at its position, and any shorter keyword starting there
+    is a prefix of it; resuming the search one character after each match
+    start visits every position where a keyword starts. `find_all` therefore
+    returns exactly the set of keywords `k` with `k in text.lower()`.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(k.lower() for k in keywords if k))
+        self._search = None
+        if self.keywords:
+            alternatives = "|".join(map(re.escape, sorted(self.keywords, key=len, reverse=True)))
+            self._search = re.compile(alternatives).search
+            self._implied: Dict[str, Set[str]] = {
+                k: {other for other in self.keywords if other in k} for k in self.keywords
+            }
+
+    def find_all(self, text: str, enough: Optional[Callable[[Set[str]], bool]] = None) -> Set[str]:
+        """Every keyword occurring in `text`; stops early once `enough(found)` is true."""
+        found: Set[str] = set()
+        if self._search is None:
+            return found
+        text = text.lower()
+        m = self._search(text)
+        while m:
+            found |= self._implied[m.group()]
+            if enough is not None and enough(found):
+                break
+            m = self._search(text, m.start() + 1)
+        return found
+
+    def search(self, text: str) -> bool:
+        """True if any keyword occurs in `text`."""
+        return self._search is not None and self._search(text.lower()) is not None
+
+
+class VideoFilterEngine:
+    """
+    Rule lists for video screening (preferred channels, spam keywords), loaded
+    from a JSON file and compiled into `KeywordMatcher`s. The file is re-read
+    when its mtime changes, checked at most every RELOAD_CHECK_INTERVAL seconds;
+    a broken file keeps the previous rules in place.
+    """
+
+    def __init__(self, path: str = VIDEO_FILTERS_PATH, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self.preferred_channels = KeywordMatcher([])
+        self.spam_keywords = KeywordMatcher([])
+        self._reload_if_changed(force=True)
+
+    def _reload_if_changed(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+                if not force and mtime == self._mtime:
+                    return
+                with open(self.path, encoding="utf-8") as f:
+                    rules = json.load(f)
+                self.preferred_channels = KeywordMatcher(rules.get("preferred_channels", []))
+                self.spam_keywords = KeywordMatcher(rules.get("spam_keywords", []))
+                self._mtime = mtime
+                logger.info(
+                    f"[filters] Loaded {len(self.preferred_channels.keywords)} preferred channels, "
+                    f"{len(self.spam_keywords.keywords)} spam keywords from {self.path}"
+                )
+            except Exception as e:
+                logger.error(f"[filters] Could not load {self.path}, keeping previous rules: {e}")
+
+    def preferred_channel_matches(self, channel: str) -> Set[str]:
+        self._reload_if_changed()
+        return self.preferred_channels.find_all(channel)
+
+    def is_preferred_channel(self, channel: str) -> bool:
+        self._reload_if_changed()
+        return self.preferred_channels.search(channel)
+
+    def spam_matches(self, description: str) -> Set[str]:
+        self._reload_if_changed()
+        return self.spam_keywords.find_all(description)
+
+    def is_spammy(self, description: str) -> bool:
+        self._reload_if_changed()
+        return self.spam_keywords.search(description)
+
+
+class QueryKeywords(NamedTuple):
+    words: Dict[str, int]  # query word -> times it occurs in the query
+    required: int          # matching words needed for a video to be relevant
+    matcher: KeywordMatcher
+
+
+@lru_cache(maxsize=4096)
+def query_keywords(query: str) -> QueryKeywords:
+    words = query.lower().split()
+    return QueryKeywords(dict(Counter(words)), max(1, len(words) // 2), KeywordMatcher(words))
+
+
+def is_relevant(title: str, description: str, query: str) -> bool:
+    """
+    At least half of the query's words (and at least one) occur in the title
+    or description. The title is matched first and the description only if
+    the title is not enough, each in one pass that stops once enough words
+    are found. Query words have no whitespace, so none can span the two.
+    """
+    keywords = query_keywords(query)
+
+    def enough(found: Set[str]) -> bool:
+        return sum(keywords.words[w] for w in found) >= keywords.required
+
+    found = keywords.matcher.find_all(title, enough)
+    if not enough(found):
+        found |= keywords.matcher.find_all(description, lambda more: enough(found | more))
+    return enough(found)
+
+
+video_filters = VideoFilterEngine()
@@ -0,0 +1,254 @@
+# backend/utils/tracing.py
+#
+# Minimal span tracing for the course build pipeline. Spans nest through a
+# contextvar (so they follow asyncio tasks), and finished spans are written
+# as JSON lines by a background thread; no collector needed.
+#
+#   python -m backend.utils.tracing                 # waterfall of the latest trace
+#   python -m backend.utils.tracing --list          # recent traces
+#   python -m backend.utils.tracing --trace <id>    # one trace
+
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger("uvicorn.error")
+
+# "jsonl" (append to TRACE_FILE), "console" (stderr) or "none"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "jsonl").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", ".skillmint/traces.jsonl")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "end", "attributes", "status", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent else uuid4().hex
+        self.span_id = uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round((self.end - self.start) * 1000, 2) if self.end else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for spans opened outside any trace, so callers need no checks."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_attributes(**attributes) -> None:
+    """Attach attributes to the innermost open span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+class _Exporter:
+    """Writes finished spans from a daemon thread so request handlers never block on disk."""
+
+    def __init__(self, kind: str, path: str):
+        self.kind = kind
+        self.path = path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        if self.kind == "none":
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(span.to_dict())
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                lines = "".join(json.dumps(s, default=str) + "\n" for s in batch)
+                if self.kind == "console":
+                    sys.stderr.write(lines)
+                    sys.stderr.flush()
+                else:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(lines)
+            except Exception as e:
+                logger.warning(f"[tracing] Could not export {len(batch)} spans: {e}")
+
+
+exporter = _Exporter(TRACE_EXPORTER, TRACE_FILE)
+
+
+@contextmanager
+def span(name: str, root: bool = False, **attributes) -> Iterator[Span]:
+    """
+    Open a child of the current span for the duration of the block; with
+    `root=True` a new trace is started when there is no current span. Outside
+    a trace, non-root spans are no-ops, so shared helpers (LLM, YouTube calls)
+    only show up in traces of the pipelines that opened one. Exceptions mark
+    the span as failed and propagate.
+    """
+    parent = _current_span.get()
+    if parent is None and not root:
+        yield _NOOP_SPAN
+        return
+    s = Span(name, parent, attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end = time.time()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Closed from another context (e.g. an async generator finalized elsewhere)
+            _current_span.set(parent)
+        exporter.export(s)
+
+
+# --- Waterfall CLI ---
+
+def load_traces(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                s = json.loads(line)
+            except ValueError:
+                continue
+            traces.setdefault(s["trace_id"], []).append(s)
+    return traces
+
+
+def _root(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ids = {s["span_id"] for s in spans}
+    roots = [s for s in spans if s["parent_id"] not in ids]
+    return min(roots, key=lambda s: s["start"])
+
+
+def _format_attributes(attributes: Dict[str, Any], limit: int = 60) -> str:
+    text = " ".join(f"{k}={v}" for k, v in attributes.items() if v is not None)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def render_waterfall(spans: List[Dict[str, Any]], width: int = 50) -> str:
+    root = _root(spans)
+    start = min(s["start"] for s in spans)
+    end = max(s["end"] or s["start"] for s in spans)
+    total = max(end - start, 1e-9)
+
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for s in spans:
+        children.setdefault(s["parent_id"], []).append(s)
+    for group in children.values():
+        group.sort(key=lambda s: s["start"])
+
+    rows = []
+
+    def walk(s: Dict[str, Any], depth: int) -> None:
+        offset = int((s["start"] - start) / total * width)
+        length = max(1, int(((s["end"] or s["start"]) - s["start"]) / total * width))
+        bar = " " * offset + ("!" if s["status"] == "error" else "#") * min(length, width - offset)
+        label = ("  " * depth + s["name"])[:34]
+        rows.append(
+            f"{label:<34} {s['duration_ms'] or 0:>10.1f}ms |{bar:<{width}}| {_format_attributes(s['attributes'])}"
+        )
+        for child in children.get(s["span_id"], []):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    header = f"trace {root['trace_id']}  {root['name']}  {total * 1000:.1f}ms  {len(spans)} spans"
+    return "\n".join([header, "-" * len(header)] + rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render a waterfall from the trace file.")
+    parser.add_argument("--file", default=TRACE_FILE)
+    parser.add_argument("--trace", help="trace id (prefix is enough); default: most recent")
+    parser.add_argument("--list", action="store_true", help="list recent traces instead")
+    parser.add_argument("--width", type=int, default=50)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        raise SystemExit(f"No trace file at {args.file}")
+    traces = load_traces(args.file)
+    if not traces:
+        raise SystemExit("Trace file is empty")
+    ordered = sorted(traces.values(), key=lambda spans: _root(spans)["start"])
+
+    if args.list:
+        for spans in ordered[-20:]:
+            root = _root(spans)
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(root["start"]))
+            print(f"{root['trace_id']}  {when}  {root['name']:<20} {root['duration_ms'] or 0:>10.1f}ms  {len(spans)} spans")
+        return
+
+    if args.trace:
+        matches = [spans for tid, spans in traces.items() if tid.startswith(args.trace)]
+        if not matches:
+            raise SystemExit(f"No trace starting with {args.trace}")
+        spans = matches[0]
+    else:
+        spans = ordered[-1]
+    print(render_waterfall(spans, args.width))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# backend/utils/ttl_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+
+from backend.utils.metrics import record_cache
+
+LOCAL_CACHE_PATH = os.getenv("LOCAL_CACHE_PATH", ".skillmint/cache.db")
+# Expired rows of a namespace are deleted once every this many writes to it
+PURGE_EVERY_WRITES = 500
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    age: float  # seconds since the entry was written
+
+
+class SqliteTTLCache:
+    """
+    Small disk-backed key/value cache shared by every worker on the host.
+
+    Entries are JSON values stamped with their write time; callers decide what
+    counts as fresh or stale from `CacheEntry.age`, which is what lets them do
+    stale-while-revalidate. Rows older than `max_age` are ignored on read and
+    deleted by `purge_expired`, which every PURGE_EVERY_WRITES-th write runs.
+    """
+
+    def __init__(self, namespace: str, max_age: float, path: str = LOCAL_CACHE_PATH):
+        self.namespace = namespace
+        self.max_age = max_age
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " written_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[CacheEntry]:
+        """Entry for `key`, or None if missing or older than `max_age` (default: the cache's)."""
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, written_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        age = time.time() - row[1] if row is not None else None
+        if age is None or age > max_age:
+            record_cache(self.namespace, hits=0, misses=1)
+            return None
+        record_cache(self.namespace, hits=1)
+        return CacheEntry(json.loads(row[0]), age)
+
+    def get_many(self, keys: list) -> dict:
+        """Live entries for `keys`, keyed by key; missing or expired keys are omitted."""
+        if not keys:
+            return {}
+        found = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT key, value, written_at FROM cache WHERE namespace = ? "
+                    f"AND key IN ({','.join('?' * len(chunk))})",
+                    (self.namespace, *chunk),
+                ).fetchall()
+                for key, value, written_at in rows:
+                    age = now - written_at
+                    if age <= self.max_age:
+                        found[key] = CacheEntry(json.loads(value), age)
+        record_cache(self.namespace, hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: dict) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(self.namespace, k, json.dumps(v), now) for k, v in items.items()]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", rows)
+            conn.commit()
+            self._writes += 1
+            purge = self._writes % PURGE_EVERY_WRITES == 0
+        if purge:
+            self.purge_expired()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            cur = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND written_at < ?",
+                (self.namespace, time.time() - self.max_age),
+            )
+            conn.commit()
+            return cur.rowcount
@@ -0,0 +1,201 @@
+# backend/worker.py
+#
+# Course generation worker. With GENERATION_MODE=queue the API processes only
+# enqueue builds and report their status; the LLM-heavy work runs here. Every
+# worker process polls the same SQLite job queue (JOB_QUEUE_PATH), so scaling
+# out is starting more processes on the host:
+#
+#   python -m backend.worker --concurrency 2
+#
+# SIGTERM/SIGINT stop claiming new jobs and wait up to --drain-timeout for
+# running ones; jobs still running after that are handed back to the queue.
+
+import os
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+
+import socket
+import signal
+import asyncio
+import logging
+import argparse
+from typing import Awaitable, Callable, Dict, Optional
+from uuid import uuid4
+
+from backend.services.build_checkpoints import build_checkpoints
+from backend.services.course_pipeline import COURSE_BUILD_JOB, build_full_course
+from backend.services.job_queue import Job, JobQueue, job_queue
+from backend.services.llm_service import close_client as close_llm_client
+from backend.services.youtube_client import youtube_client
+from backend.utils.request_logging import request_id_var
+
+logger = logging.getLogger("uvicorn.error")
+
+WORKER_CONCURRENCY = int(os.getenv("GENERATION_WORKER_CONCURRENCY", "1"))
+WORKER_POLL_SECONDS = float(os.getenv("GENERATION_WORKER_POLL_SECONDS", "1.0"))
+# Old rows of the local state files are pruned this often
+HOUSEKEEPING_INTERVAL_SECONDS = float(os.getenv("HOUSEKEEPING_INTERVAL_SECONDS", "3600"))
+
+
+class PermanentJobError(RuntimeError):
+    """The job can never succeed (bad input); it is failed without retries."""
+
+
+async def run_course_build(payload: dict, progress: Callable[[str], None]) -> dict:
+    try:
+        return await build_full_course(
+            payload["prompt"], payload["user_id"], payload.get("outline"),
+            on_progress=progress, build_id=payload.get("build_id"), lazy=payload.get("lazy"),
+        )
+    except ValueError as e:
+        raise PermanentJobError(str(e)) from e
+
+
+HANDLERS: Dict[str, Callable[[dict, Callable[[str], None]], Awaitable[dict]]] = {
+    COURSE_BUILD_JOB: run_course_build,
+}
+
+
+class Worker:
+    def __init__(self, queue: JobQueue, concurrency: int = WORKER_CONCURRENCY, poll_seconds: float = WORKER_POLL_SECONDS):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self.stopping = asyncio.Event()
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def stop(self) -> None:
+        if not self.stopping.is_set():
+            logger.info(f"[worker] Stopping: no new jobs, {len(self._running)} running")
+            self.stopping.set()
+
+    async def _heartbeat(self, job: Job, task: asyncio.Task, progress: Dict[str, Optional[str]]) -> None:
+        interval = self.queue.lease_seconds / 3
+        while not task.done():
+            await asyncio.sleep(interval)
+            alive = await asyncio.to_thread(self.queue.heartbeat, job.id, self.worker_id, progress["stage"])
+            if not alive:
+                logger.warning(f"[worker] Lost the lease on job {job.id}, abandoning it")
+                task.cancel()
+                return
+
+    async def _run(self, job: Job) -> None:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            await asyncio.to_thread(self.queue.fail, job, self.worker_id, f"Unknown job kind {job.kind!r}", False)
+            return
+
+        progress: Dict[str, Optional[str]] = {"stage": None}
+        loop = asyncio.get_running_loop()
+
+        def report(stage: str) -> None:
+            progress["stage"] = stage
+            loop.run_in_executor(None, self.queue.heartbeat, job.id, self.worker_id, stage)
+
+        # Logs and traces of the build carry the id of the request that queued it
+        request_id_var.set(job.payload.get("request_id") or job.id[:16])
+        logger.info(f"[worker] Job {job.id} ({job.kind}) attempt {job.attempts}/{job.max_attempts}")
+        task = asyncio.create_task(handler(job.payload, report))
+        self._running[job.id] = task
+        heartbeat = asyncio.create_task(self._heartbeat(job, task, progress))
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if self.stopping.is_set():
+                released = await asyncio.to_thread(self.queue.release, job.id, self.worker_id)
+                logger.info(f"[worker] Job {job.id} interrupted by shutdown{', requeued' if released else ''}")
+            return
+        except PermanentJobError as e:
+            logger.warning(f"[worker] Job {job.id} failed permanently: {e}")
+            await asyncio.to_thread(self.queue.fail, job, self.worker_id, str(e), False)
+        except Exception as e:
+            logger.exception(f"[worker] Job {job.id} failed")
+            await asyncio.to_thread(self.queue.fail, job, self.worker_id, f"{type(e).__name__}: {e}")
+        else:
+            if await asyncio.to_thread(self.queue.complete, job.id, self.worker_id, result):
+                logger.info(f"[worker] Job {job.id} succeeded")
+            else:
+                logger.warning(f"[worker] Job {job.id} finished after its lease was lost; result discarded")
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job.id, None)
+
+    async def _slot(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+            except Exception as e:
+                logger.error(f"[worker] Could not claim a job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Each job gets its own context, so request ids and spans do not leak between jobs
+            await asyncio.create_task(self._run(job))
+
+    async def _housekeeping(self) -> None:
+        while not self.stopping.is_set():
+            for name, purge in (("jobs", self.queue.purge_finished), ("build checkpoints", build_checkpoints.purge_finished)):
+                try:
+                    purged = await asyncio.to_thread(purge)
+                    if purged:
+                        logger.info(f"[worker] Purged {purged} old {name}")
+                except Exception as e:
+                    logger.warning(f"[worker] Purging {name} failed: {e}")
+            try:
+                await asyncio.wait_for(self.stopping.wait(), HOUSEKEEPING_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, drain_timeout: float) -> None:
+        logger.info(f"[worker] {self.worker_id} started with {self.concurrency} slots on {self.queue.path}")
+        slots = [asyncio.create_task(self._slot()) for _ in range(self.concurrency)]
+        housekeeping = asyncio.create_task(self._housekeeping())
+        await self.stopping.wait()
+        housekeeping.cancel()
+        done, pending = await asyncio.wait(slots, timeout=drain_timeout)
+        if pending:
+            logger.warning(f"[worker] {len(self._running)} jobs still running after {drain_timeout}s, handing them back")
+            for task in list(self._running.values()):
+                task.cancel()
+            await asyncio.wait(pending)
+
+
+async def main_async(concurrency: int, drain_timeout: float) -> None:
+    worker = Worker(job_queue, concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Windows: Ctrl+C still raises KeyboardInterrupt
+            pass
+    await youtube_client.start()
+    try:
+        await worker.run(drain_timeout)
+    finally:
+        await youtube_client.close()
+        await close_llm_client()
+        logger.info("[worker] Stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run course generation jobs from the shared queue.")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="jobs run at once by this process")
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="seconds to wait for running jobs on shutdown")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if os.getenv("DEBUG", "false").lower() == "true" else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    asyncio.run(main_async(args.concurrency, args.drain_timeout))
+
+
+if __name__ == "__main__":
+    main()
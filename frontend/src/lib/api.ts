@@ -1,13 +1,22 @@
 const BASE_URL = import.meta.env.VITE_BACKEND_URL;
 import axios from "axios";
 
-export async function createCourse(course: any) {
+// Idempotency-Key for one user submit. Callers keep it while retrying that
+// submit, so a retry gets the first attempt's result from the backend instead
+// of starting the work again, and take a new one for every new submit.
+export function newIdempotencyKey(): string {
+  return crypto.randomUUID();
+}
+
+export async function createCourse(course: any, idempotencyKey: string) {
+  const body = JSON.stringify(course);
   const res = await fetch(`${BASE_URL}/courses/`, {
     method: "POST",
     headers: {
-      "Content-Type": "application/json"
+      "Content-Type": "application/json",
+      "Idempotency-Key": idempotencyKey,
     },
-    body: JSON.stringify(course)
+    body,
   });
 
   if (!res.ok) {
@@ -44,6 +53,23 @@ export async function getCourseProgress(
   return response.data;
 }
 
+// Fetch progress for all of this user's courses in one request
+export async function getProgressSummary(
+  userId: string
+): Promise<Record<string, {
+  total_lessons: number;
+  completed_lessons: number;
+}>> {
+  const response = await axios.get<Record<string, {
+    total_lessons: number;
+    completed_lessons: number;
+  }>>(
+    `${import.meta.env.VITE_BACKEND_URL}/progress/summary`,
+    { params: { user_id: userId } }
+  );
+  return response.data;
+}
+
 
 export async function createGenerateStream({
   prompt,
@@ -68,21 +94,73 @@ export async function buildCourse(payload: {
   prompt: string;
   user_id: string;
   outline: { title: string; summary: string }[];
+  idempotencyKey: string;
 }) {
+  const body = JSON.stringify({
+    prompt: payload.prompt,
+    user_id: payload.user_id,
+    outline: {
+      lessons: payload.outline, // ✅ wrap lessons in `outline`
+    },
+  });
   const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/generate/full/`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({
-      prompt: payload.prompt,
-      user_id: payload.user_id,
-      outline: {
-        lessons: payload.outline, // ✅ wrap lessons in `outline`
-      },
-    }),
+    headers: { "Content-Type": "application/json", "Idempotency-Key": payload.idempotencyKey },
+    body,
   });
 
+  if (res.status === 429) {
+    const retryAfter = res.headers.get("Retry-After");
+    throw new Error(`Too many course builds right now, try again${retryAfter ? ` in ${retryAfter}s` : " later"}`);
+  }
   if (!res.ok) throw new Error("Build failed");
-  return res.json();
+  const data = await res.json();
+  // 202: the build was queued for a generation worker; poll until it is done
+  if (res.status === 202 && data.job_id) return waitForBuildJob(data.job_id);
+  // 202 without a job: the same build was already running in the API process
+  if (res.status === 202 && data.build_id) return waitForBuild(data.build_id);
+  return data;
+}
+
+// Generates only the lessons a stopped build is missing
+export async function resumeCourseBuild(buildId: string) {
+  const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/generate/builds/${buildId}/resume`, {
+    method: "POST",
+  });
+  if (res.status === 409) throw new Error("This build is already running or finished");
+  if (!res.ok) throw new Error("Resume failed");
+  const data = await res.json();
+  if (res.status === 202 && data.job_id) return waitForBuildJob(data.job_id);
+  return data;
+}
+
+const BUILD_POLL_INTERVAL_MS = 2000;
+const BUILD_POLL_TIMEOUT_MS = 30 * 60 * 1000;
+
+export async function waitForBuildJob(jobId: string) {
+  const deadline = Date.now() + BUILD_POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/generate/jobs/${jobId}`);
+    if (!res.ok) throw new Error("Build status unavailable");
+    const job = await res.json();
+    if (job.status === "succeeded") return job.result;
+    if (job.status === "failed") throw new Error(job.error || "Build failed");
+    await new Promise((resolve) => setTimeout(resolve, BUILD_POLL_INTERVAL_MS));
+  }
+  throw new Error("Build timed out");
+}
+
+export async function waitForBuild(buildId: string) {
+  const deadline = Date.now() + BUILD_POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/generate/builds/${buildId}`);
+    if (!res.ok) throw new Error("Build status unavailable");
+    const build = await res.json();
+    if (build.status === "succeeded") return { course_id: build.course_id, build_id: build.build_id };
+    if (build.status === "failed") throw new Error(build.error || "Build failed");
+    await new Promise((resolve) => setTimeout(resolve, BUILD_POLL_INTERVAL_MS));
+  }
+  throw new Error("Build timed out");
 }
 
 export async function searchYouTube(query: string) {
@@ -106,6 +184,56 @@ export async function getCourse(id: string) {
   return response.data;
 }
 
+// Course overview: lesson titles, summaries and counts, without lesson bodies
+export async function getCourseOutline(id: string) {
+  const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/courses/${id}/outline`);
+  if (res.status === 404) throw new Error("Course not found");
+  if (!res.ok) throw new Error("Failed to fetch course");
+  return await res.json();
+}
+
+// One lesson with content, videos and quiz (cached by the browser once complete)
+export async function getLesson(courseId: string, lessonId: string) {
+  const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/courses/${courseId}/lessons/${lessonId}`);
+  if (res.status === 404) throw new Error("Lesson not found");
+  if (!res.ok) throw new Error("Failed to fetch lesson");
+  return await res.json();
+}
+
+// Reads a lesson over server-sent events. Lessons of lazily built courses are
+// written when first opened, so their text arrives in chunks as it is
+// generated; resolves with the stored lesson (content, videos, quiz).
+export async function streamLesson(
+  courseId: string,
+  lessonId: string,
+  handlers: { onTitle?: (title: string) => void; onChunk?: (text: string) => void } = {}
+) {
+  const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/courses/${courseId}/lessons/${lessonId}/stream`);
+  if (res.status === 404) throw new Error("Lesson not found");
+  if (!res.ok || !res.body) throw new Error("Failed to fetch lesson");
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let end;
+    while ((end = buffer.indexOf("\n\n")) >= 0) {
+      const line = buffer.slice(0, end).trim();
+      buffer = buffer.slice(end + 2);
+      if (!line.startsWith("data: ")) continue;
+      const event = JSON.parse(line.slice(6));
+      if (event.title !== undefined) handlers.onTitle?.(event.title);
+      if (event.chunk !== undefined) handlers.onChunk?.(event.chunk);
+      if (event.error) throw new Error(event.error);
+      if (event.lesson) return event.lesson;
+    }
+  }
+  throw new Error("Lesson stream ended early");
+}
+
 export async function submitLessonProgress({
   user_id,
   course_id,
@@ -40,6 +40,7 @@ export interface CourseCreate {
 
 export interface CourseOut extends CourseCreate {
   id: string;
+  build_status?: "building" | "incomplete" | "ready";
   created_at?: string;
   updated_at?: string;
 }
@@ -6,6 +6,7 @@ import { Play, FileText, HelpCircle, Clock, Star } from "lucide-react";
 import { useState, useEffect } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import { useToast } from "@/components/ui/use-toast";
+import { getCourseOutline } from "@/lib/api";
 const Course = () => {
   const { id } = useParams<{ id: string }>();
   const course_id = id;
@@ -19,9 +20,8 @@ const Course = () => {
   useEffect(() => {
     const fetchCourse = async () => {
       try {
-        const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/courses/${course_id}`);
-        if (!res.ok) throw new Error("Failed to fetch course");
-        const data = await res.json();
+        // Titles, summaries and counts only; a lesson's content loads when it is opened
+        const data = await getCourseOutline(course_id!);
         setCourseData(data);
       } catch (err: any) {
         console.error(err);
@@ -74,8 +74,14 @@ const Course = () => {
           </div>
           <div className="flex items-center gap-2">
             <FileText className="w-4 h-4" />
-            {courseData.lessons.length} Lessons
+            {courseData.lesson_count} Lessons
           </div>
+          {courseData.video_count > 0 && (
+            <div className="flex items-center gap-2">
+              <Play className="w-4 h-4" />
+              {courseData.video_count} Videos
+            </div>
+          )}
         </div>
       </Card>
 
@@ -110,24 +116,19 @@ const Course = () => {
                 <p className="text-muted-foreground">{lesson.summary}</p>
                 
                 {/* Videos */}
-                {lesson.videos?.length > 0 && (
-                  <div className="space-y-2">
-                    <h4 className="text-sm font-medium">Videos</h4>
-                    {lesson.videos.map((video, i) => (
-                      <div key={i} className="flex items-center gap-2 text-sm text-muted-foreground">
-                        <Play className="w-3 h-3" />
-                        {video.title}
-                      </div>
-                    ))}
+                {lesson.video_count > 0 && (
+                  <div className="flex items-center gap-2 text-sm text-muted-foreground">
+                    <Play className="w-3 h-3" />
+                    {lesson.video_count} video{lesson.video_count !== 1 ? 's' : ''}
                   </div>
                 )}
 
                 {/* Quiz Preview */}
-                {Array.isArray(lesson.quiz) && lesson.quiz.length > 0 && (
+                {lesson.quiz_questions > 0 && (
                   <div className="bg-muted/30 rounded-lg p-4">
                     <h4 className="text-sm font-medium mb-2">Lesson Quiz</h4>
                     <p className="text-sm text-muted-foreground">
-                      {lesson.quiz.length} question{lesson.quiz.length !== 1 ? 's' : ''} to test your understanding
+                      {lesson.quiz_questions} question{lesson.quiz_questions !== 1 ? 's' : ''} to test your understanding
                     </p>
                   </div>
                 )}
@@ -144,7 +145,7 @@ const Course = () => {
             <div className="space-y-3">
               <div className="flex justify-between text-sm">
                 <span>Lessons Completed</span>
-                <span>0/{courseData.lessons.length}</span>
+                <span>0/{courseData.lesson_count}</span>
               </div>
               <div className="w-full bg-muted rounded-full h-2">
                 <div className="bg-primary h-2 rounded-full w-0 transition-smooth" />
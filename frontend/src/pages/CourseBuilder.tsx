@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
 import { Input } from "@/components/ui/input";
@@ -10,7 +10,7 @@ import { useToast } from "@/components/ui/use-toast";
 import { useNavigate } from "react-router-dom";
 import { saveCustomCourse } from "@/lib/utils"
 import { useUser } from "@supabase/auth-helpers-react"
-import { createCourse, searchYouTube, getCourse } from "@/lib/api";
+import { createCourse, searchYouTube, getCourse, newIdempotencyKey } from "@/lib/api";
 import { useSearchParams } from "react-router-dom";
 
 const CourseBuilder = () => {
@@ -24,6 +24,12 @@ const CourseBuilder = () => {
   const [searchResults, setSearchResults] = useState<any[]>([]);
   const [searchParams] = useSearchParams();
   const editId = searchParams.get("edit");
+  // Key of a save that failed, reused if the same course is saved again
+  const saveKey = useRef<string | null>(null);
+
+  useEffect(() => {
+    saveKey.current = null;
+  }, [courseTitle, courseDescription, lessons]);
 
   useEffect(() => {
     if (editId && user) {
@@ -111,7 +117,9 @@ const CourseBuilder = () => {
         user_id: user.id,
       };
 
-      const response = await createCourse(payload);  // <- actual API call
+      saveKey.current ??= newIdempotencyKey();
+      const response = await createCourse(payload, saveKey.current);  // <- actual API call
+      saveKey.current = null;
       const course_id = response.id;
 
       toast({
@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
 import { Input } from "@/components/ui/input";
@@ -8,7 +8,7 @@ import { useToast } from "@/components/ui/use-toast";
 import { useUser } from "@supabase/auth-helpers-react";
 import { createGenerateStream } from "@/lib/api";
 import { useNavigate } from "react-router-dom";
-import { buildCourse } from "@/lib/api";
+import { buildCourse, newIdempotencyKey } from "@/lib/api";
 
 const Home = () => {
   const [prompt, setPrompt] = useState("");
@@ -20,6 +20,13 @@ const Home = () => {
   const user = useUser();
   const { toast } = useToast();
   const navigate = useNavigate();
+  // Key of a build that failed, reused if the same build is retried
+  const buildKey = useRef<string | null>(null);
+
+  useEffect(() => {
+    buildKey.current = null;
+  }, [prompt, courseOutline]);
+
   const handleGenerateOutline = async () => {
     if (!prompt.trim() || !user) return;
     setIsGenerating(true);
@@ -89,11 +96,14 @@ function parseOutlineText(text: string): { title: string; summary: string }[] {
       const outline = parseOutlineText(courseOutline);
       console.log("🧠 Final outline sent to backend:", outline);
 
+      buildKey.current ??= newIdempotencyKey();
       const result = await buildCourse({
         prompt,
         user_id: user.id,
         outline,
+        idempotencyKey: buildKey.current,
       });
+      buildKey.current = null;
 
       console.log("🎯 Build result:", result); // 🔍 Logs what backend returned
       if (!result?.course_id) throw new Error("Failed to build course");
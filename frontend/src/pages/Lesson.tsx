@@ -7,6 +7,7 @@ import { ArrowLeft, CheckCircle } from "lucide-react";
 import { useToast } from "@/components/ui/use-toast";
 import ReactMarkdown from "react-markdown";
 import remarkGfm from "remark-gfm";
+import { getLesson, streamLesson } from "@/lib/api";
 
 const Lesson = () => {
   const { courseId, lessonId } = useParams();
@@ -17,24 +18,37 @@ const Lesson = () => {
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
+    let cancelled = false;
     const fetchLesson = async () => {
       try {
-        const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/courses/${courseId}`);
-        if (!res.ok) throw new Error("Failed to fetch course");
-        const data = await res.json();
-
-        const selectedLesson = data.lessons.find((l: any) => l.id === lessonId);
-        if (!selectedLesson) throw new Error("Lesson not found");
-
-        setLesson(selectedLesson);
+        const stored = await getLesson(courseId!, lessonId!);
+        if (stored.content_status !== "pending") {
+          if (!cancelled) setLesson(stored);
+          return;
+        }
+        // Not written yet: it is generated on this first open, shown as it arrives
+        const selectedLesson = await streamLesson(courseId!, lessonId!, {
+          onTitle: (title) => {
+            if (cancelled) return;
+            setLesson({ title, content: "" });
+            setLoading(false);
+          },
+          onChunk: (text) => {
+            if (!cancelled) setLesson((current: any) => ({ ...current, content: (current?.content || "") + text }));
+          },
+        });
+        if (!cancelled) setLesson(selectedLesson);
       } catch (err: any) {
-        setError(err.message || "Something went wrong");
+        if (!cancelled) setError(err.message || "Something went wrong");
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     fetchLesson();
+    return () => {
+      cancelled = true;
+    };
   }, [courseId, lessonId]);
 
 
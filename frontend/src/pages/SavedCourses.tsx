@@ -9,7 +9,7 @@ import { Input } from "@/components/ui/input";
 import { BookOpen, Search, Star, Play } from "lucide-react";
 import { supabase } from '@/lib/supabase';
 import { getSavedCourses } from "@/lib/api";
-import { getCourseProgress } from "@/lib/api";
+import { getProgressSummary } from "@/lib/api";
 
 const SavedCourses = () => {
   const navigate = useNavigate();
@@ -31,18 +31,17 @@ const SavedCourses = () => {
         const courses = await getSavedCourses(user.id) as any[];
         setSavedCourses(courses);
 
-        const progressEntries = await Promise.all(
-          courses.map(async (course: any) => {
-            try {
-              const progress = await getCourseProgress(course.id, user.id);
-              return [course.id, progress] as const;
-            } catch (err) {
-              console.warn("Failed to fetch progress for course", course.id);
-              return [course.id, { total_lessons: 0, completed_lessons: 0 }] as const;
-            }
-          })
-        );
-        setProgressMap(Object.fromEntries(progressEntries));
+        try {
+          const summary = await getProgressSummary(user.id);
+          setProgressMap(Object.fromEntries(
+            courses.map((course: any) => [
+              course.id,
+              summary[course.id] ?? { total_lessons: 0, completed_lessons: 0 },
+            ])
+          ));
+        } catch (err) {
+          console.warn("Failed to fetch progress summary", err);
+        }
       } catch (err) {
         console.error("Failed to fetch courses", err);
       }